@@ -0,0 +1,124 @@
+"""Batch multi-get and bulk write API routes"""
+
+from typing import Any, Dict, List
+from uuid import UUID
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.schemas.batch import BatchIds
+from app.crud.bottle import get_bottles_by_ids, restore_bottles, soft_delete_bottles
+from app.crud.collection import get_collections_by_ids
+from app.crud.tasting_note import get_tasting_notes_by_ids, get_bottles_tasting_stats
+from app.dependencies import get_current_user
+from app.models.user import User
+from app.utils.serialization import (
+    FastJSONResponse,
+    RowSerializer,
+    collection_serializer,
+    select_bottle_fields,
+    tasting_note_serializer,
+)
+
+router = APIRouter(prefix="/batch", tags=["batch"])
+
+
+def _keyed(ids: List[UUID], serializer: RowSerializer, rows) -> Dict[str, Any]:
+    """Key serialized rows by ID and list the IDs that weren't found"""
+    results = {item["id"]: item for item in serializer.to_dicts(rows)}
+    return {
+        "results": results,
+        "missing": [item_id for item_id in ids if item_id not in results],
+    }
+
+
+def _changed(ids: List[UUID], key: str, changed: List[UUID]) -> Dict[str, Any]:
+    """List the IDs a bulk write changed and those it skipped"""
+    done = set(changed)
+    return {key: changed, "missing": [item_id for item_id in ids if item_id not in done]}
+
+
+@router.post("/bottles")
+async def batch_get_bottles(
+    batch_in: BatchIds,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    serializer: RowSerializer = Depends(select_bottle_fields),
+):
+    """Get several of the user's bottles in one request, keyed by ID"""
+    ids = batch_in.unique_ids()
+    bottles = await get_bottles_by_ids(db, ids, current_user.id, columns=serializer.columns)
+    return FastJSONResponse(_keyed(ids, serializer, bottles))
+
+
+@router.post("/bottles/delete")
+async def batch_delete_bottles(
+    batch_in: BatchIds,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Soft delete several of the user's bottles in one statement
+
+    Bottles that don't exist, aren't the user's or are already deleted are
+    listed as missing.
+    """
+    ids = batch_in.unique_ids()
+    deleted = await soft_delete_bottles(db, ids, current_user.id)
+    return FastJSONResponse(_changed(ids, "deleted", deleted))
+
+
+@router.post("/bottles/restore")
+async def batch_restore_bottles(
+    batch_in: BatchIds,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Restore several of the user's soft-deleted bottles in one statement
+
+    Bottles that aren't deleted, or were purged after the retention period,
+    are listed as missing.
+    """
+    ids = batch_in.unique_ids()
+    restored = await restore_bottles(db, ids, current_user.id)
+    return FastJSONResponse(_changed(ids, "restored", restored))
+
+
+@router.post("/tasting-notes")
+async def batch_get_tasting_notes(
+    batch_in: BatchIds,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get several of the user's tasting notes in one request, keyed by ID"""
+    ids = batch_in.unique_ids()
+    notes = await get_tasting_notes_by_ids(
+        db, ids, current_user.id, columns=tasting_note_serializer.columns
+    )
+    return FastJSONResponse(_keyed(ids, tasting_note_serializer, notes))
+
+
+@router.post("/bottle-stats")
+async def batch_get_bottle_stats(
+    batch_in: BatchIds,
+    db: Session = Depends(get_db),
+):
+    """Get tasting statistics for several bottles in one request (public)"""
+    ids = batch_in.unique_ids()
+    stats = await get_bottles_tasting_stats(db, ids)
+    return FastJSONResponse({
+        "results": stats,
+        "missing": [bottle_id for bottle_id in ids if bottle_id not in stats],
+    })
+
+
+@router.post("/collections")
+async def batch_get_collections(
+    batch_in: BatchIds,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get several owned or public collections in one request, keyed by ID"""
+    ids = batch_in.unique_ids()
+    collections = await get_collections_by_ids(
+        db, ids, current_user.id, columns=collection_serializer.columns
+    )
+    return FastJSONResponse(_keyed(ids, collection_serializer, collections))
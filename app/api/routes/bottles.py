@@ -1,23 +1,30 @@
 """Bottle API routes"""
 
+import math
 from typing import Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.schemas.bottle import BottleCreate, BottleRead, BottleUpdate
+from app.config import settings
+from app.database import get_db, get_primary_read_db
+from app.schemas.bottle import BottleCreate, BottleListItem, BottleRead, BottleUpdate
 from app.crud.bottle import (
     create_bottle,
     get_bottle_by_id,
     get_user_bottles,
-    get_user_bottles_count,
+    get_user_bottle_stats,
     update_bottle,
     soft_delete_bottle,
     update_bottle_ai_details,
 )
+from app.crud.catalog_product import get_product_ai_details
 from app.dependencies import get_current_user
 from app.models.user import User
 from app.services.ai_service import research_bottle
+from app.services.review_service import get_similar_bottles
+from app.utils.admission import AdmissionRejected, admission
+from app.utils.rate_limit import RESEARCH_COST, rate_limiter
+from app.utils.serialization import RowSerializer, select_bottle_fields
 
 router = APIRouter(prefix="/bottles", tags=["bottles"])
 
@@ -25,31 +32,55 @@ router = APIRouter(prefix="/bottles", tags=["bottles"])
 @router.post("", response_model=BottleRead, status_code=status.HTTP_201_CREATED)
 async def create_new_bottle(
     bottle_in: BottleCreate,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Create a new bottle entry"""
+    if bottle_in.research and settings.RATE_LIMIT_ENABLED:
+        decision = rate_limiter.check_request(request, RESEARCH_COST)
+        if not decision.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded for AI research",
+                headers={"Retry-After": str(math.ceil(decision.retry_after))},
+            )
+    
     bottle = await create_bottle(db, current_user.id, bottle_in)
     
-    # Optionally trigger AI research
+    # Optionally trigger AI research, reusing the catalog product's if it has been researched.
+    # Research is capped per worker; when no slot frees up the bottle is saved without it.
     if bottle_in.research:
-        ai_details = await research_bottle(bottle_in.name, bottle_in.distillery, bottle_in.spirit_type.value)
+        ai_details = await get_product_ai_details(db, bottle.product_id)
+        if ai_details is None:
+            try:
+                async with admission.slot("ai"):
+                    ai_details = await research_bottle(
+                        bottle_in.name, bottle_in.distillery, bottle_in.spirit_type.value
+                    )
+            except AdmissionRejected:
+                ai_details = None
         if ai_details:
             bottle = await update_bottle_ai_details(db, bottle.id, current_user.id, ai_details)
     
     return bottle
 
 
-@router.get("", response_model=list[BottleRead])
+@router.get("", response_model=list[BottleListItem])
 async def list_user_bottles(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_primary_read_db),
     current_user: User = Depends(get_current_user),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     spirit_type: Optional[str] = None,
     min_rating: Optional[int] = Query(None, ge=1, le=5),
+    serializer: RowSerializer = Depends(select_bottle_fields),
 ):
-    """List user's bottles with optional filtering"""
+    """List user's bottles with optional filtering
+
+    Heavy fields (notes, ai_details) are omitted unless requested with
+    ``fields=``.
+    """
     bottles = await get_user_bottles(
         db,
         current_user.id,
@@ -57,8 +88,9 @@ async def list_user_bottles(
         limit=limit,
         spirit_type=spirit_type,
         min_rating=min_rating,
+        columns=serializer.columns,
     )
-    return bottles
+    return serializer.response(bottles)
 
 
 @router.get("/stats")
@@ -67,43 +99,13 @@ async def get_bottle_stats(
     current_user: User = Depends(get_current_user),
 ):
     """Get statistics about user's bottle collection"""
-    from sqlalchemy import func
-    from app.models.bottle import Bottle
-    
-    total_bottles = await get_user_bottles_count(db, current_user.id)
-    
-    # Get spirit type breakdown
-    spirit_breakdown = db.query(
-        Bottle.spirit_type,
-        func.count(Bottle.id).label("count")
-    ).filter(
-        Bottle.user_id == current_user.id,
-        Bottle.deleted_at == None
-    ).group_by(Bottle.spirit_type).all()
-    
-    # Get average rating
-    avg_rating = db.query(
-        func.avg(Bottle.rating)
-    ).filter(
-        Bottle.user_id == current_user.id,
-        Bottle.deleted_at == None,
-        Bottle.rating != None
-    ).scalar()
-    
-    return {
-        "total_bottles": total_bottles,
-        "average_rating": float(avg_rating) if avg_rating else None,
-        "spirit_breakdown": [
-            {"spirit_type": str(spirit), "count": count}
-            for spirit, count in spirit_breakdown
-        ],
-    }
+    return await get_user_bottle_stats(db, current_user.id)
 
 
 @router.get("/{bottle_id}", response_model=BottleRead)
 async def get_bottle(
     bottle_id: UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_primary_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get specific bottle details (must be owner)"""
@@ -116,6 +118,23 @@ async def get_bottle(
     return bottle
 
 
+@router.get("/{bottle_id}/similar", response_model=list[dict])
+async def get_similar_bottle_list(
+    bottle_id: UUID,
+    db: Session = Depends(get_primary_read_db),
+    current_user: User = Depends(get_current_user),
+    limit: int = Query(5, ge=1, le=50),
+):
+    """Get bottles most similar to one of the user's bottles"""
+    bottle = await get_bottle_by_id(db, bottle_id, current_user.id)
+    if not bottle:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Bottle not found",
+        )
+    return await get_similar_bottles(db, bottle_id, limit=limit)
+
+
 @router.put("/{bottle_id}", response_model=BottleRead)
 async def update_bottle_info(
     bottle_id: UUID,
@@ -4,7 +4,7 @@ from typing import Optional
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_primary_read_db, get_read_db
 from app.schemas.collection import CollectionCreate, CollectionRead, CollectionUpdate
 from app.crud.collection import (
     create_collection,
@@ -18,6 +18,7 @@ from app.crud.collection import (
 )
 from app.dependencies import get_current_user
 from app.models.user import User
+from app.utils.serialization import collection_serializer
 
 router = APIRouter(prefix="/collections", tags=["collections"])
 
@@ -35,31 +36,35 @@ async def create_new_collection(
 
 @router.get("", response_model=list[CollectionRead])
 async def list_user_collections(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_primary_read_db),
     current_user: User = Depends(get_current_user),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
 ):
     """List user's collections"""
-    collections = await get_user_collections(db, current_user.id, skip=skip, limit=limit)
-    return collections
+    collections = await get_user_collections(
+        db, current_user.id, skip=skip, limit=limit, columns=collection_serializer.columns
+    )
+    return collection_serializer.response(collections)
 
 
 @router.get("/public", response_model=list[CollectionRead])
 async def list_public_collections(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
 ):
     """List all public collections"""
-    collections = await get_public_collections(db, skip=skip, limit=limit)
-    return collections
+    collections = await get_public_collections(
+        db, skip=skip, limit=limit, columns=collection_serializer.columns
+    )
+    return collection_serializer.response(collections)
 
 
 @router.get("/{collection_id}", response_model=CollectionRead)
 async def get_collection(
     collection_id: UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_primary_read_db),
 ):
     """Get collection details (public collections don't require auth)"""
     collection = await get_collection_by_id(db, collection_id)
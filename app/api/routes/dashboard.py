@@ -0,0 +1,21 @@
+"""Dashboard API routes"""
+
+from fastapi import APIRouter, Depends
+from app.database import get_read_session_factory, get_session_factory
+from app.dependencies import get_current_user
+from app.models.user import User
+from app.services.dashboard_service import get_dashboard
+from app.utils.serialization import FastJSONResponse
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+@router.get("")
+async def get_user_dashboard(
+    read_factory=Depends(get_read_session_factory),
+    write_factory=Depends(get_session_factory),
+    current_user: User = Depends(get_current_user),
+):
+    """Get bottle stats, tasting stats, recent bottles and collections in one request"""
+    summary = await get_dashboard(read_factory, write_factory, current_user.id)
+    return FastJSONResponse(summary)
@@ -0,0 +1,40 @@
+"""Live event stream API routes"""
+
+from datetime import timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Query
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import get_primary_read_db
+from app.dependencies import EVENTS_SCOPE, get_current_user, get_event_stream_user
+from app.models.user import User
+from app.utils.live_events import EventStreamResponse, event_hub
+from app.utils.security import create_access_token
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+@router.post("/token")
+async def create_stream_token(current_user: User = Depends(get_current_user)):
+    """Short-lived token for ``GET /events?access_token=``, since EventSource cannot send headers"""
+    expires_in = settings.SSE_TOKEN_EXPIRE_SECONDS
+    token = create_access_token(
+        data={"sub": str(current_user.id), "scope": EVENTS_SCOPE},
+        expires_delta=timedelta(seconds=expires_in),
+    )
+    return {"access_token": token, "expires_in": expires_in}
+
+
+@router.get("")
+async def stream_events(
+    last_event_id: Optional[str] = Header(None, max_length=64),
+    resume_from: Optional[str] = Query(
+        None, max_length=64, description="Last event id, for clients that cannot send Last-Event-ID"
+    ),
+    db: Session = Depends(get_primary_read_db),
+    current_user: User = Depends(get_event_stream_user),
+):
+    """Stream the user's bottle, note, collection and AI research events as Server-Sent Events"""
+    # The stream can stay open for hours; don't hold a pooled connection for it
+    db.close()
+    return EventStreamResponse(event_hub, current_user.id, last_event_id or resume_from)
@@ -0,0 +1,20 @@
+"""Recommendation API routes"""
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.dependencies import get_current_user
+from app.models.user import User
+from app.services.review_service import get_collaborative_recommendations
+
+router = APIRouter(prefix="/recommendations", tags=["recommendations"])
+
+
+@router.get("", response_model=list[dict])
+async def get_user_recommendations(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """Get bottles the user is likely to rate highly"""
+    return await get_collaborative_recommendations(db, current_user.id, limit=limit)
@@ -4,39 +4,103 @@ from typing import Optional
 from uuid import UUID
 from fastapi import APIRouter, Depends, Query, HTTPException, status
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.schemas.bottle import BottleRead
+from app.database import get_read_db
+from app.schemas.bottle import BottleListItem, BottleRead
+from app.schemas.catalog_product import CatalogProductRead
 from app.dependencies import get_current_user
 from app.models.user import User
+from app.models.bottle import Bottle, SpiritType
 from app.services.search_service import (
     search_bottles,
+    search_catalog,
     filter_bottles,
+    get_filter_facets,
+    query_bottles,
+    QuerySyntaxError,
     get_popular_bottles,
     get_collection_stats,
     get_bottles_by_region,
     get_bottles_by_country,
     get_distillery_profile,
+    get_top_distilleries,
     get_price_range_stats,
 )
+from app.services.suggest_service import suggest_index
+from app.utils.serialization import (
+    FastJSONResponse,
+    FieldSelector,
+    RowSerializer,
+    select_bottle_fields,
+)
 
 router = APIRouter(prefix="/search", tags=["search"])
 
+# /search/filter returns a compact summary with prices as floats by default
+select_filter_fields = FieldSelector(
+    RowSerializer(BottleRead, Bottle, converters={"price_paid": float}),
+    default=(
+        "id",
+        "name",
+        "spirit_type",
+        "distillery",
+        "proof",
+        "price_paid",
+        "region",
+        "country",
+        "rating",
+        "release_year",
+    ),
+)
+
 
-@router.get("/bottles", response_model=list[BottleRead])
+@router.get("/bottles", response_model=list[BottleListItem])
 async def search_bottle_catalog(
     q: str = Query(..., min_length=1, max_length=100),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    serializer: RowSerializer = Depends(select_bottle_fields),
 ):
     """Search bottles by name, distillery, region, or country"""
-    bottles = await search_bottles(db, q, skip=skip, limit=limit)
-    return bottles
+    bottles = await search_bottles(
+        db, q, skip=skip, limit=limit, columns=serializer.columns
+    )
+    return serializer.response(bottles)
+
+
+@router.get("/suggest")
+async def suggest_search_terms(
+    q: str = Query(..., min_length=1, max_length=100),
+    db: Session = Depends(get_read_db),
+    kind: Optional[str] = Query(None, pattern="^(name|distillery|region|country)$"),
+    limit: int = Query(10, ge=1, le=25),
+):
+    """Search-as-you-type suggestions for bottle names, distilleries, regions and countries"""
+    suggest_index.ensure_built(db)
+    return FastJSONResponse({"query": q, "suggestions": suggest_index.suggest(q, limit=limit, kind=kind)})
+
+
+@router.get("/suggest/stats")
+async def get_suggest_index_stats():
+    """Get size and memory use of the suggestion index"""
+    return suggest_index.memory_usage()
+
+
+@router.get("/catalog", response_model=list[CatalogProductRead])
+async def search_product_catalog(
+    q: str = Query(..., min_length=1, max_length=100),
+    db: Session = Depends(get_read_db),
+    spirit_type: Optional[SpiritType] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+):
+    """Search canonical catalog products, one entry per product regardless of owners"""
+    return await search_catalog(db, q, spirit_type=spirit_type, skip=skip, limit=limit)
 
 
 @router.get("/filter", response_model=dict)
 async def filter_bottle_catalog(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     spirit_type: Optional[str] = None,
     min_proof: Optional[float] = Query(None, ge=0, le=200),
     max_proof: Optional[float] = Query(None, ge=0, le=200),
@@ -52,58 +116,83 @@ async def filter_bottle_catalog(
     limit: int = Query(50, ge=1, le=100),
     sort_by: str = Query("created_at", regex="^(created_at|name|rating|price_paid)$"),
     sort_order: str = Query("desc", regex="^(asc|desc)$"),
+    facets: bool = Query(False, description="Include counts by spirit type, country, region, rating and price band"),
+    serializer: RowSerializer = Depends(select_filter_fields),
 ):
     """Advanced bottle filtering with multiple criteria"""
     from decimal import Decimal
     
-    min_price_decimal = Decimal(min_price) if min_price else None
-    max_price_decimal = Decimal(max_price) if max_price else None
-    
+    filters = {
+        "spirit_type": spirit_type,
+        "min_proof": min_proof,
+        "max_proof": max_proof,
+        "min_price": Decimal(min_price) if min_price else None,
+        "max_price": Decimal(max_price) if max_price else None,
+        "region": region,
+        "country": country,
+        "min_rating": min_rating,
+        "max_rating": max_rating,
+        "release_year_from": year_from,
+        "release_year_to": year_to,
+    }
     bottles, total_count = await filter_bottles(
         db,
-        spirit_type=spirit_type,
-        min_proof=min_proof,
-        max_proof=max_proof,
-        min_price=min_price_decimal,
-        max_price=max_price_decimal,
-        region=region,
-        country=country,
-        min_rating=min_rating,
-        max_rating=max_rating,
-        release_year_from=year_from,
-        release_year_to=year_to,
+        **filters,
         skip=skip,
         limit=limit,
         sort_by=sort_by,
         sort_order=sort_order,
+        columns=serializer.columns,
     )
     
-    return {
+    response = {
         "total": total_count,
         "count": len(bottles),
         "skip": skip,
         "limit": limit,
-        "bottles": [
-            {
-                "id": b.id,
-                "name": b.name,
-                "spirit_type": b.spirit_type,
-                "distillery": b.distillery,
-                "proof": b.proof,
-                "price_paid": float(b.price_paid) if b.price_paid else None,
-                "region": b.region,
-                "country": b.country,
-                "rating": b.rating,
-                "release_year": b.release_year,
-            }
-            for b in bottles
-        ],
+        "bottles": serializer.to_dicts(bottles),
     }
+    if facets:
+        response["facets"] = await get_filter_facets(db, **filters)
+    return FastJSONResponse(response)
+
+
+@router.get("/query", response_model=dict)
+async def query_bottle_catalog(
+    q: str = Query(..., min_length=1, max_length=500),
+    db: Session = Depends(get_read_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    serializer: RowSerializer = Depends(select_filter_fields),
+):
+    """Search with a structured query, e.g. ``distillery:"Buffalo Trace" proof:>100 rating:>=4``
+
+    Fields: distillery, region, country (exact, or prefix with a trailing *),
+    proof, rating, price, year (``>``, ``>=``, ``<``, ``<=`` or ``a..b``),
+    type, name and sort. Prefix a term with ``-`` to negate it.
+    """
+    try:
+        bottles, total_count = await query_bottles(
+            db, q, skip=skip, limit=limit, columns=serializer.columns
+        )
+    except QuerySyntaxError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    
+    return FastJSONResponse({
+        "total": total_count,
+        "count": len(bottles),
+        "skip": skip,
+        "limit": limit,
+        "bottles": serializer.to_dicts(bottles),
+    })
 
 
 @router.get("/popular", response_model=list[dict])
 async def get_popular_spirits(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     limit: int = Query(10, ge=1, le=50),
 ):
     """Get most popular bottles by community rating"""
@@ -113,43 +202,60 @@ async def get_popular_spirits(
 
 @router.get("/stats")
 async def get_catalog_statistics(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Get overall collection statistics"""
     stats = await get_collection_stats(db)
     return stats
 
 
-@router.get("/regions/{region}", response_model=list[BottleRead])
+@router.get("/regions/{region}", response_model=list[BottleListItem])
 async def get_region_bottles(
     region: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    serializer: RowSerializer = Depends(select_bottle_fields),
 ):
     """Get all bottles from a specific region"""
-    bottles = await get_bottles_by_region(db, region, skip=skip, limit=limit)
-    return bottles
+    bottles = await get_bottles_by_region(
+        db, region, skip=skip, limit=limit, columns=serializer.columns
+    )
+    return serializer.response(bottles)
 
 
-@router.get("/countries/{country}", response_model=list[BottleRead])
+@router.get("/countries/{country}", response_model=list[BottleListItem])
 async def get_country_bottles(
     country: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    serializer: RowSerializer = Depends(select_bottle_fields),
 ):
     """Get all bottles from a specific country"""
-    bottles = await get_bottles_by_country(db, country, skip=skip, limit=limit)
-    return bottles
+    bottles = await get_bottles_by_country(
+        db, country, skip=skip, limit=limit, columns=serializer.columns
+    )
+    return serializer.response(bottles)
+
+
+@router.get("/distilleries/top", response_model=list[dict])
+async def get_distillery_leaderboard(
+    db: Session = Depends(get_read_db),
+    by: str = Query("rating", pattern="^(rating|volume)$"),
+    min_ratings: int = Query(3, ge=1),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """Get top distilleries by average rating or by number of bottles owned"""
+    return await get_top_distilleries(db, sort_by=by, min_ratings=min_ratings, limit=limit)
 
 
 @router.get("/distillery/{distillery_name}")
 async def get_distillery_info(
     distillery_name: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    """Get profile information for a distillery"""
+    """Get profile information for a distillery by exact name or known alias"""
     profile = await get_distillery_profile(db, distillery_name)
     if not profile:
         raise HTTPException(
@@ -161,7 +267,7 @@ async def get_distillery_info(
 
 @router.get("/pricing/stats")
 async def get_pricing_statistics(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Get price statistics across the collection"""
     stats = await get_price_range_stats(db)
@@ -0,0 +1,35 @@
+"""Delta sync API routes"""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import get_read_db
+from app.dependencies import get_current_user
+from app.models.user import User
+from app.services.sync_service import SyncTokenExpired, get_changes, get_snapshot
+from app.utils.serialization import FastJSONResponse
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("")
+async def sync(
+    since: Optional[str] = Query(None, max_length=200, description="Token from the previous sync"),
+    limit: int = Query(settings.SYNC_PAGE_SIZE, ge=1, le=5000),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get everything (no token) or only what changed since the token, with tombstones for deletes"""
+    if since is None:
+        return FastJSONResponse(await get_snapshot(db, current_user.id))
+    try:
+        changes = await get_changes(db, current_user.id, since, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except SyncTokenExpired:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Sync token expired; sync again without a token",
+        )
+    return FastJSONResponse(changes)
@@ -4,7 +4,7 @@ from typing import Optional
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_primary_read_db, get_read_db
 from app.schemas.tasting_note import TastingNoteCreate, TastingNoteRead, TastingNoteUpdate
 from app.crud.tasting_note import (
     create_tasting_note,
@@ -20,6 +20,8 @@ from app.crud.tasting_note import (
 from app.crud.bottle import get_bottle_by_id as get_bottle
 from app.dependencies import get_current_user
 from app.models.user import User
+from app.utils.serialization import tasting_note_serializer
+from app.services.note_search_service import SearchUnavailable, search_tasting_notes
 
 router = APIRouter(prefix="/tasting-notes", tags=["tasting-notes"])
 
@@ -49,7 +51,7 @@ async def create_bottle_tasting_note(
 @router.get("/bottles/{bottle_id}", response_model=list[TastingNoteRead])
 async def list_bottle_tasting_notes(
     bottle_id: UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_primary_read_db),
     current_user: User = Depends(get_current_user),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
@@ -64,15 +66,43 @@ async def list_bottle_tasting_notes(
         )
     
     notes = await get_bottle_tasting_notes(
-        db, bottle_id, skip=skip, limit=limit, user_id=current_user.id
+        db,
+        bottle_id,
+        skip=skip,
+        limit=limit,
+        user_id=current_user.id,
+        columns=tasting_note_serializer.columns,
     )
-    return notes
+    return tasting_note_serializer.response(notes)
+
+
+@router.get("/search")
+async def search_notes(
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_primary_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Full-text search over your own notes and notes on publicly shared bottles"""
+    try:
+        return await search_tasting_notes(db, current_user.id, q, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except SearchUnavailable as e:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=str(e),
+        )
 
 
 @router.get("/{tasting_note_id}", response_model=TastingNoteRead)
 async def get_tasting_note(
     tasting_note_id: UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_primary_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get specific tasting note (must be owner)"""
@@ -130,7 +160,7 @@ async def get_user_tasting_stats(
 @router.get("/bottle/{bottle_id}/stats")
 async def get_bottle_tasting_stats(
     bottle_id: UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Get tasting statistics for a bottle (public)"""
     avg_rating = await get_bottle_average_rating(db, bottle_id)
@@ -146,15 +176,17 @@ async def get_bottle_tasting_stats(
 @router.get("/user/{user_id}/notes", response_model=list[TastingNoteRead])
 async def get_user_notes(
     user_id: UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
 ):
     """Get user's tasting notes (public profile)"""
-    notes = await get_user_tasting_notes(db, user_id, skip=skip, limit=limit)
+    notes = await get_user_tasting_notes(
+        db, user_id, skip=skip, limit=limit, columns=tasting_note_serializer.columns
+    )
     if not notes:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found or has no tasting notes",
         )
-    return notes
+    return tasting_note_serializer.response(notes)
@@ -3,7 +3,7 @@
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_primary_read_db
 from app.schemas.user import UserRead, UserUpdate
 from app.crud.user import get_user_by_id, update_user
 from app.dependencies import get_current_user
@@ -13,7 +13,7 @@ router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("/{user_id}", response_model=UserRead)
-async def get_user(user_id: UUID, db: Session = Depends(get_db)):
+async def get_user(user_id: UUID, db: Session = Depends(get_primary_read_db)):
     """Get user profile by ID"""
     user = await get_user_by_id(db, user_id)
     if not user:
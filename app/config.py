@@ -21,6 +21,84 @@ class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./drinkshelf.db"
     DATABASE_POOL_SIZE: int = 10
     DATABASE_MAX_OVERFLOW: int = 20
+    DATABASE_POOL_TIMEOUT: float = 5.0  # seconds to wait for a connection before a 503
+    DATABASE_POOL_RECYCLE: int = 1800  # seconds before a pooled connection is replaced
+
+    # Read replica for read-only routes (see app.database.replica); empty disables it
+    DATABASE_READ_URL: str = ""
+    REPLICA_MAX_LAG: float = 5.0  # seconds
+    REPLICA_CHECK_INTERVAL: float = 5.0  # seconds between health/lag probes
+    REPLICA_STICKY_SECONDS: float = 10.0  # a client's reads after a write stay on the primary
+
+    # Statement timeouts and slow-query log (see app.database.query_guard)
+    STATEMENT_TIMEOUTS_ENABLED: bool = True
+    STATEMENT_TIMEOUT_MS: int = 5000  # budget for routes without a class-specific one
+    SLOW_QUERY_MS: float = 200.0
+    SLOW_QUERY_EXPLAIN_MS: float = 1000.0  # also capture the plan above this
+
+    # SQLite profile for file databases (see app.database.sqlite)
+    SQLITE_TUNED: bool = True  # WAL, pragmas below, single writer + read pool
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # bytes
+    SQLITE_CACHE_SIZE: int = -64000  # negative values are KiB
+    SQLITE_BUSY_TIMEOUT: int = 5000  # milliseconds
+    SQLITE_READ_POOL_SIZE: int = 8
+    SQLITE_WRITE_QUEUE_TIMEOUT: float = 30.0  # seconds to wait for the writer connection
+
+    # Admission control (see app.utils.admission); limits are per worker
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_INITIAL_LIMIT: int = 32
+    ADMISSION_MIN_LIMIT: int = 4
+    ADMISSION_MAX_LIMIT: int = 256
+    ADMISSION_LATENCY_TARGET_MS: float = 250.0
+
+    # Rate limiting (see app.utils.rate_limit); rates are tokens per second
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_RATE: float = 10.0
+    RATE_LIMIT_BURST: int = 200
+    RATE_LIMIT_ANONYMOUS_RATE: float = 2.0
+    RATE_LIMIT_ANONYMOUS_BURST: int = 60
+    RATE_LIMIT_BACKEND_URL: str = ""  # redis://host:6379/0 shares buckets between workers
+
+    # Cache invalidation between workers (see app.utils.invalidation)
+    INVALIDATION_BUS_ENABLED: bool = True
+    INVALIDATION_POLL_INTERVAL: float = 1.0  # seconds; SQLite polling and listener reconnects
+    INVALIDATION_RETENTION: float = 300.0  # seconds SQLite keeps published events
+
+    # Delta sync (see app.services.sync_service)
+    SYNC_PAGE_SIZE: int = 500  # change log entries per /sync page
+    CHANGE_LOG_RETENTION_DAYS: int = 30  # older sync tokens must take a fresh snapshot
+
+    # Live /events streams (see app.utils.live_events)
+    SSE_HEARTBEAT_SECONDS: float = 15.0
+    SSE_RETRY_MS: int = 3000  # client reconnect delay
+    SSE_REPLAY_EVENTS: int = 50  # per user, for Last-Event-ID resumes
+    SSE_MAX_IDLE_CHANNELS: int = 10000  # users without a connection whose buffer is kept
+    SSE_TOKEN_EXPIRE_SECONDS: int = 60  # ?access_token= for EventSource, which cannot send headers
+
+    # Batch endpoints
+    BATCH_MAX_IDS: int = 100
+
+    # Purge of soft-deleted bottles (see app.services.retention_service)
+    BOTTLE_RETENTION_DAYS: int = 30  # deleted bottles stay restorable this long
+    RETENTION_BATCH_SIZE: int = 100  # bottles purged per transaction
+
+    # Dashboard
+    DASHBOARD_CACHE_TTL: int = 60  # seconds
+    DASHBOARD_RECENT_BOTTLES: int = 5
+
+    # Search facets
+    FACET_CACHE_TTL: int = 30  # seconds
+    QUERY_PLAN_CACHE_TTL: int = 300  # seconds
+
+    # Flavor descriptors extracted from tasting notes
+    FLAVOR_DESCRIPTORS: List[str] = [
+        "sweet", "smooth", "spicy", "fruity", "oaky", "vanilla", "caramel",
+        "warm", "dry", "floral", "herbal", "smoky", "peppery", "citrus",
+    ]
+
+    # Collaborative-filtering recommender (trained offline, see app.services.recommender)
+    RECOMMENDER_MODEL_PATH: str = "./models/recommender"
 
     # Security
     SECRET_KEY: str = "your-secret-key-here-use-a-strong-random-string-min-32-chars"
@@ -1,11 +1,50 @@
 """Bottle CRUD operations"""
 
-from typing import Optional, List
+from datetime import datetime
+from typing import Dict, Optional, List, Sequence, Any, Tuple
 from uuid import UUID
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from app.models.bottle import Bottle
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, defer
+from sqlalchemy import and_, update
+from app.models.bottle import Bottle, HEAVY_COLUMNS
 from app.schemas.bottle import BottleCreate, BottleUpdate
+from app.crud.catalog_product import match_product
+from app.crud.change_log import BOTTLE, record_change
+from app.crud.dimension import DIMENSION_COLUMNS, NEW_DIMENSIONS, assign_dimensions
+from app.crud.user_stats import apply_bottle_delta, apply_note_delta
+from app.utils.invalidation import BOTTLE_CHANGED, publish
+
+
+# Bottle fields that decide which catalog product a bottle belongs to
+PRODUCT_MATCH_FIELDS = frozenset(("name", "distillery", "spirit_type"))
+DIMENSION_TEXT_FIELDS = frozenset(text for text, _ in DIMENSION_COLUMNS.values())
+
+
+def defer_heavy_columns() -> list:
+    """Loader options deferring heavy bottle columns on list queries"""
+    return [defer(getattr(Bottle, name)) for name in HEAVY_COLUMNS]
+
+
+def suggest_terms(bottle: Optional[Bottle]) -> dict:
+    """Field values a bottle contributes to the search suggestion index"""
+    from app.services.suggest_service import SUGGEST_FIELDS
+    
+    return {field: getattr(bottle, field) for field in SUGGEST_FIELDS} if bottle else {}
+
+
+async def record_bottle_change(db: Session, bottle: Bottle, action: str, old_terms: dict, new_terms: dict) -> None:
+    """Log a bottle write for sync and tell caches once the transaction commits"""
+    await record_change(db, bottle.user_id, BOTTLE, bottle.id, deleted=action == "deleted")
+    publish(
+        db,
+        BOTTLE_CHANGED,
+        action,
+        user_id=bottle.user_id,
+        bottle_id=bottle.id,
+        old_terms=old_terms,
+        new_terms=new_terms,
+        new_dimensions=bool(db.info.get(NEW_DIMENSIONS)),
+    )
 
 
 async def create_bottle(db: Session, user_id: UUID, bottle_in: BottleCreate) -> Bottle:
@@ -28,7 +67,12 @@ async def create_bottle(db: Session, user_id: UUID, bottle_in: BottleCreate) ->
         rating=bottle_in.rating,
         image_url=bottle_in.image_url,
     )
+    await assign_dimensions(db, db_bottle)
+    await match_product(db, db_bottle)
     db.add(db_bottle)
+    await apply_bottle_delta(db, user_id, db_bottle.spirit_type, 1, db_bottle.rating)
+    db.flush()
+    await record_bottle_change(db, db_bottle, "created", {}, suggest_terms(db_bottle))
     db.commit()
     db.refresh(db_bottle)
     return db_bottle
@@ -45,6 +89,21 @@ async def get_bottle_by_id(db: Session, bottle_id: UUID, user_id: Optional[UUID]
     return query.first()
 
 
+async def get_bottles_by_ids(
+    db: Session,
+    bottle_ids: Sequence[UUID],
+    user_id: UUID,
+    columns: Optional[Sequence[Any]] = None,
+) -> List[Bottle]:
+    """Get the user's bottles among the given IDs in a single query"""
+    query = db.query(*columns) if columns else db.query(Bottle)
+    return query.filter(
+        Bottle.id.in_(bottle_ids),
+        Bottle.user_id == user_id,
+        Bottle.deleted_at == None
+    ).all()
+
+
 async def get_user_bottles(
     db: Session,
     user_id: UUID,
@@ -52,9 +111,18 @@ async def get_user_bottles(
     limit: int = 50,
     spirit_type: Optional[str] = None,
     min_rating: Optional[int] = None,
+    columns: Optional[Sequence[Any]] = None,
 ) -> List[Bottle]:
-    """Get all bottles for a user with optional filtering"""
-    query = db.query(Bottle).filter(
+    """Get all bottles for a user with optional filtering
+
+    When ``columns`` is given only those columns are selected and plain rows
+    are returned instead of ORM objects.
+    """
+    if columns:
+        query = db.query(*columns)
+    else:
+        query = db.query(Bottle).options(*defer_heavy_columns())
+    query = query.filter(
         Bottle.user_id == user_id,
         Bottle.deleted_at == None
     )
@@ -85,34 +153,153 @@ async def get_user_bottles_count(
     return query.count()
 
 
+def summarize_bottle_stats(stats, spirits) -> dict:
+    """Bottle statistics from a user's counter rows"""
+    return {
+        "total_bottles": stats.bottle_count,
+        "average_rating": (
+            stats.bottle_rating_sum / stats.rated_bottle_count
+            if stats.rated_bottle_count else None
+        ),
+        "spirit_breakdown": [
+            {"spirit_type": str(spirit.spirit_type), "count": spirit.bottle_count}
+            for spirit in spirits
+            if spirit.bottle_count > 0
+        ],
+    }
+
+
+async def get_user_bottle_stats(db: Session, user_id: UUID) -> dict:
+    """Get statistics about a user's bottle collection from the maintained counters"""
+    from app.crud.user_stats import get_user_stats
+    
+    stats, spirits = await get_user_stats(db, user_id)
+    return summarize_bottle_stats(stats, spirits)
+
+
 async def update_bottle(db: Session, bottle_id: UUID, user_id: UUID, bottle_in: BottleUpdate) -> Optional[Bottle]:
     """Update bottle (must be owner)"""
     db_bottle = await get_bottle_by_id(db, bottle_id, user_id)
     if not db_bottle:
         return None
     
+    old_spirit_type, old_rating = db_bottle.spirit_type, db_bottle.rating
+    old_terms = suggest_terms(db_bottle)
     update_data = bottle_in.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_bottle, field, value)
     
+    if (db_bottle.spirit_type, db_bottle.rating) != (old_spirit_type, old_rating):
+        await apply_bottle_delta(db, user_id, old_spirit_type, -1, old_rating)
+        await apply_bottle_delta(db, user_id, db_bottle.spirit_type, 1, db_bottle.rating)
+    if db_bottle.spirit_type != old_spirit_type:
+        await _move_note_stats(db, bottle_id, old_spirit_type, db_bottle.spirit_type)
+    if DIMENSION_TEXT_FIELDS.intersection(update_data):
+        await assign_dimensions(db, db_bottle)
+    if PRODUCT_MATCH_FIELDS.intersection(update_data):
+        await match_product(db, db_bottle)
+    
     db.add(db_bottle)
+    await record_bottle_change(db, db_bottle, "updated", old_terms, suggest_terms(db_bottle))
     db.commit()
     db.refresh(db_bottle)
     return db_bottle
 
 
-async def soft_delete_bottle(db: Session, bottle_id: UUID, user_id: UUID) -> bool:
-    """Soft delete a bottle (mark as deleted, don't remove)"""
-    from datetime import datetime
+async def _move_note_stats(db: Session, bottle_id: UUID, old_spirit_type, new_spirit_type) -> None:
+    """Move a bottle's tasting note counters to its new spirit type"""
+    from sqlalchemy import func
+    from app.models.tasting_note import TastingNote
     
-    db_bottle = await get_bottle_by_id(db, bottle_id, user_id)
-    if not db_bottle:
-        return False
+    rows = db.query(
+        TastingNote.user_id,
+        func.count(TastingNote.id),
+        func.count(TastingNote.rating),
+        func.coalesce(func.sum(TastingNote.rating), 0),
+    ).filter(
+        TastingNote.bottle_id == bottle_id
+    ).group_by(TastingNote.user_id).all()
     
-    db_bottle.deleted_at = datetime.utcnow()
-    db.add(db_bottle)
+    for note_user_id, count, rated, rating_sum in rows:
+        for spirit_type, sign in ((old_spirit_type, -1), (new_spirit_type, 1)):
+            await apply_note_delta(
+                db,
+                note_user_id,
+                spirit_type,
+                sign,
+                count=count,
+                rated_count=rated,
+                rating_sum=int(rating_sum),
+            )
+
+
+async def _set_deleted_at(
+    db: Session,
+    bottle_ids: Sequence[UUID],
+    user_id: UUID,
+    deleted_at: Optional[datetime],
+) -> List[Row]:
+    """Soft delete (or restore, with None) the user's bottles in one UPDATE
+
+    Only bottles whose state actually changes are updated; their counter
+    and suggestion fields come back via RETURNING.
+    """
+    from app.services.suggest_service import SUGGEST_FIELDS
+    
+    changing = Bottle.deleted_at == None if deleted_at else Bottle.deleted_at != None
+    statement = update(Bottle).where(
+        Bottle.id.in_(bottle_ids),
+        Bottle.user_id == user_id,
+        changing,
+    ).values(deleted_at=deleted_at).returning(
+        Bottle.id,
+        Bottle.user_id,
+        Bottle.spirit_type,
+        Bottle.rating,
+        *(getattr(Bottle, field) for field in SUGGEST_FIELDS),
+    )
+    return db.execute(statement, execution_options={"synchronize_session": False}).all()
+
+
+async def _apply_bottles_delta(db: Session, user_id: UUID, rows: Sequence[Row], sign: int) -> None:
+    """Count several bottles in or out of the user's stats, one update per spirit type"""
+    totals: Dict[Any, Tuple[int, int, int]] = {}
+    for row in rows:
+        count, rated, rating_sum = totals.get(row.spirit_type, (0, 0, 0))
+        totals[row.spirit_type] = (
+            count + 1,
+            rated + (row.rating is not None),
+            rating_sum + (row.rating or 0),
+        )
+    for spirit_type, (count, rated, rating_sum) in totals.items():
+        await apply_bottle_delta(
+            db, user_id, spirit_type, sign, count=count, rated_count=rated, rating_sum=rating_sum
+        )
+
+
+async def soft_delete_bottles(db: Session, bottle_ids: Sequence[UUID], user_id: UUID) -> List[UUID]:
+    """Soft delete several of the user's bottles, returning the IDs that were deleted"""
+    rows = await _set_deleted_at(db, bottle_ids, user_id, datetime.utcnow())
+    await _apply_bottles_delta(db, user_id, rows, -1)
+    for row in rows:
+        await record_bottle_change(db, row, "deleted", suggest_terms(row), {})
+    db.commit()
+    return [row.id for row in rows]
+
+
+async def restore_bottles(db: Session, bottle_ids: Sequence[UUID], user_id: UUID) -> List[UUID]:
+    """Undo the soft delete of several of the user's bottles, returning the IDs restored"""
+    rows = await _set_deleted_at(db, bottle_ids, user_id, None)
+    await _apply_bottles_delta(db, user_id, rows, 1)
+    for row in rows:
+        await record_bottle_change(db, row, "restored", {}, suggest_terms(row))
     db.commit()
-    return True
+    return [row.id for row in rows]
+
+
+async def soft_delete_bottle(db: Session, bottle_id: UUID, user_id: UUID) -> bool:
+    """Soft delete a bottle (mark as deleted, don't remove)"""
+    return bool(await soft_delete_bottles(db, [bottle_id], user_id))
 
 
 async def update_bottle_ai_details(
@@ -121,13 +308,16 @@ async def update_bottle_ai_details(
     user_id: UUID,
     ai_details: dict
 ) -> Optional[Bottle]:
-    """Update bottle with AI research details"""
+    """Update bottle with AI research details, sharing them with its catalog product"""
     db_bottle = await get_bottle_by_id(db, bottle_id, user_id)
     if not db_bottle:
         return None
     
     db_bottle.ai_details = ai_details
+    if db_bottle.product is not None and db_bottle.product.ai_details is None:
+        db_bottle.product.ai_details = ai_details
     db.add(db_bottle)
+    await record_bottle_change(db, db_bottle, "researched", {}, {})
     db.commit()
     db.refresh(db_bottle)
     return db_bottle
@@ -0,0 +1,100 @@
+"""Catalog product CRUD operations"""
+
+from typing import Optional, Dict, Iterable
+from uuid import UUID
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.bottle import Bottle
+from app.models.catalog_product import CatalogProduct
+from app.utils.catalog import product_match_key
+
+# Bottle attributes copied onto a product when the product has none yet
+PRODUCT_FIELDS = (
+    "proof",
+    "age_statement",
+    "region",
+    "country",
+    "distillery_id",
+    "region_id",
+    "country_id",
+)
+
+
+def _fill_missing(product: CatalogProduct, bottle: Bottle) -> None:
+    """Complete a product's optional attributes from a matched bottle"""
+    for field in PRODUCT_FIELDS:
+        if getattr(product, field) is None and getattr(bottle, field) is not None:
+            setattr(product, field, getattr(bottle, field))
+
+
+def _new_product(bottle: Bottle, match_key: str) -> CatalogProduct:
+    product = CatalogProduct(
+        match_key=match_key,
+        name=bottle.name,
+        spirit_type=bottle.spirit_type,
+        distillery=bottle.distillery,
+    )
+    _fill_missing(product, bottle)
+    return product
+
+
+async def match_product(db: Session, bottle: Bottle) -> CatalogProduct:
+    """Find or create the catalog product for a bottle and link it
+
+    The insert runs in a savepoint so a concurrent writer creating the same
+    product resolves to the existing row instead of failing the request.
+    """
+    match_key = product_match_key(bottle.name, bottle.distillery, bottle.spirit_type)
+    product = db.query(CatalogProduct).filter(CatalogProduct.match_key == match_key).first()
+    if product is None:
+        try:
+            with db.begin_nested():
+                product = _new_product(bottle, match_key)
+                db.add(product)
+        except IntegrityError:
+            product = db.query(CatalogProduct).filter(
+                CatalogProduct.match_key == match_key
+            ).one()
+    _fill_missing(product, bottle)
+    bottle.product = product
+    return product
+
+
+async def match_products(db: Session, bottles: Iterable[Bottle]) -> int:
+    """Link a batch of bottles to products with one lookup query; returns products created"""
+    bottles = list(bottles)
+    keys = {
+        bottle.id: product_match_key(bottle.name, bottle.distillery, bottle.spirit_type)
+        for bottle in bottles
+    }
+    products: Dict[str, CatalogProduct] = {
+        product.match_key: product
+        for product in db.query(CatalogProduct).filter(
+            CatalogProduct.match_key.in_(set(keys.values()))
+        ).all()
+    }
+    created = 0
+    for bottle in bottles:
+        match_key = keys[bottle.id]
+        product = products.get(match_key)
+        if product is None:
+            product = products[match_key] = _new_product(bottle, match_key)
+            db.add(product)
+            created += 1
+        _fill_missing(product, bottle)
+        bottle.product = product
+    return created
+
+
+async def get_product_by_id(db: Session, product_id: UUID) -> Optional[CatalogProduct]:
+    """Get catalog product by ID"""
+    return db.query(CatalogProduct).filter(CatalogProduct.id == product_id).first()
+
+
+async def get_product_ai_details(db: Session, product_id: Optional[UUID]) -> Optional[dict]:
+    """Get research already stored for a product, if any"""
+    if product_id is None:
+        return None
+    return db.query(CatalogProduct.ai_details).filter(
+        CatalogProduct.id == product_id
+    ).scalar()
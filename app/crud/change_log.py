@@ -0,0 +1,38 @@
+"""Change log operations"""
+
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.models.change_log import ChangeLogEntry
+
+BOTTLE = "bottle"
+NOTE = "note"
+COLLECTION = "collection"
+MEMBERSHIP = "membership"
+
+
+def user_lock_key(user_id: UUID) -> int:
+    """Signed 64-bit advisory lock key for a user"""
+    return int.from_bytes(user_id.bytes[:8], "big", signed=True)
+
+
+async def record_change(
+    db: Session,
+    user_id: UUID,
+    entity: str,
+    entity_id: UUID,
+    deleted: bool = False,
+    parent_id: Optional[UUID] = None,
+) -> None:
+    """Append a change log entry in the current transaction"""
+    if db.get_bind().dialect.name == "postgresql":
+        # Held until commit, so this user's entries take ids in commit order
+        db.execute(select(func.pg_advisory_xact_lock(user_lock_key(user_id))))
+    db.add(ChangeLogEntry(
+        user_id=user_id,
+        entity=entity,
+        entity_id=entity_id,
+        parent_id=parent_id,
+        deleted=deleted,
+    ))
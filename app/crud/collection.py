@@ -1,10 +1,12 @@
 """Collection CRUD operations"""
 
-from typing import Optional, List
+from typing import Optional, List, Sequence, Any
 from uuid import UUID
 from sqlalchemy.orm import Session
 from app.models.collection import Collection
 from app.schemas.collection import CollectionCreate, CollectionUpdate
+from app.crud.change_log import COLLECTION, MEMBERSHIP, record_change
+from app.utils.invalidation import COLLECTION_CHANGED, publish
 
 
 async def create_collection(db: Session, user_id: UUID, collection_in: CollectionCreate) -> Collection:
@@ -16,6 +18,9 @@ async def create_collection(db: Session, user_id: UUID, collection_in: Collectio
         is_public=collection_in.is_public,
     )
     db.add(db_collection)
+    db.flush()
+    await record_change(db, user_id, COLLECTION, db_collection.id)
+    publish(db, COLLECTION_CHANGED, "created", user_id=user_id, collection_id=str(db_collection.id))
     db.commit()
     db.refresh(db_collection)
     return db_collection
@@ -29,14 +34,32 @@ async def get_collection_by_id(db: Session, collection_id: UUID, user_id: Option
     return query.first()
 
 
+async def get_collections_by_ids(
+    db: Session,
+    collection_ids: Sequence[UUID],
+    user_id: UUID,
+    columns: Optional[Sequence[Any]] = None,
+) -> List[Collection]:
+    """Get collections among the given IDs that the user owns or that are public"""
+    from sqlalchemy import or_
+    
+    query = db.query(*columns) if columns else db.query(Collection)
+    return query.filter(
+        Collection.id.in_(collection_ids),
+        or_(Collection.user_id == user_id, Collection.is_public == True),
+    ).all()
+
+
 async def get_user_collections(
     db: Session,
     user_id: UUID,
     skip: int = 0,
     limit: int = 50,
+    columns: Optional[Sequence[Any]] = None,
 ) -> List[Collection]:
-    """Get all collections for a user"""
-    return db.query(Collection).filter(
+    """Get all collections for a user (plain rows when ``columns`` is given)"""
+    query = db.query(*columns) if columns else db.query(Collection)
+    return query.filter(
         Collection.user_id == user_id
     ).order_by(Collection.created_at.desc()).offset(skip).limit(limit).all()
 
@@ -45,9 +68,11 @@ async def get_public_collections(
     db: Session,
     skip: int = 0,
     limit: int = 50,
+    columns: Optional[Sequence[Any]] = None,
 ) -> List[Collection]:
-    """Get all public collections"""
-    return db.query(Collection).filter(
+    """Get all public collections (plain rows when ``columns`` is given)"""
+    query = db.query(*columns) if columns else db.query(Collection)
+    return query.filter(
         Collection.is_public == True
     ).order_by(Collection.created_at.desc()).offset(skip).limit(limit).all()
 
@@ -68,6 +93,8 @@ async def update_collection(
         setattr(db_collection, field, value)
     
     db.add(db_collection)
+    await record_change(db, user_id, COLLECTION, collection_id)
+    publish(db, COLLECTION_CHANGED, "updated", user_id=user_id, collection_id=str(collection_id))
     db.commit()
     db.refresh(db_collection)
     return db_collection
@@ -79,6 +106,8 @@ async def delete_collection(db: Session, collection_id: UUID, user_id: UUID) ->
     if not db_collection:
         return False
     
+    await record_change(db, user_id, COLLECTION, collection_id, deleted=True)
+    publish(db, COLLECTION_CHANGED, "deleted", user_id=user_id, collection_id=str(collection_id))
     db.delete(db_collection)
     db.commit()
     return True
@@ -108,6 +137,11 @@ async def add_bottle_to_collection(
     
     db_collection.bottles.append(bottle)
     db.add(db_collection)
+    await record_change(db, user_id, MEMBERSHIP, bottle_id, parent_id=collection_id)
+    publish(
+        db, COLLECTION_CHANGED, "bottle_added", user_id=user_id, bottle_id=bottle_id,
+        collection_id=str(collection_id),
+    )
     db.commit()
     return True
 
@@ -131,5 +165,10 @@ async def remove_bottle_from_collection(
     
     db_collection.bottles.remove(bottle)
     db.add(db_collection)
+    await record_change(db, user_id, MEMBERSHIP, bottle_id, deleted=True, parent_id=collection_id)
+    publish(
+        db, COLLECTION_CHANGED, "bottle_removed", user_id=user_id, bottle_id=bottle_id,
+        collection_id=str(collection_id),
+    )
     db.commit()
     return True
@@ -0,0 +1,157 @@
+"""Distillery, region and country dimension operations
+
+Free-text distillery/region/country values are resolved to integer keys at
+write time so filters and GROUP BYs run on small indexed integers. Lookups
+go through built-in spellings, then the ``dimension_aliases`` table, then
+the normalized dimension key.
+"""
+
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.dimension import Distillery, Region, Country, DimensionAlias
+from app.utils.catalog import normalize_tokens
+from app.utils.invalidation import DIMENSION_CHANGED, publish, subscribe
+
+DIMENSIONS = {"distillery": Distillery, "region": Region, "country": Country}
+
+# Text column and key column on bottles and catalog products for each dimension
+DIMENSION_COLUMNS = {
+    "distillery": ("distillery", "distillery_id"),
+    "region": ("region", "region_id"),
+    "country": ("country", "country_id"),
+}
+
+# Common spellings resolved without an alias row, keyed by normalized alias
+BUILTIN_ALIASES = {
+    "distillery": {},
+    "region": {
+        "ky": "Kentucky",
+        "tn": "Tennessee",
+        "highland": "Highlands",
+        "lowland": "Lowlands",
+    },
+    "country": {
+        "us": "United States",
+        "usa": "United States",
+        "u s": "United States",
+        "u s a": "United States",
+        "united states of america": "United States",
+        "america": "United States",
+        "uk": "United Kingdom",
+        "u k": "United Kingdom",
+        "great britain": "United Kingdom",
+        "britain": "United Kingdom",
+    },
+}
+
+# Session.info entry holding dimensions created in the current session, which
+# must not be cached process-wide until they are known to be committed
+NEW_DIMENSIONS = "new_dimensions"
+
+# (kind, normalized key) -> dimension id; dimension rows are never deleted,
+# but aliases can be repointed, which every worker hears about over the bus
+_resolved: Dict[Tuple[str, str], int] = {}
+
+
+def dimension_key(value: Optional[str]) -> str:
+    """Normalized key a dimension name or alias is stored under"""
+    return " ".join(normalize_tokens(value))
+
+
+def canonical_dimension(kind: str, value: str) -> Tuple[str, str]:
+    """Normalized key and display name after applying built-in aliases"""
+    key = dimension_key(value)
+    builtin = BUILTIN_ALIASES[kind].get(key)
+    if builtin:
+        return dimension_key(builtin), builtin
+    return key, value.strip()
+
+
+async def find_dimension_id(db: Session, kind: str, value: Optional[str]) -> Optional[int]:
+    """Resolve a name or alias to its dimension key without creating it"""
+    if not value:
+        return None
+    key, _ = canonical_dimension(kind, value)
+    if not key:
+        return None
+    cached = _resolved.get((kind, key))
+    if cached is not None:
+        return cached
+
+    model = DIMENSIONS[kind]
+    dimension_id = db.query(DimensionAlias.target_id).filter(
+        DimensionAlias.kind == kind,
+        DimensionAlias.alias == key,
+    ).scalar()
+    if dimension_id is None:
+        dimension_id = db.query(model.id).filter(model.key == key).scalar()
+    if dimension_id is not None and (kind, key) not in db.info.get(NEW_DIMENSIONS, ()):
+        _resolved[(kind, key)] = dimension_id
+    return dimension_id
+
+
+async def resolve_dimension(db: Session, kind: str, value: Optional[str]) -> Optional[int]:
+    """Resolve a name or alias to its dimension key, creating the dimension if new"""
+    dimension_id = await find_dimension_id(db, kind, value)
+    if dimension_id is not None or not value:
+        return dimension_id
+    key, name = canonical_dimension(kind, value)
+    if not key:
+        return None
+
+    model = DIMENSIONS[kind]
+    try:
+        with db.begin_nested():
+            row = model(key=key, name=name)
+            db.add(row)
+    except IntegrityError:
+        # Created concurrently by another writer
+        return db.query(model.id).filter(model.key == key).scalar()
+    db.info.setdefault(NEW_DIMENSIONS, set()).add((kind, key))
+    return row.id
+
+
+async def find_dimension_ids(db: Session, kind: str, value: str) -> List[int]:
+    """Keys matching a filter value: the exact/alias match, else names containing it"""
+    dimension_id = await find_dimension_id(db, kind, value)
+    if dimension_id is not None:
+        return [dimension_id]
+    model = DIMENSIONS[kind]
+    return [
+        row[0] for row in db.query(model.id).filter(model.name.ilike(f"%{value.strip()}%")).all()
+    ]
+
+
+async def assign_dimensions(db: Session, target) -> None:
+    """Set the dimension key columns of a bottle or catalog product from its text columns"""
+    for kind, (text_column, key_column) in DIMENSION_COLUMNS.items():
+        setattr(target, key_column, await resolve_dimension(db, kind, getattr(target, text_column)))
+
+
+async def add_dimension_alias(db: Session, kind: str, alias: str, target: str) -> int:
+    """Map an alternative spelling to a dimension, creating the target if new
+
+    Rows already keyed under the alias keep their old key until the
+    dimension backfill is re-run.
+    """
+    target_id = await resolve_dimension(db, kind, target)
+    key = dimension_key(alias)
+    existing = db.query(DimensionAlias).filter(
+        DimensionAlias.kind == kind,
+        DimensionAlias.alias == key,
+    ).first()
+    if existing is None:
+        db.add(DimensionAlias(kind=kind, alias=key, target_id=target_id))
+    else:
+        existing.target_id = target_id
+    _resolved.pop((kind, key), None)
+    publish(db, DIMENSION_CHANGED, "alias_added", kind=kind, alias=key)
+    return target_id
+
+
+def _forget_alias(event) -> None:
+    _resolved.pop((event.data["kind"], event.data["alias"]), None)
+
+
+subscribe([DIMENSION_CHANGED], _forget_alias, resync=_resolved.clear)
@@ -1,10 +1,38 @@
 """Tasting Note CRUD operations"""
 
-from typing import Optional, List
+from typing import Optional, List, Sequence, Any, Dict
 from uuid import UUID
 from sqlalchemy.orm import Session
 from app.models.tasting_note import TastingNote
 from app.schemas.tasting_note import TastingNoteCreate, TastingNoteUpdate
+from app.crud.change_log import NOTE, record_change
+from app.crud.user_stats import apply_note_delta
+from app.utils.descriptors import DESCRIPTOR_FIELDS, build_note_descriptors
+from app.utils.invalidation import NOTE_CHANGED, publish
+from app.models.bottle import Bottle
+
+
+DESCRIPTOR_FIELDS_SET = frozenset(DESCRIPTOR_FIELDS)
+SEARCH_TEXT_FIELDS = frozenset(("nose", "palate", "finish", "overall_notes"))
+
+
+def index_note_text(db: Session, note: TastingNote) -> None:
+    """Write a note's full-text search entry in the current transaction"""
+    from app.services.note_search_service import index_tasting_note
+    
+    index_tasting_note(db, note)
+
+
+def remove_note_text(db: Session, note_id: UUID) -> None:
+    """Drop a note's full-text search entry in the current transaction"""
+    from app.services.note_search_service import remove_tasting_note
+    
+    remove_tasting_note(db, note_id)
+
+
+def _bottle_spirit_type(db: Session, bottle_id: UUID):
+    """Get the spirit type a tasting note's counters are filed under"""
+    return db.query(Bottle.spirit_type).filter(Bottle.id == bottle_id).scalar()
 
 
 async def create_tasting_note(
@@ -24,7 +52,18 @@ async def create_tasting_note(
         rating=tasting_note_in.rating,
         tasted_date=tasting_note_in.tasted_date,
     )
+    db_note.descriptors = build_note_descriptors(db_note)
     db.add(db_note)
+    await apply_note_delta(
+        db, user_id, _bottle_spirit_type(db, bottle_id), 1, rating=db_note.rating
+    )
+    db.flush()
+    index_note_text(db, db_note)
+    await record_change(db, user_id, NOTE, db_note.id)
+    publish(
+        db, NOTE_CHANGED, "created", user_id=user_id, bottle_id=bottle_id,
+        note_id=str(db_note.id), descriptors_changed=True,
+    )
     db.commit()
     db.refresh(db_note)
     return db_note
@@ -42,15 +81,31 @@ async def get_tasting_note_by_id(
     return query.first()
 
 
+async def get_tasting_notes_by_ids(
+    db: Session,
+    tasting_note_ids: Sequence[UUID],
+    user_id: UUID,
+    columns: Optional[Sequence[Any]] = None,
+) -> List[TastingNote]:
+    """Get the user's tasting notes among the given IDs in a single query"""
+    query = db.query(*columns) if columns else db.query(TastingNote)
+    return query.filter(
+        TastingNote.id.in_(tasting_note_ids),
+        TastingNote.user_id == user_id,
+    ).all()
+
+
 async def get_bottle_tasting_notes(
     db: Session,
     bottle_id: UUID,
     skip: int = 0,
     limit: int = 50,
     user_id: Optional[UUID] = None,  # If provided, get only user's notes
+    columns: Optional[Sequence[Any]] = None,
 ) -> List[TastingNote]:
-    """Get tasting notes for a bottle"""
-    query = db.query(TastingNote).filter(TastingNote.bottle_id == bottle_id)
+    """Get tasting notes for a bottle (plain rows when ``columns`` is given)"""
+    query = db.query(*columns) if columns else db.query(TastingNote)
+    query = query.filter(TastingNote.bottle_id == bottle_id)
     
     if user_id:
         query = query.filter(TastingNote.user_id == user_id)
@@ -63,9 +118,11 @@ async def get_user_tasting_notes(
     user_id: UUID,
     skip: int = 0,
     limit: int = 50,
+    columns: Optional[Sequence[Any]] = None,
 ) -> List[TastingNote]:
-    """Get all tasting notes created by a user"""
-    return db.query(TastingNote).filter(
+    """Get all tasting notes created by a user (plain rows when ``columns`` is given)"""
+    query = db.query(*columns) if columns else db.query(TastingNote)
+    return query.filter(
         TastingNote.user_id == user_id
     ).order_by(TastingNote.created_at.desc()).offset(skip).limit(limit).all()
 
@@ -81,11 +138,29 @@ async def update_tasting_note(
     if not db_note:
         return None
     
+    old_rating = db_note.rating
     update_data = tasting_note_in.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_note, field, value)
     
+    descriptors_changed = bool(DESCRIPTOR_FIELDS_SET.intersection(update_data))
+    if descriptors_changed:
+        db_note.descriptors = build_note_descriptors(db_note)
+    
+    if db_note.rating != old_rating:
+        spirit_type = _bottle_spirit_type(db, db_note.bottle_id)
+        await apply_note_delta(db, user_id, spirit_type, -1, rating=old_rating)
+        await apply_note_delta(db, user_id, spirit_type, 1, rating=db_note.rating)
+    
     db.add(db_note)
+    if SEARCH_TEXT_FIELDS.intersection(update_data):
+        db.flush()
+        index_note_text(db, db_note)
+    await record_change(db, user_id, NOTE, db_note.id)
+    publish(
+        db, NOTE_CHANGED, "updated", user_id=user_id, bottle_id=db_note.bottle_id,
+        note_id=str(db_note.id), descriptors_changed=descriptors_changed,
+    )
     db.commit()
     db.refresh(db_note)
     return db_note
@@ -101,6 +176,16 @@ async def delete_tasting_note(
     if not db_note:
         return False
     
+    bottle_id = db_note.bottle_id
+    await apply_note_delta(
+        db, user_id, _bottle_spirit_type(db, bottle_id), -1, rating=db_note.rating
+    )
+    remove_note_text(db, db_note.id)
+    await record_change(db, user_id, NOTE, db_note.id, deleted=True)
+    publish(
+        db, NOTE_CHANGED, "deleted", user_id=user_id, bottle_id=bottle_id,
+        note_id=str(db_note.id), descriptors_changed=True,
+    )
     db.delete(db_note)
     db.commit()
     return True
@@ -133,40 +218,62 @@ async def get_bottle_tasting_note_count(
     ).count()
 
 
-async def get_user_tasting_statistics(
+async def get_bottles_tasting_stats(
     db: Session,
-    user_id: UUID,
-) -> dict:
-    """Get tasting statistics for a user"""
+    bottle_ids: Sequence[UUID],
+) -> Dict[UUID, dict]:
+    """Get average rating and note count for several bottles in one query
+
+    Bottles that don't exist or are deleted are left out.
+    """
     from sqlalchemy import func
     
-    # Total tasting notes
-    total_notes = db.query(TastingNote).filter(
-        TastingNote.user_id == user_id
-    ).count()
-    
-    # Average rating given
-    avg_rating = db.query(
-        func.avg(TastingNote.rating)
+    rows = db.query(
+        Bottle.id,
+        func.avg(TastingNote.rating),
+        func.count(TastingNote.id),
+    ).outerjoin(
+        TastingNote, TastingNote.bottle_id == Bottle.id
     ).filter(
-        TastingNote.user_id == user_id,
-        TastingNote.rating != None,
-    ).scalar()
+        Bottle.id.in_(bottle_ids),
+        Bottle.deleted_at == None
+    ).group_by(Bottle.id).all()
     
-    # Most tasted spirit type (join with bottles)
-    from app.models.bottle import Bottle
-    most_tasted = db.query(
-        Bottle.spirit_type,
-        func.count(TastingNote.id).label("count")
-    ).join(
-        Bottle, TastingNote.bottle_id == Bottle.id
-    ).filter(
-        TastingNote.user_id == user_id
-    ).group_by(Bottle.spirit_type).order_by(func.count(TastingNote.id).desc()).first()
+    return {
+        bottle_id: {
+            "bottle_id": bottle_id,
+            "average_rating": float(avg_rating) if avg_rating else None,
+            "total_tasting_notes": count,
+        }
+        for bottle_id, avg_rating, count in rows
+    }
+
+
+def summarize_tasting_stats(stats, spirits) -> dict:
+    """Tasting statistics from a user's counter rows"""
+    # Most tasted spirit type
+    most_tasted = max(
+        (spirit for spirit in spirits if spirit.note_count > 0),
+        key=lambda spirit: spirit.note_count,
+        default=None,
+    )
     
     return {
-        "total_tasting_notes": total_notes,
-        "average_rating": float(avg_rating) if avg_rating else None,
-        "most_tasted_spirit": str(most_tasted[0]) if most_tasted else None,
-        "most_tasted_count": most_tasted[1] if most_tasted else 0,
+        "total_tasting_notes": stats.note_count,
+        "average_rating": (
+            stats.note_rating_sum / stats.rated_note_count if stats.rated_note_count else None
+        ),
+        "most_tasted_spirit": str(most_tasted.spirit_type) if most_tasted else None,
+        "most_tasted_count": most_tasted.note_count if most_tasted else 0,
     }
+
+
+async def get_user_tasting_statistics(
+    db: Session,
+    user_id: UUID,
+) -> dict:
+    """Get tasting statistics for a user from the maintained counters"""
+    from app.crud.user_stats import get_user_stats
+    
+    stats, spirits = await get_user_stats(db, user_id)
+    return summarize_tasting_stats(stats, spirits)
@@ -5,6 +5,7 @@ from uuid import UUID
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
+from app.utils.invalidation import USER_CHANGED, publish
 from app.utils.security import get_password_hash, verify_password
 
 
@@ -48,6 +49,7 @@ async def update_user(db: Session, user_id: UUID, user_in: UserUpdate) -> Option
         setattr(db_user, field, value)
     
     db.add(db_user)
+    publish(db, USER_CHANGED, "updated", user_id=user_id)
     db.commit()
     db.refresh(db_user)
     return db_user
@@ -0,0 +1,198 @@
+"""User statistics counter operations
+
+The bottle and tasting note CRUD functions call these before committing,
+so the counters change in the same transaction as the rows they describe.
+
+Counters only hold deltas once a user has a ``user_stats`` row. For a user
+without one (say, whose data predates the counters), a delta alone would
+be wrong, so the deltas are held on the session and the user's counters
+are rebuilt from raw rows just before commit, when every write of the
+transaction is visible. On Postgres the rebuild runs under the user's
+advisory lock, so concurrent first writes can't both insert the row.
+"""
+
+from datetime import datetime
+from typing import Optional, List, Tuple
+from uuid import UUID
+from sqlalchemy import event, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.crud.change_log import user_lock_key
+from app.models.bottle import SpiritType
+from app.models.user_stats import UserStats, UserSpiritStats
+
+COUNTED = "stats_counted"  # Session.info key: users known to have counters
+DEFERRED = "stats_deferred"  # Session.info key: held deltas of users without counters
+UPSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _add_to_row(db: Session, model, keys: dict, deltas: dict) -> None:
+    """Add deltas to a counter row in one statement, creating the row if missing"""
+    table = model.__table__
+    insert = UPSERTS.get(db.get_bind().dialect.name)
+    if insert is None:
+        query = db.query(model)
+        for field, value in keys.items():
+            query = query.filter(getattr(model, field) == value)
+        updated = query.update(
+            {getattr(model, field): getattr(model, field) + value for field, value in deltas.items()},
+            synchronize_session=False,
+        )
+        if not updated:
+            db.add(model(**keys, **deltas))
+            db.flush()
+        return
+
+    statement = insert(table).values(**keys, **deltas)
+    changes = {field: table.c[field] + statement.excluded[field] for field in deltas}
+    if "updated_at" in table.c:
+        changes["updated_at"] = datetime.utcnow()
+    db.execute(statement.on_conflict_do_update(index_elements=list(keys), set_=changes))
+
+
+def _lock_user(db: Session, user_id: UUID) -> None:
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(select(func.pg_advisory_xact_lock(user_lock_key(user_id))))
+
+
+def _has_counters(db: Session, user_id: UUID) -> bool:
+    return db.query(UserStats.user_id).filter(UserStats.user_id == user_id).first() is not None
+
+
+def _increment(db: Session, model, keys: dict, deltas: dict) -> None:
+    """Add deltas to a user's counter row, or hold them if the user has no counters yet"""
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+
+    user_id = keys["user_id"]
+    counted = db.info.setdefault(COUNTED, set())
+    deferred = db.info.setdefault(DEFERRED, {})
+    if user_id not in counted and user_id not in deferred:
+        if _has_counters(db, user_id):
+            counted.add(user_id)
+        else:
+            deferred[user_id] = []
+    if user_id in deferred:
+        deferred[user_id].append((model, keys, deltas))
+    else:
+        _add_to_row(db, model, keys, deltas)
+
+
+def rebuild_user_counters(db: Session, user_id: UUID) -> bool:
+    """Build a user's counters from raw rows unless they exist; True if built"""
+    from app.services.stats_service import reconcile_users
+
+    _lock_user(db, user_id)
+    if _has_counters(db, user_id):
+        return False
+    reconcile_users(db, [user_id])
+    return True
+
+
+@event.listens_for(Session, "before_commit")
+def _settle_deferred_counters(session: Session) -> None:
+    deferred = session.info.pop(DEFERRED, None)
+    if not deferred:
+        return
+    session.flush()
+    for user_id, held in deferred.items():
+        if not rebuild_user_counters(session, user_id):
+            # Another transaction built them first, without seeing our writes
+            for model, keys, deltas in held:
+                _add_to_row(session, model, keys, deltas)
+    session.flush()
+
+
+@event.listens_for(Session, "after_commit")
+def _forget_counted(session: Session) -> None:
+    session.info.pop(COUNTED, None)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_deferred(session: Session, previous_transaction) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop(COUNTED, None)
+        session.info.pop(DEFERRED, None)
+
+
+async def apply_bottle_delta(
+    db: Session,
+    user_id: UUID,
+    spirit_type: SpiritType,
+    sign: int,
+    rating: Optional[int] = None,
+    count: int = 1,
+    rated_count: Optional[int] = None,
+    rating_sum: Optional[int] = None,
+) -> None:
+    """Count bottles in (sign=1) or out (sign=-1) of the user's stats
+
+    Pass ``rating`` for a single bottle, or ``count``/``rated_count``/
+    ``rating_sum`` to move several bottles at once.
+    """
+    if rated_count is None:
+        rated_count = count if rating is not None else 0
+    if rating_sum is None:
+        rating_sum = rating or 0
+    _increment(db, UserStats, {"user_id": user_id}, {
+        "bottle_count": sign * count,
+        "rated_bottle_count": sign * rated_count,
+        "bottle_rating_sum": sign * rating_sum,
+    })
+    _increment(db, UserSpiritStats, {"user_id": user_id, "spirit_type": spirit_type}, {
+        "bottle_count": sign * count,
+    })
+
+
+async def apply_note_delta(
+    db: Session,
+    user_id: UUID,
+    spirit_type: SpiritType,
+    sign: int = 1,
+    rating: Optional[int] = None,
+    count: int = 1,
+    rated_count: Optional[int] = None,
+    rating_sum: Optional[int] = None,
+) -> None:
+    """Count tasting notes in (sign=1) or out (sign=-1) of the user's stats
+
+    Pass ``rating`` for a single note, or ``count``/``rated_count``/
+    ``rating_sum`` to move several notes at once.
+    """
+    if rated_count is None:
+        rated_count = count if rating is not None else 0
+    if rating_sum is None:
+        rating_sum = rating or 0
+    deltas = {
+        "note_count": sign * count,
+        "rated_note_count": sign * rated_count,
+        "note_rating_sum": sign * rating_sum,
+    }
+    _increment(db, UserStats, {"user_id": user_id}, deltas)
+    _increment(db, UserSpiritStats, {"user_id": user_id, "spirit_type": spirit_type}, deltas)
+
+
+def load_user_stats(
+    db: Session,
+    user_id: UUID,
+) -> Tuple[UserStats, List[UserSpiritStats]]:
+    """Read a user's counters, building them from raw rows on first use"""
+    stats = db.query(UserStats).filter(UserStats.user_id == user_id).first()
+    if stats is None:
+        rebuild_user_counters(db, user_id)
+        db.commit()
+        stats = db.query(UserStats).filter(UserStats.user_id == user_id).first()
+
+    spirits = db.query(UserSpiritStats).filter(
+        UserSpiritStats.user_id == user_id
+    ).all()
+    return stats, spirits
+
+
+async def get_user_stats(
+    db: Session,
+    user_id: UUID,
+) -> Tuple[UserStats, List[UserSpiritStats]]:
+    """Get a user's counters, building them from raw rows on first use"""
+    return load_user_stats(db, user_id)
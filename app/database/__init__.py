@@ -1,6 +1,23 @@
 """Database configuration and session management"""
 
-from .session import SessionLocal, engine, get_db
+from .session import (
+    SessionLocal,
+    engine,
+    get_db,
+    get_primary_read_db,
+    get_read_db,
+    get_read_session_factory,
+    get_session_factory,
+)
 from .base import Base
 
-__all__ = ["SessionLocal", "engine", "Base", "get_db"]
+__all__ = [
+    "SessionLocal",
+    "engine",
+    "Base",
+    "get_db",
+    "get_primary_read_db",
+    "get_read_db",
+    "get_read_session_factory",
+    "get_session_factory",
+]
@@ -0,0 +1,138 @@
+"""Connection pool instrumentation
+
+``InstrumentedQueuePool`` times every checkout, including the wait for a
+free connection, and ``PoolMetrics`` keeps a wait histogram alongside
+overflow use, connection ages and invalidations. Checkouts give up after
+``DATABASE_POOL_TIMEOUT`` seconds with ``sqlalchemy.exc.TimeoutError``,
+which the app turns into a 503 instead of letting requests queue.
+
+Sessions only check out a connection when they run their first statement,
+so requests rejected before touching the database (e.g. failed auth) never
+wait on the pool; ``checkouts`` in the metrics makes that visible.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+WAIT_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class PoolMetrics:
+    """Counters and a checkout-wait histogram for one pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.wait_counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.wait_sum_ms = 0.0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.peak_checked_out = 0
+        self.peak_overflow = 0
+
+    def record_wait(self, waited_ms: float, pool: QueuePool, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.wait_counts[bisect_left(WAIT_BUCKETS_MS, waited_ms)] += 1
+            self.wait_sum_ms += waited_ms
+            self.checkouts += 1
+            self.peak_checked_out = max(self.peak_checked_out, pool.checkedout())
+            self.peak_overflow = max(self.peak_overflow, pool.overflow())
+
+    def snapshot(self, pool: QueuePool, ages: List[float]) -> Dict[str, Any]:
+        with self._lock:
+            labels = [f"<={bound}ms" for bound in WAIT_BUCKETS_MS] + ["+inf"]
+            return {
+                "pool": self.name,
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "peak_checked_out": self.peak_checked_out,
+                "peak_overflow": self.peak_overflow,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "checkout_wait_ms": {
+                    "histogram": dict(zip(labels, self.wait_counts)),
+                    "mean": round(self.wait_sum_ms / self.checkouts, 3) if self.checkouts else None,
+                },
+                "connection_age_seconds": {
+                    "max": round(max(ages), 1) if ages else None,
+                    "mean": round(sum(ages) / len(ages), 1) if ages else None,
+                },
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics("default")
+        self.connected_at: Dict[int, float] = {}
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_wait(0, self, timed_out=True)
+            raise
+        self.metrics.record_wait((time.perf_counter() - started) * 1000, self)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def connection_ages(self) -> List[float]:
+        now = time.monotonic()
+        return [now - connected for connected in list(self.connected_at.values())]
+
+
+def instrument_engine(engine: Engine, name: str) -> Engine:
+    """Name an engine's pool metrics and track connects, closes and invalidations
+
+    The engine must be created with ``poolclass=InstrumentedQueuePool``.
+    """
+    engine.pool.metrics = PoolMetrics(name)
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, record):
+        pool = engine.pool
+        pool.metrics.connects += 1
+        pool.connected_at[id(record)] = time.monotonic()
+
+    @event.listens_for(engine, "close")
+    def _close(dbapi_connection, record):
+        engine.pool.connected_at.pop(id(record), None)
+
+    @event.listens_for(engine, "invalidate")
+    def _invalidate(dbapi_connection, record, exception):
+        engine.pool.metrics.invalidations += 1
+        engine.pool.connected_at.pop(id(record), None)
+
+    @event.listens_for(engine, "soft_invalidate")
+    def _soft_invalidate(dbapi_connection, record, exception):
+        engine.pool.metrics.invalidations += 1
+
+    return engine
+
+
+def pool_stats(engine: Engine) -> Optional[Dict[str, Any]]:
+    """Metrics snapshot for an engine, or None if its pool is not instrumented"""
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return None
+    return pool.metrics.snapshot(pool, pool.connection_ages())
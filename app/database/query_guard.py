@@ -0,0 +1,224 @@
+"""Per-route statement timeouts and the slow-query log
+
+A middleware records the current route and its statement budget in a
+context variable (see ``route_context``). Engines set up with
+``install_query_guard`` then enforce that budget: Postgres gets
+``SET LOCAL statement_timeout`` at the start of each transaction, and
+SQLite connections get a progress handler that interrupts a statement once
+its deadline passes. Background jobs run outside any route, so they have
+no timeout.
+
+Any statement slower than ``SLOW_QUERY_MS`` is logged with its SQL, the
+shapes (not values) of its parameters, its duration and the route it came
+from. SELECTs slower than ``SLOW_QUERY_EXPLAIN_MS`` also get their plan
+captured: ``EXPLAIN (ANALYZE, BUFFERS)`` on Postgres, ``EXPLAIN QUERY PLAN``
+on SQLite. Plans run on a separate pooled connection in a background thread
+so they never touch the request's transaction; on Postgres the re-run is
+bounded by ``EXPLAIN_TIMEOUT_MS``, and locking reads (``FOR UPDATE``,
+``FOR SHARE``) are never re-run. Each distinct statement is explained at
+most once per ``EXPLAIN_INTERVAL`` seconds. Plans can contain literal
+parameter values, so they only go to the log; ``public_slow_queries`` is
+what may be served over HTTP.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from app.config import settings
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger("app.slow_queries")
+
+# Budgets per admission route class, with per-path overrides checked first
+STATEMENT_TIMEOUTS_MS = {"interactive": 3000, "search": 5000, "write": 5000, "bulk": 15000}
+STATEMENT_TIMEOUT_OVERRIDES_MS = (
+    ("/search/filter", 4000),
+    ("/search/distillery/", 8000),
+)
+PROGRESS_HANDLER_OPS = 1000  # SQLite VM steps between deadline checks
+EXPLAIN_INTERVAL = 600.0
+EXPLAIN_TIMEOUT_MS = 10000  # EXPLAIN ANALYZE runs the statement again
+LOCKING_CLAUSE = re.compile(r"\bFOR\s+(NO\s+KEY\s+UPDATE|UPDATE|KEY\s+SHARE|SHARE)\b", re.IGNORECASE)
+
+# (route label or ASGI scope, statement timeout in ms or None)
+_route: ContextVar[Tuple[Union[str, dict, None], Optional[int]]] = ContextVar(
+    "query_guard_route", default=(None, None)
+)
+
+slow_queries: Deque[Dict[str, Any]] = deque(maxlen=200)
+_explained = TTLCache(ttl=EXPLAIN_INTERVAL, maxsize=1024)  # statement hashes explained recently
+_explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+_lock = threading.Lock()
+
+
+def statement_timeout_for(path: str, route_class: str) -> int:
+    """Statement budget for a request path"""
+    for prefix, timeout in STATEMENT_TIMEOUT_OVERRIDES_MS:
+        if path.startswith(prefix):
+            return timeout
+    return STATEMENT_TIMEOUTS_MS.get(route_class, settings.STATEMENT_TIMEOUT_MS)
+
+
+@contextmanager
+def route_context(route: Union[str, dict], timeout_ms: Optional[int]):
+    """Attribute statements in this context to ``route`` and bound them by ``timeout_ms``
+
+    ``route`` may be an ASGI scope, in which case the matched route's path
+    template is used once routing has happened.
+    """
+    token = _route.set((route, timeout_ms))
+    try:
+        yield
+    finally:
+        _route.reset(token)
+
+
+def current_route() -> Optional[str]:
+    route, _ = _route.get()
+    if isinstance(route, dict):
+        matched = route.get("route")
+        return getattr(matched, "path", None) or route.get("path")
+    return route
+
+
+def is_statement_timeout(error: Exception) -> bool:
+    """Whether a database error is a statement cancelled by its timeout"""
+    if not isinstance(error, DBAPIError):
+        return False
+    orig = error.orig
+    return getattr(orig, "pgcode", None) == "57014" or str(orig) == "interrupted"
+
+
+def param_shapes(parameters: Any) -> Any:
+    """Types and sizes of bound parameters, without their values"""
+    def shape(value: Any) -> str:
+        if isinstance(value, (list, tuple, set)):
+            return f"{type(value).__name__}[{len(value)}]"
+        if isinstance(value, (str, bytes)):
+            return f"{type(value).__name__}({len(value)})"
+        return type(value).__name__
+
+    if isinstance(parameters, dict):
+        return {key: shape(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"executemany[{len(parameters)}]"
+        return [shape(value) for value in parameters]
+    return shape(parameters)
+
+
+def explainable(statement: str) -> bool:
+    """Whether a slow statement may be re-run to capture its plan"""
+    return statement.lstrip()[:6].upper() == "SELECT" and not LOCKING_CLAUSE.search(statement)
+
+
+def public_slow_queries(limit: int) -> List[Dict[str, Any]]:
+    """Most recent slow statements, newest first, without their plans"""
+    return [
+        {key: value for key, value in entry.items() if key not in ("plan", "plan_error")}
+        for entry in list(slow_queries)[::-1][:limit]
+    ]
+
+
+def _capture_plan(engine: Engine, statement: str, parameters: Any, entry: Dict[str, Any]) -> None:
+    if engine.dialect.name == "postgresql":
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) "
+    elif engine.dialect.name == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    else:
+        return
+    try:
+        with engine.connect() as connection:
+            cursor = connection.connection.cursor()
+            try:
+                if engine.dialect.name == "postgresql":
+                    cursor.execute(f"SET LOCAL statement_timeout = {EXPLAIN_TIMEOUT_MS}")
+                cursor.execute(prefix + statement, parameters)
+                entry["plan"] = "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+            finally:
+                cursor.close()
+            connection.rollback()
+        logger.warning("Plan for slow query on %s:\n%s", entry["route"], entry["plan"])
+    except Exception as e:
+        entry["plan_error"] = str(e)
+
+
+def _record(engine: Engine, statement: str, parameters: Any, duration_ms: float) -> None:
+    route = current_route()
+    entry = {
+        "sql": statement,
+        "params": param_shapes(parameters),
+        "duration_ms": round(duration_ms, 1),
+        "route": route,
+        "at": time.time(),
+    }
+    slow_queries.append(entry)
+    logger.warning(
+        "Slow query %.1fms on %s: %s params=%s", duration_ms, route, statement, entry["params"]
+    )
+
+    if duration_ms < settings.SLOW_QUERY_EXPLAIN_MS or not explainable(statement):
+        return
+    key = hash(statement)
+    with _lock:
+        if _explained.get(key) is not None:
+            return
+        _explained.set(key, True)
+    _explain_executor.submit(_capture_plan, engine, statement, parameters, entry)
+
+
+def install_query_guard(engine: Engine) -> Engine:
+    """Enforce route statement timeouts and log slow statements on an engine"""
+    dialect = engine.dialect.name
+
+    if dialect == "postgresql":
+        @event.listens_for(engine, "begin")
+        def _set_timeout(connection):
+            _, timeout_ms = _route.get()
+            if timeout_ms and settings.STATEMENT_TIMEOUTS_ENABLED:
+                connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
+    elif dialect == "sqlite":
+        @event.listens_for(engine, "connect")
+        def _install_progress_handler(dbapi_connection, record):
+            info = record.info
+
+            def check_deadline():
+                deadline = info.get("deadline")
+                return 1 if deadline is not None and time.monotonic() > deadline else 0
+
+            dbapi_connection.set_progress_handler(check_deadline, PROGRESS_HANDLER_OPS)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(connection, cursor, statement, parameters, context, executemany):
+        now = time.perf_counter()
+        connection.info.setdefault("query_started", []).append(now)
+        if dialect == "sqlite" and settings.STATEMENT_TIMEOUTS_ENABLED:
+            _, timeout_ms = _route.get()
+            connection.info["deadline"] = time.monotonic() + timeout_ms / 1000 if timeout_ms else None
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish(connection, cursor, statement, parameters, context, executemany):
+        started = connection.info["query_started"].pop()
+        connection.info["deadline"] = None
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms >= settings.SLOW_QUERY_MS:
+            _record(engine, statement, parameters, duration_ms)
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(context):
+        connection = context.connection
+        if connection is not None and connection.info.get("query_started"):
+            connection.info["query_started"].pop()
+            connection.info["deadline"] = None
+
+    return engine
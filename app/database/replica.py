@@ -0,0 +1,148 @@
+"""Read-replica routing
+
+``get_read_db`` hands read-only routes a session on the replica configured
+by ``DATABASE_READ_URL``. The replica is probed at most every
+``REPLICA_CHECK_INTERVAL`` seconds; while it is unreachable or its
+replication lag exceeds ``REPLICA_MAX_LAG``, reads fall back to the
+primary, as they do when the lag cannot be determined (no WAL receiver
+and nothing replayed). A disconnect seen mid-request marks it down
+immediately.
+
+Read-your-writes: after a client makes a write request, its reads stay on
+the primary for ``REPLICA_STICKY_SECONDS``. Clients are keyed by their
+Authorization header (or address), per worker.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.database.pool import InstrumentedQueuePool, instrument_engine
+from app.database.query_guard import install_query_guard
+
+# Replay lag in seconds. Zero only while the WAL receiver is streaming and
+# everything received has been replayed; without a receiver the replica may
+# be arbitrarily far behind, so the age of the last replayed transaction
+# counts, and NULL (nothing replayed yet) means unknown.
+POSTGRES_LAG_QUERY = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming')"
+    "  AND pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+    " END"
+)
+
+
+def replication_lag(connection: Connection) -> Optional[float]:
+    """Seconds the replica is behind, or None if unknown; dialects without replication report 0"""
+    if connection.dialect.name == "postgresql":
+        lag = connection.execute(POSTGRES_LAG_QUERY).scalar()
+        return None if lag is None else float(lag)
+    connection.execute(text("SELECT 1"))
+    return 0.0
+
+
+class ReadReplica:
+    """Health-checked replica engine with a primary fallback"""
+
+    def __init__(
+        self,
+        engine: Optional[Engine],
+        max_lag: float,
+        check_interval: float,
+        sticky_seconds: float,
+        lag_probe: Callable[[Connection], Optional[float]] = replication_lag,
+    ):
+        self.engine = engine
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.sticky_seconds = sticky_seconds
+        self.lag_probe = lag_probe
+        self.session_factory = (
+            sessionmaker(autocommit=False, autoflush=False, bind=engine) if engine else None
+        )
+        self.lag: Optional[float] = None
+        self.healthy = False
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._writes: Dict[str, float] = {}
+        if engine is not None:
+            event.listen(engine, "handle_error", self._on_error)
+
+    def _on_error(self, context) -> None:
+        if context.is_disconnect:
+            self.mark_down()
+
+    def mark_down(self) -> None:
+        """Treat the replica as unavailable until the next probe"""
+        with self._lock:
+            self.healthy = False
+            self._checked_at = time.monotonic()
+
+    def check(self) -> bool:
+        """Probe the replica now and record its availability"""
+        try:
+            with self.engine.connect() as connection:
+                lag = self.lag_probe(connection)
+        except Exception:
+            lag = None
+        with self._lock:
+            self.lag = lag
+            self.healthy = lag is not None and lag <= self.max_lag
+            self._checked_at = time.monotonic()
+        return self.healthy
+
+    def available(self) -> bool:
+        """Whether reads may go to the replica, probing if the last check is stale"""
+        if self.engine is None:
+            return False
+        checked_at = self._checked_at
+        if checked_at is None or time.monotonic() - checked_at >= self.check_interval:
+            return self.check()
+        return self.healthy
+
+    def note_write(self, client: str) -> None:
+        """Pin a client's reads to the primary for the sticky window"""
+        now = time.monotonic()
+        with self._lock:
+            self._writes[client] = now + self.sticky_seconds
+            if len(self._writes) > 10000:
+                self._writes = {key: until for key, until in self._writes.items() if until > now}
+
+    def recently_wrote(self, client: str) -> bool:
+        until = self._writes.get(client)
+        return until is not None and until > time.monotonic()
+
+    def status(self) -> Dict[str, object]:
+        return {
+            "configured": self.engine is not None,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+        }
+
+
+def create_replica_engine(url: str) -> Engine:
+    """Engine for the read replica"""
+    if url.startswith("sqlite"):
+        return install_query_guard(create_engine(url, connect_args={"check_same_thread": False}))
+    return install_query_guard(instrument_engine(create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=True,
+    ), "replica"))
+
+
+read_replica = ReadReplica(
+    create_replica_engine(settings.DATABASE_READ_URL) if settings.DATABASE_READ_URL else None,
+    max_lag=settings.REPLICA_MAX_LAG,
+    check_interval=settings.REPLICA_CHECK_INTERVAL,
+    sticky_seconds=settings.REPLICA_STICKY_SECONDS,
+)
@@ -1,30 +1,51 @@
 """Database session configuration"""
 
+from fastapi import Request
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from app.database.pool import InstrumentedQueuePool, instrument_engine
+from app.database.query_guard import install_query_guard
+from app.database.replica import read_replica
+from app.database.sqlite import create_sqlite_engines, is_file_database
 
-# Create database engine
-if settings.DATABASE_URL.startswith("sqlite"):
+# Create database engine; ``read_engine`` is only set when SQLite runs with
+# its tuned single-writer profile and serves read-only sessions
+read_engine = None
+if (
+    settings.DATABASE_URL.startswith("sqlite")
+    and settings.SQLITE_TUNED
+    and is_file_database(settings.DATABASE_URL)
+):
+    engine, read_engine = create_sqlite_engines(
+        settings.DATABASE_URL,
+        echo=settings.ENVIRONMENT == "development",
+    )
+elif settings.DATABASE_URL.startswith("sqlite"):
     engine = create_engine(
         settings.DATABASE_URL,
         connect_args={"check_same_thread": False},
         echo=settings.ENVIRONMENT == "development",
     )
 else:
-    engine = create_engine(
+    engine = instrument_engine(create_engine(
         settings.DATABASE_URL,
+        poolclass=InstrumentedQueuePool,
         pool_size=settings.DATABASE_POOL_SIZE,
         max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=True,
         echo=settings.ENVIRONMENT == "development",
-    )
+    ), "primary")
+
+for guarded in (engine, read_engine):
+    if guarded is not None:
+        install_query_guard(guarded)
 
-# Create session factory
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=engine,
-)
+# Create session factories; sessions that may write always use ``engine``
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine or engine)
 
 
 def get_db():
@@ -34,3 +55,42 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_primary_read_db():
+    """Dependency for reads that must see the latest commits, on the primary's read pool
+
+    Never hands out the writer, so reading (including authentication) does
+    not queue behind or block writes.
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def client_key(request: Request) -> str:
+    """Identify a client for read-your-writes pinning"""
+    return request.headers.get("authorization") or (request.client.host if request.client else "")
+
+
+def get_read_db(request: Request):
+    """Dependency for read-only routes: the replica when usable, else the primary's read pool"""
+    use_replica = not read_replica.recently_wrote(client_key(request)) and read_replica.available()
+    db = (read_replica.session_factory if use_replica else ReadSessionLocal)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_session_factory(request: Request):
+    """Dependency for read-only work that needs its own sessions; chooses like ``get_read_db``"""
+    use_replica = not read_replica.recently_wrote(client_key(request)) and read_replica.available()
+    return read_replica.session_factory if use_replica else ReadSessionLocal
+
+
+def get_session_factory():
+    """Dependency to get the session factory for work that needs its own sessions"""
+    return SessionLocal
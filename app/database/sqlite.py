@@ -0,0 +1,83 @@
+"""SQLite production profile
+
+Every connection gets WAL journaling and the pragmas from settings. Writes
+go through a single writer connection: its pool holds one connection, so
+concurrent writers queue on checkout instead of racing for the file lock,
+and its transactions start with ``BEGIN IMMEDIATE`` so a writer never has
+to upgrade a read lock (which fails with ``database is locked`` regardless
+of busy_timeout). Reads use a separate pool; in WAL mode they do not block
+on, or get blocked by, the writer.
+
+Sessions that may write (``get_db``) are bound to the writer for their whole
+life, so the reads of a read-modify-write happen inside the same
+``BEGIN IMMEDIATE`` transaction as its writes. Only read-only sessions
+(``get_read_db``) use the read pool.
+"""
+
+from typing import Tuple
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from app.config import settings
+from app.database.pool import InstrumentedQueuePool, instrument_engine
+
+
+def sqlite_pragmas() -> Tuple[str, ...]:
+    """PRAGMA statements run on every new connection"""
+    return (
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE}",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT}",
+    )
+
+
+def is_file_database(url: str) -> bool:
+    """Whether a SQLite URL points at a file several connections can share"""
+    database = make_url(url).database
+    return bool(database) and database != ":memory:" and "mode=memory" not in url
+
+
+def _apply_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    for pragma in sqlite_pragmas():
+        cursor.execute(pragma)
+    cursor.close()
+
+
+def _take_transaction_control(dbapi_connection, connection_record) -> None:
+    # Stop pysqlite from issuing its own deferred BEGIN; see _begin_immediate
+    dbapi_connection.isolation_level = None
+
+
+def _begin_immediate(connection) -> None:
+    connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def create_sqlite_engines(url: str, echo: bool = False) -> Tuple[Engine, Engine]:
+    """Build the (writer, reader) engines for a SQLite file database"""
+    connect_args = {"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT / 1000}
+    writer = instrument_engine(create_engine(
+        url,
+        connect_args=connect_args,
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=settings.SQLITE_WRITE_QUEUE_TIMEOUT,
+        echo=echo,
+    ), "sqlite-writer")
+    event.listen(writer, "connect", _apply_pragmas)
+    event.listen(writer, "connect", _take_transaction_control)
+    event.listen(writer, "begin", _begin_immediate)
+
+    reader = instrument_engine(create_engine(
+        url,
+        connect_args=connect_args,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.SQLITE_READ_POOL_SIZE,
+        max_overflow=0,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        echo=echo,
+    ), "sqlite-reader")
+    event.listen(reader, "connect", _apply_pragmas)
+    return writer, reader
@@ -2,26 +2,53 @@
 
 from typing import Optional
 from uuid import UUID
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_primary_read_db
 from app.utils.security import decode_token
 from app.crud.user import get_user_by_id
 from app.models.user import User
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+# ``scope`` claim of the short-lived tokens the event stream accepts in its URL
+EVENTS_SCOPE = "events"
 
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_primary_read_db),
 ) -> User:
     """Get the current authenticated user from JWT token"""
-    token = credentials.credentials
+    return await _authenticate(db, credentials.credentials)
+
+
+async def get_event_stream_user(
+    access_token: Optional[str] = Query(
+        None, description="Token from POST /events/token, for clients that cannot send headers"
+    ),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: Session = Depends(get_primary_read_db),
+) -> User:
+    """Authenticate the event stream by bearer header or short-lived URL token"""
+    if credentials is not None:
+        return await _authenticate(db, credentials.credentials)
+    if access_token is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await _authenticate(db, access_token, scope=EVENTS_SCOPE)
+
+
+async def _authenticate(db: Session, token: str, scope: Optional[str] = None) -> User:
+    """User a token was issued to; scoped tokens are only valid for their scope"""
     payload = decode_token(token)
     
-    if payload is None:
+    if payload is None or payload.get("scope") != scope:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
@@ -1,15 +1,72 @@
 """FastAPI application factory and configuration"""
 
-from fastapi import FastAPI
+import asyncio
+import math
+import time
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
 from app.config import settings
-from app.database import engine, Base
-from app.models import User, Bottle, Collection, TastingNote  # noqa: F401
-from app.api.routes import auth, users, bottles, collections, tasting_notes, search
+from app.database import engine, Base, SessionLocal
+from app.database.pool import pool_stats
+from app.database.query_guard import (
+    is_statement_timeout,
+    public_slow_queries,
+    route_context,
+    statement_timeout_for,
+)
+from app.database.replica import read_replica
+from app.database.session import client_key, read_engine
+from app.utils.invalidation import create_invalidation_table, invalidation_bus
+from app.utils.live_events import event_hub
+from app.utils.rate_limit import ROUTE_COSTS, rate_limiter
+from app.utils.admission import (
+    ADAPTIVE_CLASSES,
+    SAFE_METHODS,
+    STREAMING_PATHS,
+    UNLIMITED_PATHS,
+    AdmissionRejected,
+    admission,
+    classify,
+)
+from app.models import (  # noqa: F401
+    User,
+    Bottle,
+    CatalogProduct,
+    Distillery,
+    Region,
+    Country,
+    DimensionAlias,
+    Collection,
+    TastingNote,
+    TastingNoteDescriptor,
+    UserStats,
+    UserSpiritStats,
+    ChangeLogEntry,
+)
+from app.api.routes import (
+    auth,
+    users,
+    bottles,
+    collections,
+    tasting_notes,
+    search,
+    batch,
+    dashboard,
+    recommendations,
+    sync,
+    events,
+)
+from app.services.note_search_service import create_note_search_index
+from app.services.suggest_service import suggest_index
 
 # Create tables (only if database is available)
 try:
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        create_note_search_index(connection)
+        create_invalidation_table(connection)
 except Exception:
     # Database not available yet - migrations will handle it
     pass
@@ -21,7 +78,153 @@ app = FastAPI(
     description="A digital platform for spirit collectors to catalog and manage their collections",
 )
 
-# Add CORS middleware
+# The middlewares below are plain ASGI rather than ``@app.middleware("http")``,
+# so streaming responses such as /events pass through them unbuffered and
+# context variables set here reach the endpoint directly. The last one added
+# runs first; CORS is added after all of them so their own 503 and 429
+# responses carry CORS headers and preflights never take an admission slot.
+
+
+# Admission control: per-route-class concurrency limits with queue timeouts
+def admission_rejected_response(exc: AdmissionRejected) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"},
+    )
+
+
+class AdmissionMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if (
+            scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or path.startswith(UNLIMITED_PATHS)
+            or path.startswith(STREAMING_PATHS)
+        ):
+            return await self.app(scope, receive, send)
+        request = Request(scope)
+        name = classify(request.method, path)
+        priority = admission.classes[name].priority
+        if name == "interactive" and "authorization" not in request.headers:
+            priority += 1
+        try:
+            await admission.acquire(name, priority)
+        except AdmissionRejected as e:
+            return await admission_rejected_response(e)(scope, receive, send)
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            latency = time.perf_counter() - started
+            admission.release(
+                name, latency=latency if name in ADAPTIVE_CLASSES else None, failed=status >= 500
+            )
+
+
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
+
+
+# Attribute queries to their route and bound them by its statement budget
+class StatementBudgetMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        path = scope["path"]
+        timeout_ms = None if path.startswith(UNLIMITED_PATHS) else statement_timeout_for(
+            path, classify(scope["method"], path)
+        )
+        with route_context(scope, timeout_ms):
+            await self.app(scope, receive, send)
+
+
+app.add_middleware(StatementBudgetMiddleware)
+
+
+@app.exception_handler(OperationalError)
+async def statement_timeout_handler(request: Request, exc: OperationalError):
+    if not is_statement_timeout(exc):
+        raise exc
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Query exceeded its time budget"},
+        headers={"Retry-After": "1"},
+    )
+
+
+# Per-client token buckets, not charged for preflights; registered after
+# admission so it runs first
+class RateLimitMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] == "http"
+            and scope["method"] != "OPTIONS"
+            and not scope["path"].startswith(UNLIMITED_PATHS)
+        ):
+            request = Request(scope)
+            cost = ROUTE_COSTS[classify(request.method, request.url.path)]
+            decision = rate_limiter.check_request(request, cost)
+            if not decision.allowed:
+                response = JSONResponse(
+                    status_code=429,
+                    content={"detail": "Rate limit exceeded"},
+                    headers={"Retry-After": str(math.ceil(decision.retry_after))},
+                )
+                return await response(scope, receive, send)
+        await self.app(scope, receive, send)
+
+
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    return admission_rejected_response(exc)
+
+
+# Keep a client's reads on the primary for a while after it writes
+class PinWritersMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            return await self.app(scope, receive, send)
+
+        async def pin_on_success(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                read_replica.note_write(client_key(Request(scope)))
+            await send(message)
+
+        await self.app(scope, receive, pin_on_success)
+
+
+if read_replica.engine is not None:
+    app.add_middleware(PinWritersMiddleware)
+
+
+# Add CORS middleware; outermost, see above
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
@@ -30,6 +233,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+# Shed load when no connection frees up within DATABASE_POOL_TIMEOUT
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database busy, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -37,13 +251,51 @@ app.include_router(bottles.router)
 app.include_router(collections.router)
 app.include_router(tasting_notes.router)
 app.include_router(search.router)
+app.include_router(batch.router)
+app.include_router(dashboard.router)
+app.include_router(recommendations.router)
+app.include_router(sync.router)
+app.include_router(events.router)
 
 
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "ok", "version": settings.APP_VERSION}
+    return {
+        "status": "ok",
+        "version": settings.APP_VERSION,
+        "read_replica": read_replica.status(),
+    }
+
+
+@app.get("/health/pool")
+async def pool_health():
+    """Connection pool metrics for each instrumented engine"""
+    engines = (engine, read_engine, read_replica.engine)
+    return [stats for stats in (pool_stats(e) for e in engines if e is not None) if stats]
+
+
+@app.get("/health/admission")
+async def admission_health():
+    """Admission limit, in-flight and queued requests, per-class counters and rate-limit rejections"""
+    return {**admission.stats(), "rate_limited": rate_limiter.rejected}
+
+
+@app.get("/health/slow-queries")
+async def recent_slow_queries(limit: int = 50):
+    """Most recent slow statements, newest first; captured plans are only logged"""
+    return public_slow_queries(limit)
+
+
+@app.get("/health/invalidation")
+async def invalidation_health():
+    """Whether this worker hears other workers' cache invalidations"""
+    return {
+        "listening": invalidation_bus.listening,
+        "received": invalidation_bus.received,
+        "event_streams": event_hub.stats(),
+    }
 
 
 # Root endpoint
@@ -63,11 +315,25 @@ async def startup_event():
     print(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     print(f"Environment: {settings.ENVIRONMENT}")
 
+    # Build the search suggestion index; requests build it lazily if this fails
+    db = SessionLocal()
+    try:
+        suggest_index.build(db)
+    except Exception:
+        pass
+    finally:
+        db.close()
+
+    # Hear about writes handled by other workers and stream them to clients
+    invalidation_bus.start(engine, read_engine)
+    event_hub.start(asyncio.get_running_loop())
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Run on application shutdown"""
     print(f"Shutting down {settings.APP_NAME}")
+    invalidation_bus.stop()
 
 
 if __name__ == "__main__":
@@ -2,14 +2,28 @@
 
 from .user import User
 from .bottle import Bottle, SpiritType
+from .catalog_product import CatalogProduct
+from .dimension import Distillery, Region, Country, DimensionAlias
 from .collection import Collection, CollectionBottle
 from .tasting_note import TastingNote
+from .tasting_note_descriptor import TastingNoteDescriptor
+from .user_stats import UserStats, UserSpiritStats
+from .change_log import ChangeLogEntry
 
 __all__ = [
     "User",
     "Bottle",
     "SpiritType",
+    "CatalogProduct",
+    "Distillery",
+    "Region",
+    "Country",
+    "DimensionAlias",
     "Collection",
     "CollectionBottle",
     "TastingNote",
+    "TastingNoteDescriptor",
+    "UserStats",
+    "UserSpiritStats",
+    "ChangeLogEntry",
 ]
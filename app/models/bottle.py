@@ -34,6 +34,10 @@ class SpiritType(str, Enum):
     OTHER = "other"
 
 
+# Large columns that list queries leave out unless explicitly requested
+HEAVY_COLUMNS = ("notes", "ai_details")
+
+
 class Bottle(Base):
     """Bottle model for spirit collection"""
 
@@ -64,9 +68,17 @@ class Bottle(Base):
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
     deleted_at = Column(DateTime, nullable=True, index=True)  # Soft delete
+    product_id = Column(
+        UUID(as_uuid=True), ForeignKey("catalog_products.id"), nullable=True, index=True
+    )
+    # Integer keys of the resolved dimension rows (see app.crud.dimension)
+    distillery_id = Column(Integer, ForeignKey("distilleries.id"), nullable=True, index=True)
+    region_id = Column(Integer, ForeignKey("regions.id"), nullable=True, index=True)
+    country_id = Column(Integer, ForeignKey("countries.id"), nullable=True, index=True)
 
     # Relationships
     user = relationship("User", back_populates="bottles")
+    product = relationship("CatalogProduct", back_populates="bottles")
     tasting_notes = relationship(
         "TastingNote", back_populates="bottle", cascade="all, delete-orphan"
     )
@@ -0,0 +1,44 @@
+"""Catalog product model"""
+
+from datetime import datetime
+from uuid import uuid4
+from sqlalchemy import Column, String, Float, Integer, DateTime, ForeignKey, JSON
+from sqlalchemy.dialects.postgresql import UUID, ENUM
+from sqlalchemy.orm import relationship
+from app.database.base import Base
+from app.models.bottle import SpiritType
+
+
+class CatalogProduct(Base):
+    """Canonical product that owned bottles reference
+
+    Search, popularity, distillery profiles and AI research work on
+    products, so per-user copies of one bottling are counted and researched
+    once. Bottles are matched by ``match_key`` (see ``app.utils.catalog``).
+    """
+
+    __tablename__ = "catalog_products"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    match_key = Column(String(600), nullable=False, unique=True)
+    name = Column(String(255), nullable=False, index=True)
+    spirit_type = Column(ENUM(SpiritType), nullable=False, index=True)
+    distillery = Column(String(255), nullable=True, index=True)
+    proof = Column(Float, nullable=True)
+    age_statement = Column(String(50), nullable=True)
+    region = Column(String(100), nullable=True)
+    country = Column(String(100), nullable=True, index=True)
+    distillery_id = Column(Integer, ForeignKey("distilleries.id"), nullable=True, index=True)
+    region_id = Column(Integer, ForeignKey("regions.id"), nullable=True, index=True)
+    country_id = Column(Integer, ForeignKey("countries.id"), nullable=True, index=True)
+    ai_details = Column(JSON, nullable=True)  # Shared OpenAI research
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+    # Relationships
+    bottles = relationship("Bottle", back_populates="product")
+
+    def __repr__(self) -> str:
+        return f"<CatalogProduct(id={self.id}, name={self.name}, distillery={self.distillery})>"
@@ -0,0 +1,30 @@
+"""Change log model backing delta sync"""
+
+from datetime import datetime
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, Index, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+from app.database.base import Base
+
+
+class ChangeLogEntry(Base):
+    """A create, update or delete of one of a user's synced rows
+
+    Appended in the same transaction as the write it describes. Writers
+    for the same user are serialized (an advisory lock on Postgres, the
+    single writer on SQLite), so a user's entries commit in ``id`` order
+    and ``id`` works as a sync position.
+    """
+
+    __tablename__ = "change_log"
+    __table_args__ = (Index("ix_change_log_user_id_id", "user_id", "id"),)
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    entity = Column(String(20), nullable=False)  # bottle, note, collection or membership
+    entity_id = Column(UUID(as_uuid=True), nullable=False)  # bottle id for memberships
+    parent_id = Column(UUID(as_uuid=True), nullable=True)  # collection id for memberships
+    deleted = Column(Boolean, default=False, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        return f"<ChangeLogEntry(id={self.id}, entity={self.entity}, entity_id={self.entity_id})>"
@@ -0,0 +1,58 @@
+"""Location and producer dimension models"""
+
+from sqlalchemy import Column, Integer, String, UniqueConstraint
+from app.database.base import Base
+
+
+class Distillery(Base):
+    """Canonical distillery, referenced by integer key from bottles and products"""
+
+    __tablename__ = "distilleries"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    key = Column(String(255), nullable=False, unique=True)  # Normalized name
+    name = Column(String(255), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<Distillery(id={self.id}, name={self.name})>"
+
+
+class Region(Base):
+    """Canonical region, referenced by integer key from bottles and products"""
+
+    __tablename__ = "regions"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    key = Column(String(100), nullable=False, unique=True)
+    name = Column(String(100), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<Region(id={self.id}, name={self.name})>"
+
+
+class Country(Base):
+    """Canonical country, referenced by integer key from bottles and products"""
+
+    __tablename__ = "countries"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    key = Column(String(100), nullable=False, unique=True)
+    name = Column(String(100), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<Country(id={self.id}, name={self.name})>"
+
+
+class DimensionAlias(Base):
+    """Alternative spelling resolved to a dimension row at write time"""
+
+    __tablename__ = "dimension_aliases"
+    __table_args__ = (UniqueConstraint("kind", "alias"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String(20), nullable=False)  # "distillery", "region" or "country"
+    alias = Column(String(255), nullable=False)  # Normalized alias
+    target_id = Column(Integer, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<DimensionAlias(kind={self.kind}, alias={self.alias}, target_id={self.target_id})>"
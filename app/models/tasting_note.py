@@ -34,6 +34,9 @@ class TastingNote(Base):
     # Relationships
     bottle = relationship("Bottle", back_populates="tasting_notes")
     user = relationship("User", back_populates="tasting_notes")
+    descriptors = relationship(
+        "TastingNoteDescriptor", back_populates="tasting_note", cascade="all, delete-orphan"
+    )
 
     def __repr__(self) -> str:
         return f"<TastingNote(id={self.id}, bottle_id={self.bottle_id}, rating={self.rating})>"
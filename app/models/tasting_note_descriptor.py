@@ -0,0 +1,30 @@
+"""Tasting note descriptor model"""
+
+from sqlalchemy import Column, String, Integer, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from app.database.base import Base
+
+
+class TastingNoteDescriptor(Base):
+    """Flavor descriptor extracted from a tasting note when it is written"""
+
+    __tablename__ = "tasting_note_descriptors"
+    __table_args__ = (
+        Index("ix_tasting_note_descriptors_user_descriptor", "user_id", "descriptor"),
+        Index("ix_tasting_note_descriptors_bottle_descriptor", "bottle_id", "descriptor"),
+    )
+
+    tasting_note_id = Column(
+        UUID(as_uuid=True), ForeignKey("tasting_notes.id"), primary_key=True
+    )
+    descriptor = Column(String(50), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    bottle_id = Column(UUID(as_uuid=True), ForeignKey("bottles.id"), nullable=False)
+    count = Column(Integer, nullable=False, default=1)  # Mentions within the note
+
+    # Relationships
+    tasting_note = relationship("TastingNote", back_populates="descriptors")
+
+    def __repr__(self) -> str:
+        return f"<TastingNoteDescriptor(tasting_note_id={self.tasting_note_id}, descriptor={self.descriptor})>"
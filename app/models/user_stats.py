@@ -0,0 +1,47 @@
+"""Per-user statistics counters"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID, ENUM
+from app.database.base import Base
+from app.models.bottle import SpiritType
+
+
+class UserStats(Base):
+    """Running totals for a user's bottles and tasting notes
+
+    Maintained in the same transaction as the bottle and tasting note
+    writes so stats endpoints don't have to rescan raw rows.
+    """
+
+    __tablename__ = "user_stats"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    bottle_count = Column(Integer, default=0, nullable=False)
+    rated_bottle_count = Column(Integer, default=0, nullable=False)
+    bottle_rating_sum = Column(Integer, default=0, nullable=False)
+    note_count = Column(Integer, default=0, nullable=False)
+    rated_note_count = Column(Integer, default=0, nullable=False)
+    note_rating_sum = Column(Integer, default=0, nullable=False)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<UserStats(user_id={self.user_id}, bottles={self.bottle_count}, notes={self.note_count})>"
+
+
+class UserSpiritStats(Base):
+    """Running totals for a user's bottles and tasting notes per spirit type"""
+
+    __tablename__ = "user_spirit_stats"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    spirit_type = Column(ENUM(SpiritType), primary_key=True)
+    bottle_count = Column(Integer, default=0, nullable=False)
+    note_count = Column(Integer, default=0, nullable=False)
+    rated_note_count = Column(Integer, default=0, nullable=False)
+    note_rating_sum = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<UserSpiritStats(user_id={self.user_id}, spirit_type={self.spirit_type})>"
@@ -1,15 +1,18 @@
 """Pydantic schemas for request/response validation"""
 
 from .user import UserCreate, UserRead, UserUpdate
-from .bottle import BottleCreate, BottleRead, BottleUpdate
+from .bottle import BottleCreate, BottleListItem, BottleRead, BottleUpdate
 from .collection import CollectionCreate, CollectionRead, CollectionUpdate
 from .tasting_note import TastingNoteCreate, TastingNoteRead, TastingNoteUpdate
+from .batch import BatchIds
+from .catalog_product import CatalogProductRead
 
 __all__ = [
     "UserCreate",
     "UserRead",
     "UserUpdate",
     "BottleCreate",
+    "BottleListItem",
     "BottleRead",
     "BottleUpdate",
     "CollectionCreate",
@@ -18,4 +21,6 @@ __all__ = [
     "TastingNoteCreate",
     "TastingNoteRead",
     "TastingNoteUpdate",
+    "BatchIds",
+    "CatalogProductRead",
 ]
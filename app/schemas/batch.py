@@ -0,0 +1,16 @@
+"""Batch request schemas"""
+
+from typing import List
+from uuid import UUID
+from pydantic import BaseModel, Field
+from app.config import settings
+
+
+class BatchIds(BaseModel):
+    """Schema for multi-get requests"""
+
+    ids: List[UUID] = Field(..., min_length=1, max_length=settings.BATCH_MAX_IDS)
+
+    def unique_ids(self) -> List[UUID]:
+        """IDs with duplicates removed, in request order"""
+        return list(dict.fromkeys(self.ids))
@@ -59,9 +59,41 @@ class BottleRead(BottleBase):
 
     id: UUID
     user_id: UUID
+    product_id: Optional[UUID] = None
     ai_details: Optional[dict] = None
     created_at: datetime
     updated_at: datetime
 
     class Config:
         from_attributes = True
+
+
+class BottleListItem(BaseModel):
+    """Schema for bottles in list responses
+
+    Fields are those of ``BottleRead``, but only the selected ones are
+    present: by default everything except ``notes`` and ``ai_details``, or
+    the ``fields=`` requested. ``id`` is always included.
+    """
+
+    id: UUID
+    user_id: Optional[UUID] = None
+    product_id: Optional[UUID] = None
+    name: Optional[str] = None
+    spirit_type: Optional[SpiritType] = None
+    distillery: Optional[str] = None
+    proof: Optional[float] = None
+    age_statement: Optional[str] = None
+    region: Optional[str] = None
+    country: Optional[str] = None
+    release_year: Optional[int] = None
+    batch_number: Optional[str] = None
+    price_paid: Optional[Decimal] = None
+    price_current: Optional[Decimal] = None
+    acquisition_date: Optional[date] = None
+    notes: Optional[str] = None
+    rating: Optional[int] = None
+    image_url: Optional[str] = None
+    ai_details: Optional[dict] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
@@ -0,0 +1,24 @@
+"""Catalog product schemas"""
+
+from typing import Optional
+from datetime import datetime
+from uuid import UUID
+from pydantic import BaseModel
+from app.models.bottle import SpiritType
+
+
+class CatalogProductRead(BaseModel):
+    """Schema for reading catalog product data"""
+
+    id: UUID
+    name: str
+    spirit_type: SpiritType
+    distillery: Optional[str] = None
+    proof: Optional[float] = None
+    age_statement: Optional[str] = None
+    region: Optional[str] = None
+    country: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
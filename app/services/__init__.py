@@ -1,5 +1,23 @@
 """Services package"""
 
-from . import ai_service, review_service, search_service
+from . import (
+    ai_service,
+    catalog_service,
+    dashboard_service,
+    dimension_service,
+    flavor_service,
+    review_service,
+    search_service,
+    stats_service,
+)
 
-__all__ = ["ai_service", "review_service", "search_service"]
+__all__ = [
+    "ai_service",
+    "catalog_service",
+    "dashboard_service",
+    "dimension_service",
+    "flavor_service",
+    "review_service",
+    "search_service",
+    "stats_service",
+]
@@ -0,0 +1,81 @@
+"""Catalog product matching pipeline
+
+New and edited bottles are matched to a catalog product on write (see
+``app.crud.catalog_product``). This job links existing bottles, and with
+``--rematch`` re-keys every bottle after the matching rules change and
+removes products left without bottles:
+    python -m app.services.catalog_service [--rematch] [--batch-size 500]
+"""
+
+import argparse
+import asyncio
+from typing import Tuple
+from sqlalchemy.orm import Session
+from app.crud.catalog_product import match_products
+from app.models.bottle import Bottle
+from app.models.catalog_product import CatalogProduct
+
+
+async def backfill_catalog(
+    db: Session,
+    batch_size: int = 500,
+    rematch: bool = False,
+) -> Tuple[int, int]:
+    """Match bottles to catalog products, committing per batch
+
+    Returns (bottles matched, products created).
+    """
+    matched = created = 0
+    last_id = None
+    while True:
+        query = db.query(Bottle).order_by(Bottle.id)
+        if not rematch:
+            # Linked bottles drop out of the filter, so no cursor is needed
+            query = query.filter(Bottle.product_id == None)
+        elif last_id is not None:
+            query = query.filter(Bottle.id > last_id)
+        bottles = query.limit(batch_size).all()
+        if not bottles:
+            break
+
+        created += await match_products(db, bottles)
+        db.commit()
+        matched += len(bottles)
+        last_id = bottles[-1].id
+        db.expunge_all()
+
+    if rematch:
+        await prune_orphan_products(db)
+        db.commit()
+    return matched, created
+
+
+async def prune_orphan_products(db: Session) -> int:
+    """Delete catalog products no bottle references"""
+    referenced = db.query(Bottle.product_id).filter(Bottle.product_id != None)
+    return db.query(CatalogProduct).filter(
+        ~CatalogProduct.id.in_(referenced)
+    ).delete(synchronize_session=False)
+
+
+def main() -> None:
+    """Run the catalog matching job from the command line"""
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Match bottles to catalog products")
+    parser.add_argument("--rematch", action="store_true", help="Re-key already linked bottles")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        matched, created = asyncio.run(
+            backfill_catalog(db, batch_size=args.batch_size, rematch=args.rematch)
+        )
+    finally:
+        db.close()
+    print(f"Matched {matched} bottle(s), created {created} catalog product(s)")
+
+
+if __name__ == "__main__":
+    main()
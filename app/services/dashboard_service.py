@@ -0,0 +1,104 @@
+"""Dashboard summary service"""
+
+import asyncio
+from typing import Any, Callable, Dict, List, Tuple
+from uuid import UUID
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.crud.bottle import summarize_bottle_stats
+from app.crud.tasting_note import summarize_tasting_stats
+from app.crud.user_stats import load_user_stats
+from app.models.bottle import Bottle
+from app.models.collection import Collection
+from app.models.user_stats import UserStats
+from app.utils.cache import dashboard_cache
+from app.utils.serialization import (
+    bottle_list_fields,
+    bottle_serializer,
+    collection_serializer,
+)
+
+recent_bottle_serializer = bottle_serializer.subset(bottle_list_fields)
+
+
+def _counter_stats(db: Session, user_id: UUID) -> Tuple[dict, dict]:
+    """Bottle and tasting statistics, both read from the user's counters"""
+    stats, spirits = load_user_stats(db, user_id)
+    return summarize_bottle_stats(stats, spirits), summarize_tasting_stats(stats, spirits)
+
+
+def _has_counters(db: Session, user_id: UUID) -> bool:
+    return db.query(UserStats.user_id).filter(UserStats.user_id == user_id).first() is not None
+
+
+def _load_counter_stats(
+    read_factory: Callable,
+    write_factory: Callable,
+    user_id: UUID,
+) -> Tuple[dict, dict]:
+    """Counter statistics from a read session; only a first-use rebuild takes a writable one"""
+    db = read_factory()
+    try:
+        if _has_counters(db, user_id):
+            return _counter_stats(db, user_id)
+    finally:
+        db.close()
+    return _run_in_session(write_factory, _counter_stats, user_id)
+
+
+def _recent_bottles(db: Session, user_id: UUID) -> List[Dict[str, Any]]:
+    rows = db.query(*recent_bottle_serializer.columns).filter(
+        Bottle.user_id == user_id,
+        Bottle.deleted_at == None,
+    ).order_by(Bottle.created_at.desc()).limit(settings.DASHBOARD_RECENT_BOTTLES).all()
+    return recent_bottle_serializer.to_dicts(rows)
+
+
+def _collections(db: Session, user_id: UUID) -> List[Dict[str, Any]]:
+    rows = db.query(*collection_serializer.columns).filter(
+        Collection.user_id == user_id
+    ).order_by(Collection.created_at.desc()).limit(50).all()
+    return collection_serializer.to_dicts(rows)
+
+
+def _run_in_session(session_factory: Callable, fn: Callable, user_id: UUID) -> Any:
+    """Run a blocking aggregate on its own session and pooled connection"""
+    db = session_factory()
+    try:
+        return fn(db, user_id)
+    finally:
+        db.close()
+
+
+async def get_dashboard(
+    read_factory: Callable,
+    write_factory: Callable,
+    user_id: UUID,
+) -> Dict[str, Any]:
+    """Get the dashboard summary for a user
+
+    Independent aggregates run concurrently in worker threads on separate
+    read sessions from ``read_factory``; ``write_factory`` is only used to
+    build a user's counters on first use. The merged payload is cached per
+    user until the next write.
+    """
+    cached = dashboard_cache.get(user_id)
+    if cached is not None:
+        return cached
+    generation = dashboard_cache.generation(user_id)
+    
+    (bottle_stats, tasting_stats), recent_bottles, collections = await asyncio.gather(
+        run_in_threadpool(_load_counter_stats, read_factory, write_factory, user_id),
+        run_in_threadpool(_run_in_session, read_factory, _recent_bottles, user_id),
+        run_in_threadpool(_run_in_session, read_factory, _collections, user_id),
+    )
+    
+    summary = {
+        "bottle_stats": bottle_stats,
+        "tasting_stats": tasting_stats,
+        "recent_bottles": recent_bottles,
+        "collections": collections,
+    }
+    dashboard_cache.set(user_id, summary, generation=generation)
+    return summary
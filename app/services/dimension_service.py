@@ -0,0 +1,75 @@
+"""Distillery/region/country dimension backfill
+
+Bottles and catalog products get their dimension keys on write (see
+``app.crud.dimension``). This job resolves keys for existing rows, and
+re-resolves everything after aliases are added:
+    python -m app.services.dimension_service [--batch-size 500]
+    python -m app.services.dimension_service --alias country "Estados Unidos" "United States"
+"""
+
+import argparse
+import asyncio
+from typing import Dict
+from sqlalchemy.orm import Session
+from app.crud.dimension import DIMENSIONS, add_dimension_alias, assign_dimensions
+from app.models.bottle import Bottle
+from app.models.catalog_product import CatalogProduct
+
+
+async def backfill_dimensions(db: Session, batch_size: int = 500) -> Dict[str, int]:
+    """Resolve dimension keys for every bottle and catalog product, committing per batch"""
+    processed = {}
+    for model in (Bottle, CatalogProduct):
+        count = 0
+        last_id = None
+        while True:
+            query = db.query(model).order_by(model.id)
+            if last_id is not None:
+                query = query.filter(model.id > last_id)
+            rows = query.limit(batch_size).all()
+            if not rows:
+                break
+
+            for row in rows:
+                await assign_dimensions(db, row)
+            db.commit()
+            count += len(rows)
+            last_id = rows[-1].id
+            db.expunge_all()
+        processed[model.__tablename__] = count
+    return processed
+
+
+def main() -> None:
+    """Run the dimension backfill or add an alias from the command line"""
+    from app.database import SessionLocal, engine
+    from app.utils.invalidation import create_invalidation_table
+
+    parser = argparse.ArgumentParser(description="Resolve distillery/region/country keys")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument(
+        "--alias",
+        nargs=3,
+        metavar=("KIND", "ALIAS", "TARGET"),
+        help=f"Map ALIAS to TARGET before backfilling; KIND is one of {', '.join(DIMENSIONS)}",
+    )
+    args = parser.parse_args()
+    if args.alias and args.alias[0] not in DIMENSIONS:
+        parser.error(f"unknown dimension kind: {args.alias[0]}")
+
+    with engine.begin() as connection:
+        create_invalidation_table(connection)  # so running workers hear about the alias
+    db = SessionLocal()
+    try:
+        if args.alias:
+            asyncio.run(add_dimension_alias(db, *args.alias))
+            db.commit()
+        processed = asyncio.run(backfill_dimensions(db, batch_size=args.batch_size))
+    finally:
+        db.close()
+    for table, count in processed.items():
+        print(f"Resolved dimension keys for {count} {table} row(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Flavor descriptor backfill for tasting notes
+
+Descriptors are extracted when a note is written (see
+``app.utils.descriptors``). Changing ``FLAVOR_DESCRIPTORS`` only affects
+notes written afterwards; run the backfill to re-extract existing notes:
+    python -m app.services.flavor_service [--batch-size 500]
+"""
+
+import argparse
+import asyncio
+from sqlalchemy.orm import Session
+from app.models.tasting_note import TastingNote
+from app.utils.descriptors import build_note_descriptors
+
+
+async def backfill_descriptors(db: Session, batch_size: int = 500) -> int:
+    """Re-extract descriptors for every tasting note, committing per batch"""
+    processed = 0
+    last_id = None
+    while True:
+        query = db.query(TastingNote).order_by(TastingNote.id)
+        if last_id is not None:
+            query = query.filter(TastingNote.id > last_id)
+        notes = query.limit(batch_size).all()
+        if not notes:
+            return processed
+
+        for note in notes:
+            note.descriptors = build_note_descriptors(note)
+        db.commit()
+        processed += len(notes)
+        last_id = notes[-1].id
+        db.expunge_all()
+
+
+def main() -> None:
+    """Run the descriptor backfill from the command line"""
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Re-extract tasting note flavor descriptors")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        processed = asyncio.run(backfill_descriptors(db, batch_size=args.batch_size))
+    finally:
+        db.close()
+    print(f"Extracted descriptors for {processed} tasting note(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""Full-text search over tasting notes
+
+Postgres keeps a ``tsvector`` per note in ``tasting_note_search`` behind a
+GIN index; SQLite uses an FTS5 table keyed by the note ID in an UNINDEXED
+column (rowids are not stable across VACUUM). Both are written in the same transaction as the note by the CRUD layer.
+Results are ranked (ts_rank_cd / bm25), carry a highlighted snippet and page
+with an opaque (score, id) cursor.
+
+Searches are limited to the user's own notes and notes on bottles in public
+collections. Rebuild the index for existing notes with:
+    python -m app.services.note_search_service [--batch-size 500]
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import bindparam, column, func, literal_column, or_, and_, select, table, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.models.collection import Collection, collection_bottles
+from app.models.tasting_note import TastingNote
+from app.utils.serialization import tasting_note_serializer
+
+NOTE_TEXT_FIELDS = ("nose", "palate", "finish", "overall_notes")
+SEARCH_CONFIG = "english"
+HIGHLIGHT = ("<b>", "</b>")
+FTS_WORD = re.compile(r"\w+", re.UNICODE)
+
+note_search = table(
+    "tasting_note_search",
+    column("tasting_note_id", TastingNote.id.type),
+    column("document"),
+)
+note_fts = table("tasting_note_fts", column("note_id", TastingNote.id.type))
+FTS_TABLE = literal_column("tasting_note_fts")  # FTS5 functions take the table itself
+
+
+class SearchUnavailable(Exception):
+    """The database dialect has no tasting note search index"""
+
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def note_document(note: Any) -> str:
+    """Text indexed for a note"""
+    return "\n".join(filter(None, (getattr(note, field) for field in NOTE_TEXT_FIELDS)))
+
+
+def create_note_search_index(connection) -> None:
+    """Create the dialect's search table and index if missing"""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        connection.execute(text(
+            "CREATE TABLE IF NOT EXISTS tasting_note_search ("
+            " tasting_note_id UUID PRIMARY KEY REFERENCES tasting_notes(id) ON DELETE CASCADE,"
+            " document TSVECTOR NOT NULL)"
+        ))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_tasting_note_search_document"
+            " ON tasting_note_search USING GIN (document)"
+        ))
+    elif dialect == "sqlite":
+        columns = [row[1] for row in connection.execute(text("PRAGMA table_info(tasting_note_fts)"))]
+        if columns and "note_id" not in columns:
+            # Older rowid-keyed table; its entries need a reindex anyway
+            connection.execute(text("DROP TABLE tasting_note_fts"))
+        connection.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS tasting_note_fts"
+            " USING fts5(note_id UNINDEXED, body, tokenize='porter unicode61')"
+        ))
+
+
+def _note_id_param(value: UUID):
+    return bindparam("note_id", value, type_=TastingNote.id.type)
+
+
+def index_tasting_note(db: Session, note: TastingNote) -> None:
+    """Insert or replace a note's search entry; the note must be flushed"""
+    document = note_document(note)
+    dialect = _dialect(db)
+    if dialect == "postgresql":
+        vector = func.to_tsvector(SEARCH_CONFIG, document)
+        db.execute(
+            pg_insert(note_search).values(tasting_note_id=note.id, document=vector)
+            .on_conflict_do_update(index_elements=["tasting_note_id"], set_={"document": vector})
+        )
+    elif dialect == "sqlite":
+        remove_tasting_note(db, note.id)
+        db.execute(
+            text(
+                "INSERT INTO tasting_note_fts (note_id, body) VALUES (:note_id, :body)"
+            ).bindparams(_note_id_param(note.id), body=document)
+        )
+
+
+def remove_tasting_note(db: Session, note_id: UUID) -> None:
+    """Drop a note's search entry; call before the note row is deleted"""
+    dialect = _dialect(db)
+    if dialect == "postgresql":
+        db.execute(note_search.delete().where(note_search.c.tasting_note_id == note_id))
+    elif dialect == "sqlite":
+        db.execute(
+            text("DELETE FROM tasting_note_fts WHERE note_id = :note_id")
+            .bindparams(_note_id_param(note_id))
+        )
+
+
+def remove_tasting_notes(db: Session, note_ids: List[UUID]) -> None:
+    """Drop several notes' search entries in one statement; call before the rows are deleted"""
+    if not note_ids:
+        return
+    dialect = _dialect(db)
+    if dialect == "postgresql":
+        db.execute(note_search.delete().where(note_search.c.tasting_note_id.in_(note_ids)))
+    elif dialect == "sqlite":
+        db.execute(
+            text("DELETE FROM tasting_note_fts WHERE note_id IN :note_ids")
+            .bindparams(bindparam("note_ids", note_ids, type_=TastingNote.id.type, expanding=True))
+        )
+
+
+def encode_cursor(score: float, note_id: UUID) -> str:
+    payload = json.dumps([score, str(note_id)]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, UUID]:
+    """Parse a cursor from ``encode_cursor``; raises ValueError if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, note_id = json.loads(base64.urlsafe_b64decode(padded))
+        return float(score), UUID(note_id)
+    except (TypeError, ValueError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _visible_to(user_id: UUID):
+    """Notes a user may search: their own and those on bottles in public collections"""
+    public_bottles = select(collection_bottles.c.bottle_id).join(
+        Collection, Collection.id == collection_bottles.c.collection_id
+    ).where(Collection.is_public == True)
+    return or_(TastingNote.user_id == user_id, TastingNote.bottle_id.in_(public_bottles))
+
+
+def _fts5_query(query: str) -> str:
+    """Quote each word so user input cannot use FTS5 query syntax"""
+    return " ".join(f'"{word}"' for word in FTS_WORD.findall(query))
+
+
+async def search_tasting_notes(
+    db: Session,
+    user_id: UUID,
+    query: str,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Ranked tasting notes matching ``query`` with snippets and a next-page cursor
+
+    Raises SearchUnavailable on dialects without a search index.
+    """
+    dialect = _dialect(db)
+    if dialect == "postgresql":
+        tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+        ranked = select(
+            TastingNote.id.label("id"),
+            func.ts_rank_cd(note_search.c.document, tsquery).label("score"),
+        ).join(
+            note_search, note_search.c.tasting_note_id == TastingNote.id
+        ).where(note_search.c.document.op("@@")(tsquery), _visible_to(user_id))
+    elif dialect == "sqlite":
+        match = _fts5_query(query)
+        if not match:
+            return {"results": [], "next_cursor": None}
+        ranked = select(
+            TastingNote.id.label("id"),
+            (-func.bm25(FTS_TABLE)).label("score"),
+            func.snippet(FTS_TABLE, 1, *HIGHLIGHT, "…", 16).label("snippet"),
+        ).select_from(note_fts).join(
+            TastingNote, TastingNote.id == note_fts.c.note_id
+        ).where(FTS_TABLE.op("MATCH")(match), _visible_to(user_id))
+    else:
+        raise SearchUnavailable(f"Tasting note search is not supported on {dialect}")
+
+    ranked = ranked.subquery()
+    page = select(ranked)
+    if cursor:
+        score, note_id = decode_cursor(cursor)
+        page = page.where(or_(
+            ranked.c.score < score,
+            and_(ranked.c.score == score, ranked.c.id > note_id),
+        ))
+    rows = db.execute(
+        page.order_by(ranked.c.score.desc(), ranked.c.id).limit(limit + 1)
+    ).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
+        return {"results": [], "next_cursor": None}
+
+    ids = [row.id for row in rows]
+    if dialect == "postgresql":
+        headline = func.ts_headline(
+            SEARCH_CONFIG,
+            func.concat_ws(" ", *(getattr(TastingNote, f) for f in NOTE_TEXT_FIELDS)),
+            func.websearch_to_tsquery(SEARCH_CONFIG, query),
+            f"StartSel={HIGHLIGHT[0]}, StopSel={HIGHLIGHT[1]}, MaxWords=24, MinWords=8",
+        )
+        snippets = dict(db.query(TastingNote.id, headline).filter(TastingNote.id.in_(ids)).all())
+    else:
+        snippets = {row.id: row.snippet for row in rows}
+
+    notes = {
+        row.id: row
+        for row in db.query(*tasting_note_serializer.columns).filter(TastingNote.id.in_(ids)).all()
+    }
+    results: List[Dict[str, Any]] = [
+        {
+            **tasting_note_serializer.to_dict(notes[row.id]),
+            "snippet": snippets.get(row.id),
+            "score": float(row.score),
+        }
+        for row in rows
+    ]
+    last = rows[-1]
+    return {
+        "results": results,
+        "next_cursor": encode_cursor(float(last.score), last.id) if has_more else None,
+    }
+
+
+async def reindex_tasting_notes(db: Session, batch_size: int = 500) -> int:
+    """Rebuild the search entry of every tasting note, committing per batch"""
+    create_note_search_index(db.connection())
+    processed = 0
+    last_id = None
+    while True:
+        query = db.query(TastingNote).order_by(TastingNote.id)
+        if last_id is not None:
+            query = query.filter(TastingNote.id > last_id)
+        notes = query.limit(batch_size).all()
+        if not notes:
+            return processed
+
+        for note in notes:
+            index_tasting_note(db, note)
+        db.commit()
+        processed += len(notes)
+        last_id = notes[-1].id
+        db.expunge_all()
+
+
+def main() -> None:
+    """Rebuild the tasting note search index from the command line"""
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild the tasting note search index")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        processed = asyncio.run(reindex_tasting_notes(db, batch_size=args.batch_size))
+    finally:
+        db.close()
+    print(f"Indexed {processed} tasting note(s)")
+
+
+if __name__ == "__main__":
+    main()
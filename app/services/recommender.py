@@ -0,0 +1,313 @@
+"""Item-item collaborative-filtering recommender
+
+Training runs offline: the user x item rating matrix is built from
+``tasting_notes``, mean-centered per user, and the top-K cosine neighbours
+of every item are kept. Bottles are per-user copies, so ratings are pooled
+per catalog product to give items co-ratings.
+
+The artifact is a directory of ``.npy`` arrays plus a JSON sidecar. Workers
+memory-map it and score candidates in one vectorized pass without touching
+the database. Publishing a new model is atomic: arrays go to a fresh
+version directory and the ``CURRENT`` pointer file is swapped last.
+
+Usage:
+    python -m app.services.recommender [--neighbors 50] [--output PATH]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.bottle import Bottle
+from app.models.catalog_product import CatalogProduct
+from app.models.tasting_note import TastingNote
+
+ARRAYS = (
+    "neighbors",
+    "similarities",
+    "user_indptr",
+    "user_items",
+    "user_ratings",
+    "popularity",
+)
+
+
+@dataclass
+class ItemItemModel:
+    """Trained model arrays and the ID/metadata lookups that go with them"""
+
+    neighbors: np.ndarray  # (n_items, K) int32, -1 padded
+    similarities: np.ndarray  # (n_items, K) float32
+    user_indptr: np.ndarray  # CSR row pointers of the centered rating matrix
+    user_items: np.ndarray
+    user_ratings: np.ndarray
+    popularity: np.ndarray  # (n_items,) cold-start score
+    user_ids: List[str]
+    items: List[Dict[str, Any]]
+
+    def __post_init__(self):
+        self._user_rows = {user_id: i for i, user_id in enumerate(self.user_ids)}
+
+    def recommend(self, user_id: UUID, limit: int = 10) -> List[Dict[str, Any]]:
+        """Top items for a user, falling back to popularity for cold starts"""
+        n_items = len(self.items)
+        row = self._user_rows.get(str(user_id))
+        seen = np.zeros(n_items, dtype=bool)
+        scores = np.full(n_items, -np.inf, dtype=np.float32)
+
+        if row is not None:
+            start, end = self.user_indptr[row], self.user_indptr[row + 1]
+            rated = np.asarray(self.user_items[start:end])
+            ratings = np.asarray(self.user_ratings[start:end])
+            seen[rated] = True
+
+            neighbors = np.asarray(self.neighbors[rated])
+            similarities = np.asarray(self.similarities[rated])
+            valid = neighbors >= 0
+            targets = neighbors[valid]
+            weighted = np.bincount(
+                targets,
+                weights=(similarities * ratings[:, None])[valid],
+                minlength=n_items,
+            )
+            norm = np.bincount(targets, weights=np.abs(similarities[valid]), minlength=n_items)
+            has_score = norm > 0
+            scores[has_score] = weighted[has_score] / norm[has_score]
+
+        # Fill anything without a neighbourhood score by popularity, ranked below
+        fallback = ~np.isfinite(scores)
+        scores[fallback] = np.asarray(self.popularity)[fallback] - 1e6
+        scores[seen] = -np.inf
+
+        k = min(limit, int((~seen).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            {**self.items[i], "score": round(float(scores[i]), 4) if scores[i] > -1e5 else None}
+            for i in top
+        ]
+
+
+def train_from_ratings(
+    user_rows: np.ndarray,
+    item_cols: np.ndarray,
+    ratings: np.ndarray,
+    n_users: int,
+    n_items: int,
+    neighbors: int = 50,
+) -> Tuple[np.ndarray, ...]:
+    """Train item-item neighbourhoods from (user, item, rating) triples
+
+    Repeated (user, item) pairs are averaged. Returns the arrays named in
+    ``ARRAYS``, in that order.
+    """
+    from scipy import sparse
+
+    shape = (n_users, n_items)
+    matrix = sparse.csr_matrix((ratings.astype(np.float32), (user_rows, item_cols)), shape=shape)
+    repeats = sparse.csr_matrix(
+        (np.ones(len(ratings), dtype=np.float32), (user_rows, item_cols)), shape=shape
+    )
+    matrix.sum_duplicates()
+    repeats.sum_duplicates()
+    matrix.data /= repeats.data  # both now hold one entry per cell, in the same order
+
+    # Mean-center each user's ratings
+    counts = np.diff(matrix.indptr)
+    sums = np.asarray(matrix.sum(axis=1)).ravel()
+    means = np.divide(sums, counts, out=np.zeros(n_users, dtype=np.float32), where=counts > 0)
+    centered = matrix.copy()
+    centered.data = centered.data - np.repeat(means, counts).astype(np.float32)
+
+    # Cosine similarity between item columns
+    columns = centered.tocsc()
+    norms = np.sqrt(np.asarray(columns.multiply(columns).sum(axis=0)).ravel())
+    inverse = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    normalized = columns @ sparse.diags(inverse.astype(np.float32))
+    similarity = (normalized.T @ normalized).tocsr()
+    similarity.setdiag(0)
+    similarity.eliminate_zeros()
+
+    top_neighbors = np.full((n_items, neighbors), -1, dtype=np.int32)
+    top_similarities = np.zeros((n_items, neighbors), dtype=np.float32)
+    for item in range(n_items):
+        start, end = similarity.indptr[item], similarity.indptr[item + 1]
+        if start == end:
+            continue
+        values = similarity.data[start:end]
+        keep = min(neighbors, end - start)
+        best = np.argpartition(-np.abs(values), keep - 1)[:keep]
+        top_neighbors[item, :keep] = similarity.indices[start:end][best]
+        top_similarities[item, :keep] = values[best]
+
+    # Cold-start score: mean rating damped by how many users rated the item
+    item_counts = np.diff(matrix.tocsc().indptr)
+    item_sums = np.asarray(matrix.sum(axis=0)).ravel()
+    item_means = np.divide(item_sums, item_counts, out=np.zeros(n_items), where=item_counts > 0)
+    popularity = (item_means * np.log1p(item_counts)).astype(np.float32)
+
+    return (
+        top_neighbors,
+        top_similarities,
+        centered.indptr.astype(np.int64),
+        centered.indices.astype(np.int32),
+        centered.data.astype(np.float32),
+        popularity,
+    )
+
+
+async def build_training_data(db: Session):
+    """Read rated tasting notes and pool them per catalog product"""
+    rows = db.query(
+        TastingNote.user_id,
+        Bottle.product_id,
+        func.avg(TastingNote.rating),
+    ).join(
+        Bottle, TastingNote.bottle_id == Bottle.id
+    ).filter(
+        TastingNote.rating != None,
+        Bottle.deleted_at == None,
+        Bottle.product_id != None,
+    ).group_by(
+        TastingNote.user_id, Bottle.product_id
+    ).yield_per(5000)
+
+    user_index: Dict[str, int] = {}
+    item_index: Dict[UUID, int] = {}
+    user_rows, item_cols, ratings = [], [], []
+    for user_id, product_id, rating in rows:
+        user_rows.append(user_index.setdefault(str(user_id), len(user_index)))
+        item_cols.append(item_index.setdefault(product_id, len(item_index)))
+        ratings.append(float(rating))
+
+    products = {
+        product.id: product
+        for product in db.query(
+            CatalogProduct.id,
+            CatalogProduct.name,
+            CatalogProduct.distillery,
+            CatalogProduct.spirit_type,
+        ).filter(CatalogProduct.id.in_(list(item_index))).all()
+    } if item_index else {}
+    items = [
+        {
+            "product_id": str(product_id),
+            "name": products[product_id].name,
+            "distillery": products[product_id].distillery,
+            "spirit_type": getattr(
+                products[product_id].spirit_type, "value", products[product_id].spirit_type
+            ),
+        }
+        for product_id in item_index
+    ]
+
+    return (
+        np.asarray(user_rows, dtype=np.int32),
+        np.asarray(item_cols, dtype=np.int32),
+        np.asarray(ratings, dtype=np.float32),
+        list(user_index),
+        items,
+    )
+
+
+def save_model(arrays: Sequence[np.ndarray], user_ids: List[str], items: List[Dict[str, Any]], path: str) -> str:
+    """Write a model version and atomically point ``CURRENT`` at it"""
+    version = time.strftime("%Y%m%d%H%M%S")
+    directory = os.path.join(path, version)
+    os.makedirs(directory, exist_ok=True)
+    for name, array in zip(ARRAYS, arrays):
+        np.save(os.path.join(directory, f"{name}.npy"), array)
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump({"user_ids": user_ids, "items": items}, f)
+
+    pointer = os.path.join(path, "CURRENT")
+    with open(f"{pointer}.tmp", "w") as f:
+        f.write(version)
+    os.replace(f"{pointer}.tmp", pointer)
+    return directory
+
+
+def load_model(path: str) -> Optional[ItemItemModel]:
+    """Memory-map the current model version, or None if none is published"""
+    try:
+        with open(os.path.join(path, "CURRENT")) as f:
+            directory = os.path.join(path, f.read().strip())
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+    except FileNotFoundError:
+        return None
+    arrays = {
+        name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in ARRAYS
+    }
+    return ItemItemModel(**arrays, user_ids=meta["user_ids"], items=meta["items"])
+
+
+class ModelStore:
+    """Keeps the current model mapped and picks up newly published versions"""
+
+    def __init__(self, path: str, check_interval: float = 30.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._model: Optional[ItemItemModel] = None
+        self._version: Optional[float] = None
+        self._checked_at = 0.0
+
+    def get(self) -> Optional[ItemItemModel]:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._model
+        with self._lock:
+            self._checked_at = now
+            try:
+                version = os.stat(os.path.join(self.path, "CURRENT")).st_mtime
+            except FileNotFoundError:
+                return self._model
+            if version != self._version:
+                self._model = load_model(self.path)
+                self._version = version
+        return self._model
+
+
+model_store = ModelStore(settings.RECOMMENDER_MODEL_PATH)
+
+
+def main() -> None:
+    """Train and publish a model from the command line"""
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Train the item-item recommender")
+    parser.add_argument("--neighbors", type=int, default=50)
+    parser.add_argument("--output", default=settings.RECOMMENDER_MODEL_PATH)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user_rows, item_cols, ratings, user_ids, items = asyncio.run(build_training_data(db))
+    finally:
+        db.close()
+
+    started = time.perf_counter()
+    arrays = train_from_ratings(
+        user_rows, item_cols, ratings, len(user_ids), len(items), neighbors=args.neighbors
+    )
+    directory = save_model(arrays, user_ids, items, args.output)
+    print(
+        f"Trained on {len(ratings)} ratings ({len(user_ids)} users, {len(items)} items) "
+        f"in {time.perf_counter() - started:.2f}s -> {directory}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Purge of long soft-deleted bottles
+
+Soft-deleted bottles stay restorable for ``BOTTLE_RETENTION_DAYS``. This job
+then hard-deletes them together with their tasting notes (with the notes'
+descriptors and search entries) and collection links. It works through
+``--batch-size`` bottles per transaction and commits after each, so no lock
+is held for long; on Postgres the batch's bottles are claimed with
+``FOR UPDATE SKIP LOCKED``, so a concurrent restore either wins or waits
+for that one batch.
+
+Counters, the sync change log and caches are updated as for any other
+delete. With ``--archive`` every purged bottle is first appended to a JSON
+lines file along with its notes and collection IDs.
+
+Usage:
+    python -m app.services.retention_service [--days 30] [--batch-size 100] [--pause 0]
+        [--archive FILE] [--dry-run]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+from uuid import UUID
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.crud.change_log import MEMBERSHIP, NOTE, record_change
+from app.crud.user_stats import apply_note_delta
+from app.models.bottle import Bottle
+from app.models.collection import collection_bottles
+from app.models.tasting_note import TastingNote
+from app.models.tasting_note_descriptor import TastingNoteDescriptor
+from app.services.note_search_service import remove_tasting_notes
+from app.utils.invalidation import COLLECTION_CHANGED, NOTE_CHANGED, publish
+from app.utils.serialization import bottle_serializer, tasting_note_serializer
+
+
+def count_expired_bottles(db: Session, days: int) -> int:
+    """Number of bottles the next purge would remove"""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    return db.query(Bottle).filter(Bottle.deleted_at < cutoff).count()
+
+
+def _archive(
+    db: Session,
+    archive: TextIO,
+    bottle_ids: List[UUID],
+    memberships: List[Tuple[UUID, UUID]],
+) -> None:
+    """Append the batch's bottles, with their notes and collection IDs, as JSON lines"""
+    bottles = bottle_serializer.to_dicts(
+        db.query(*bottle_serializer.columns).filter(Bottle.id.in_(bottle_ids)).all()
+    )
+    notes: Dict[UUID, List[Dict[str, Any]]] = {}
+    for note in tasting_note_serializer.to_dicts(
+        db.query(*tasting_note_serializer.columns).filter(TastingNote.bottle_id.in_(bottle_ids)).all()
+    ):
+        notes.setdefault(note["bottle_id"], []).append(note)
+    collections: Dict[UUID, List[UUID]] = {}
+    for collection_id, bottle_id in memberships:
+        collections.setdefault(bottle_id, []).append(collection_id)
+
+    for bottle in bottles:
+        archive.write(json.dumps({
+            "bottle": bottle,
+            "tasting_notes": notes.get(bottle["id"], []),
+            "collection_ids": collections.get(bottle["id"], []),
+        }, default=str) + "\n")
+    archive.flush()
+
+
+async def _purge_batch(db: Session, bottles: List[Any], archive: Optional[TextIO]) -> Dict[str, int]:
+    """Hard-delete one batch of bottles and everything attached to them"""
+    bottle_ids = [bottle.id for bottle in bottles]
+    owners = {bottle.id: bottle.user_id for bottle in bottles}
+    spirit_types = {bottle.id: bottle.spirit_type for bottle in bottles}
+
+    notes = db.query(
+        TastingNote.id, TastingNote.user_id, TastingNote.bottle_id, TastingNote.rating
+    ).filter(TastingNote.bottle_id.in_(bottle_ids)).all()
+    memberships = db.query(
+        collection_bottles.c.collection_id, collection_bottles.c.bottle_id
+    ).filter(collection_bottles.c.bottle_id.in_(bottle_ids)).all()
+    if archive is not None:
+        _archive(db, archive, bottle_ids, memberships)
+
+    # Notes on deleted bottles still count in their authors' stats until now
+    note_totals: Dict[tuple, Tuple[int, int, int]] = {}
+    for note in notes:
+        key = (note.user_id, spirit_types[note.bottle_id])
+        count, rated, rating_sum = note_totals.get(key, (0, 0, 0))
+        note_totals[key] = (count + 1, rated + (note.rating is not None), rating_sum + (note.rating or 0))
+    for (user_id, spirit_type), (count, rated, rating_sum) in note_totals.items():
+        await apply_note_delta(
+            db, user_id, spirit_type, -1, count=count, rated_count=rated, rating_sum=rating_sum
+        )
+
+    for note in notes:
+        await record_change(db, note.user_id, NOTE, note.id, deleted=True)
+        publish(
+            db, NOTE_CHANGED, "deleted", user_id=note.user_id, bottle_id=note.bottle_id,
+            note_id=str(note.id), descriptors_changed=True,
+        )
+    for collection_id, bottle_id in memberships:
+        user_id = owners[bottle_id]
+        await record_change(db, user_id, MEMBERSHIP, bottle_id, deleted=True, parent_id=collection_id)
+        publish(
+            db, COLLECTION_CHANGED, "bottle_removed", user_id=user_id, bottle_id=bottle_id,
+            collection_id=str(collection_id),
+        )
+
+    remove_tasting_notes(db, [note.id for note in notes])
+    db.query(TastingNoteDescriptor).filter(
+        TastingNoteDescriptor.bottle_id.in_(bottle_ids)
+    ).delete(synchronize_session=False)
+    db.query(TastingNote).filter(TastingNote.bottle_id.in_(bottle_ids)).delete(synchronize_session=False)
+    db.execute(collection_bottles.delete().where(collection_bottles.c.bottle_id.in_(bottle_ids)))
+    db.query(Bottle).filter(Bottle.id.in_(bottle_ids)).delete(synchronize_session=False)
+    return {"bottles": len(bottle_ids), "tasting_notes": len(notes), "memberships": len(memberships)}
+
+
+async def purge_deleted_bottles(
+    db: Session,
+    days: int,
+    batch_size: int = 100,
+    archive: Optional[TextIO] = None,
+    pause: float = 0.0,
+) -> Dict[str, int]:
+    """Hard-delete bottles soft-deleted more than ``days`` ago, committing per batch
+
+    Sleeps ``pause`` seconds between batches to leave room for other writers.
+    Returns how many bottles, tasting notes and collection links were removed.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    removed = {"bottles": 0, "tasting_notes": 0, "memberships": 0}
+    while True:
+        bottles = db.query(Bottle.id, Bottle.user_id, Bottle.spirit_type).filter(
+            Bottle.deleted_at < cutoff
+        ).order_by(Bottle.deleted_at, Bottle.id).limit(batch_size).with_for_update(
+            skip_locked=True
+        ).all()
+        if not bottles:
+            return removed
+
+        for name, count in (await _purge_batch(db, bottles, archive)).items():
+            removed[name] += count
+        db.commit()
+        if pause:
+            time.sleep(pause)
+
+
+def main() -> None:
+    """Purge long soft-deleted bottles from the command line"""
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Hard-delete bottles soft-deleted long ago")
+    parser.add_argument("--days", type=int, default=settings.BOTTLE_RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=settings.RETENTION_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between batches")
+    parser.add_argument("--archive", help="append purged bottles to this JSON lines file first")
+    parser.add_argument("--dry-run", action="store_true", help="only count the bottles to purge")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    archive = None
+    try:
+        if args.dry_run:
+            print(f"{count_expired_bottles(db, args.days)} bottle(s) would be purged")
+            return
+        if args.archive:
+            archive = open(args.archive, "a", encoding="utf-8")
+        removed = asyncio.run(purge_deleted_bottles(
+            db, args.days, batch_size=args.batch_size, archive=archive, pause=args.pause
+        ))
+    finally:
+        if archive is not None:
+            archive.close()
+        db.close()
+    print(
+        f"Purged {removed['bottles']} bottle(s), {removed['tasting_notes']} tasting note(s)"
+        f" and {removed['memberships']} collection link(s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,11 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from app.models.bottle import Bottle
 from app.models.tasting_note import TastingNote
+from app.models.tasting_note_descriptor import TastingNoteDescriptor
 from app.models.user import User
+from app.crud.bottle import defer_heavy_columns
+from app.services.similarity_service import similarity_index
+from app.services.recommender import model_store
 
 
 async def get_bottle_review_summary(
@@ -67,50 +71,36 @@ async def get_user_flavor_profile(
     user_id: UUID,
 ) -> Dict[str, Any]:
     """Get user's flavor preferences based on their tasting notes"""
+    from app.crud.user_stats import get_user_stats
+    
+    stats, spirits = await get_user_stats(db, user_id)
+    
     # Get user's average rating
-    avg_rating = db.query(func.avg(TastingNote.rating)).filter(
-        TastingNote.user_id == user_id,
-        TastingNote.rating != None,
-    ).scalar()
+    avg_rating = (
+        stats.note_rating_sum / stats.rated_note_count if stats.rated_note_count else None
+    )
     
-    # Most tasted spirits
-    most_tasted = db.query(
-        Bottle.spirit_type,
-        func.count(TastingNote.id).label("count"),
-        func.avg(TastingNote.rating).label("avg_rating"),
-    ).join(
-        Bottle, TastingNote.bottle_id == Bottle.id
+    # Most tasted spirits (rated notes only)
+    most_tasted = [
+        (
+            spirit.spirit_type,
+            spirit.rated_note_count,
+            spirit.note_rating_sum / spirit.rated_note_count,
+        )
+        for spirit in sorted(spirits, key=lambda s: s.rated_note_count, reverse=True)
+        if spirit.rated_note_count > 0
+    ][:5]
+    
+    # Most mentioned tasting descriptors (number of notes mentioning each)
+    top_descriptors = db.query(
+        TastingNoteDescriptor.descriptor,
+        func.count(TastingNoteDescriptor.tasting_note_id).label("frequency"),
     ).filter(
-        TastingNote.user_id == user_id,
-        TastingNote.rating != None,
-    ).group_by(Bottle.spirit_type).order_by(
-        func.count(TastingNote.id).desc()
+        TastingNoteDescriptor.user_id == user_id
+    ).group_by(TastingNoteDescriptor.descriptor).order_by(
+        func.count(TastingNoteDescriptor.tasting_note_id).desc()
     ).limit(5).all()
     
-    # Most mentioned tasting descriptors (simple analysis of common words)
-    all_notes = db.query(TastingNote).filter(
-        TastingNote.user_id == user_id
-    ).all()
-    
-    common_descriptors = {}
-    descriptors = [
-        "sweet", "smooth", "spicy", "fruity", "oaky", "vanilla", "caramel",
-        "warm", "dry", "floral", "herbal", "smoky", "peppery", "citrus",
-    ]
-    
-    for note in all_notes:
-        text = f"{note.nose} {note.palate} {note.finish}".lower()
-        for descriptor in descriptors:
-            if descriptor in text:
-                common_descriptors[descriptor] = common_descriptors.get(descriptor, 0) + 1
-    
-    # Sort by frequency
-    top_descriptors = sorted(
-        common_descriptors.items(),
-        key=lambda x: x[1],
-        reverse=True
-    )[:5]
-    
     return {
         "user_id": user_id,
         "average_rating": float(avg_rating) if avg_rating else None,
@@ -134,29 +124,9 @@ async def get_similar_bottles(
     bottle_id: UUID,
     limit: int = 5,
 ) -> List[Dict[str, Any]]:
-    """Get bottles similar to the given bottle based on spirit type and ratings"""
-    # Get the original bottle
-    bottle = db.query(Bottle).filter(Bottle.id == bottle_id).first()
-    if not bottle:
-        return []
-    
-    # Find bottles with same spirit type and similar rating
-    similar = db.query(Bottle).filter(
-        Bottle.spirit_type == bottle.spirit_type,
-        Bottle.id != bottle_id,
-        Bottle.deleted_at == None,
-    ).order_by(Bottle.created_at.desc()).limit(limit).all()
-    
-    return [
-        {
-            "id": b.id,
-            "name": b.name,
-            "spirit_type": b.spirit_type,
-            "distillery": b.distillery,
-            "rating": b.rating,
-        }
-        for b in similar
-    ]
+    """Get the bottles most similar to the given bottle by feature-vector cosine"""
+    similarity_index.refresh(db)
+    return similarity_index.most_similar(bottle_id, limit=limit)
 
 
 async def get_recommended_bottles(
@@ -176,13 +146,13 @@ async def get_recommended_bottles(
     
     if not preferred_spirits:
         # If no tasting history, recommend highly-rated bottles
-        recommendations = db.query(Bottle).filter(
+        recommendations = db.query(Bottle).options(*defer_heavy_columns()).filter(
             Bottle.deleted_at == None,
             Bottle.rating >= 4,
         ).order_by(Bottle.rating.desc()).limit(limit).all()
     else:
         # Recommend bottles of preferred spirits with high ratings
-        recommendations = db.query(Bottle).filter(
+        recommendations = db.query(Bottle).options(*defer_heavy_columns()).filter(
             Bottle.spirit_type.in_(preferred_spirits),
             Bottle.deleted_at == None,
             Bottle.rating >= 3,
@@ -198,3 +168,18 @@ async def get_recommended_bottles(
         }
         for b in recommendations
     ]
+
+
+async def get_collaborative_recommendations(
+    db: Session,
+    user_id: UUID,
+    limit: int = 10,
+) -> List[Dict[str, Any]]:
+    """Get recommendations from the offline-trained model, served without the DB
+
+    Falls back to spirit-type recommendations until a model is published.
+    """
+    model = model_store.get()
+    if model is None:
+        return await get_recommended_bottles(db, user_id, limit=limit)
+    return model.recommend(user_id, limit=limit)
@@ -1,12 +1,23 @@
 """Search and discovery service for bottles"""
 
-from typing import Optional, List, Dict, Any
+import operator
+import re
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any, Sequence, Tuple
 from uuid import UUID
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, not_, false, func, case, literal_column, null, select, tuple_
 from app.models.bottle import Bottle, SpiritType
+from app.models.catalog_product import CatalogProduct
+from app.models.dimension import Distillery, Region, Country
+from app.crud.dimension import dimension_key, find_dimension_id, find_dimension_ids
+from app.utils.cache import facet_cache, query_plan_cache
+from app.crud.bottle import defer_heavy_columns
 from decimal import Decimal
 
+# Upper bounds in USD of the price facet bands; the last band is open-ended
+FACET_PRICE_BANDS = (25, 50, 100, 250)
+
 
 async def search_bottles(
     db: Session,
@@ -14,8 +25,13 @@ async def search_bottles(
     user_id: Optional[UUID] = None,
     skip: int = 0,
     limit: int = 50,
+    columns: Optional[Sequence[Any]] = None,
 ) -> List[Bottle]:
-    """Search bottles by name, distillery, or region"""
+    """Search bottles by name, distillery, or region
+
+    When ``columns`` is given only those columns are selected and plain rows
+    are returned instead of ORM objects.
+    """
     search_filter = or_(
         Bottle.name.ilike(f"%{query}%"),
         Bottle.distillery.ilike(f"%{query}%"),
@@ -23,7 +39,11 @@ async def search_bottles(
         Bottle.country.ilike(f"%{query}%"),
     )
     
-    base_query = db.query(Bottle).filter(
+    if columns:
+        base_query = db.query(*columns)
+    else:
+        base_query = db.query(Bottle).options(*defer_heavy_columns())
+    base_query = base_query.filter(
         search_filter,
         Bottle.deleted_at == None,
     )
@@ -36,6 +56,87 @@ async def search_bottles(
     ).offset(skip).limit(limit).all()
 
 
+async def search_catalog(
+    db: Session,
+    query: str,
+    spirit_type: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 50,
+) -> List[CatalogProduct]:
+    """Search catalog products by name, distillery, region or country"""
+    search_filter = or_(
+        CatalogProduct.name.ilike(f"%{query}%"),
+        CatalogProduct.distillery.ilike(f"%{query}%"),
+        CatalogProduct.region.ilike(f"%{query}%"),
+        CatalogProduct.country.ilike(f"%{query}%"),
+    )
+    base_query = db.query(CatalogProduct).filter(search_filter)
+    if spirit_type:
+        base_query = base_query.filter(CatalogProduct.spirit_type == spirit_type)
+    return base_query.order_by(CatalogProduct.name).offset(skip).limit(limit).all()
+
+
+async def bottle_filter_conditions(
+    db: Session,
+    user_id: Optional[UUID] = None,
+    spirit_type: Optional[str] = None,
+    min_proof: Optional[float] = None,
+    max_proof: Optional[float] = None,
+    min_price: Optional[Decimal] = None,
+    max_price: Optional[Decimal] = None,
+    region: Optional[str] = None,
+    country: Optional[str] = None,
+    min_rating: Optional[int] = None,
+    max_rating: Optional[int] = None,
+    release_year_from: Optional[int] = None,
+    release_year_to: Optional[int] = None,
+) -> Tuple[list, tuple]:
+    """WHERE conditions for the bottle filters plus a normalized signature
+
+    Region and country resolve to dimension keys first, so spellings that
+    resolve to the same keys share a signature.
+    """
+    region_ids = await find_dimension_ids(db, "region", region) if region else None
+    country_ids = await find_dimension_ids(db, "country", country) if country else None
+    values = {
+        "user_id": user_id,
+        "spirit_type": getattr(spirit_type, "value", spirit_type),
+        "min_proof": min_proof,
+        "max_proof": max_proof,
+        "min_price": min_price,
+        "max_price": max_price,
+        "region_ids": tuple(sorted(region_ids)) if region_ids is not None else None,
+        "country_ids": tuple(sorted(country_ids)) if country_ids is not None else None,
+        "min_rating": min_rating,
+        "max_rating": max_rating,
+        "release_year_from": release_year_from,
+        "release_year_to": release_year_to,
+    }
+    
+    conditions = [Bottle.deleted_at == None]
+    for name, condition in (
+        ("user_id", lambda v: Bottle.user_id == v),
+        ("spirit_type", lambda v: Bottle.spirit_type == v),
+        ("min_proof", lambda v: Bottle.proof >= v),
+        ("max_proof", lambda v: Bottle.proof <= v),
+        ("min_price", lambda v: Bottle.price_paid >= v),
+        ("max_price", lambda v: Bottle.price_paid <= v),
+        ("region_ids", lambda v: Bottle.region_id.in_(v)),
+        ("country_ids", lambda v: Bottle.country_id.in_(v)),
+        ("min_rating", lambda v: Bottle.rating >= v),
+        ("max_rating", lambda v: Bottle.rating <= v),
+        ("release_year_from", lambda v: Bottle.release_year >= v),
+        ("release_year_to", lambda v: Bottle.release_year <= v),
+    ):
+        if values[name] is not None:
+            conditions.append(condition(values[name]))
+    
+    signature = tuple(
+        (name, str(value)) for name, value in values.items() if value is not None
+    )
+    return conditions, signature
+
+
 async def filter_bottles(
     db: Session,
     user_id: Optional[UUID] = None,
@@ -54,45 +155,34 @@ async def filter_bottles(
     limit: int = 50,
     sort_by: str = "created_at",
     sort_order: str = "desc",
+    columns: Optional[Sequence[Any]] = None,
 ) -> tuple[List[Bottle], int]:
-    """Advanced filtering of bottles with multiple criteria"""
-    query = db.query(Bottle).filter(Bottle.deleted_at == None)
-    
-    if user_id:
-        query = query.filter(Bottle.user_id == user_id)
-    
-    if spirit_type:
-        query = query.filter(Bottle.spirit_type == spirit_type)
-    
-    if min_proof is not None:
-        query = query.filter(Bottle.proof >= min_proof)
-    
-    if max_proof is not None:
-        query = query.filter(Bottle.proof <= max_proof)
-    
-    if min_price is not None:
-        query = query.filter(Bottle.price_paid >= min_price)
-    
-    if max_price is not None:
-        query = query.filter(Bottle.price_paid <= max_price)
-    
-    if region:
-        query = query.filter(Bottle.region.ilike(f"%{region}%"))
-    
-    if country:
-        query = query.filter(Bottle.country.ilike(f"%{country}%"))
-    
-    if min_rating is not None:
-        query = query.filter(Bottle.rating >= min_rating)
-    
-    if max_rating is not None:
-        query = query.filter(Bottle.rating <= max_rating)
-    
-    if release_year_from is not None:
-        query = query.filter(Bottle.release_year >= release_year_from)
-    
-    if release_year_to is not None:
-        query = query.filter(Bottle.release_year <= release_year_to)
+    """Advanced filtering of bottles with multiple criteria
+
+    When ``columns`` is given only those columns are selected and plain rows
+    are returned instead of ORM objects.
+    """
+    if columns:
+        query = db.query(*columns)
+    else:
+        query = db.query(Bottle).options(*defer_heavy_columns())
+    
+    conditions, _ = await bottle_filter_conditions(
+        db,
+        user_id=user_id,
+        spirit_type=spirit_type,
+        min_proof=min_proof,
+        max_proof=max_proof,
+        min_price=min_price,
+        max_price=max_price,
+        region=region,
+        country=country,
+        min_rating=min_rating,
+        max_rating=max_rating,
+        release_year_from=release_year_from,
+        release_year_to=release_year_to,
+    )
+    query = query.filter(*conditions)
     
     # Get total count before pagination
     total_count = query.count()
@@ -110,43 +200,283 @@ async def filter_bottles(
     return bottles, total_count
 
 
+def _price_band(column):
+    """CASE expression labelling a price with its FACET_PRICE_BANDS band
+
+    Rendered with inline literals so Postgres sees the same expression in
+    the select list and in GROUPING SETS.
+    """
+    bounds = (0,) + FACET_PRICE_BANDS
+    return case(
+        (column.is_(None), null()),
+        *[
+            (column < literal_column(str(upper)), literal_column(f"'{lower}-{upper}'"))
+            for lower, upper in zip(bounds, bounds[1:])
+        ],
+        else_=literal_column(f"'{FACET_PRICE_BANDS[-1]}+'"),
+    )
+
+
+async def get_filter_facets(db: Session, **filters) -> Dict[str, List[Dict[str, Any]]]:
+    """Counts of the filtered bottles by spirit type, country, region, rating and price band
+
+    Accepts the same filters as ``filter_bottles``. Postgres computes every
+    facet in one GROUPING SETS scan; other databases run one GROUP BY per
+    facet. Results are cached per normalized filter signature for
+    ``FACET_CACHE_TTL`` seconds, so counts can lag writes by that much.
+    """
+    conditions, signature = await bottle_filter_conditions(db, **filters)
+    cached = facet_cache.get(signature)
+    if cached is not None:
+        return cached
+    
+    dimensions = {
+        "spirit_type": Bottle.spirit_type,
+        "country": Bottle.country_id,
+        "region": Bottle.region_id,
+        "rating": Bottle.rating,
+        "price_band": _price_band(Bottle.price_paid),
+    }
+    counts: Dict[str, List[Tuple[Any, int]]] = {name: [] for name in dimensions}
+    
+    if db.get_bind().dialect.name == "postgresql":
+        columns = list(dimensions.values())
+        rows = db.query(
+            *columns,
+            *[func.grouping(column) for column in columns],
+            func.count(Bottle.id),
+        ).filter(*conditions).group_by(
+            func.grouping_sets(*[tuple_(column) for column in columns])
+        ).all()
+        width = len(columns)
+        for row in rows:
+            # GROUPING() is 0 for the column the row's grouping set is on
+            facet = list(dimensions)[list(row[width:2 * width]).index(0)]
+            counts[facet].append((row[list(dimensions).index(facet)], row[-1]))
+    else:
+        for facet, column in dimensions.items():
+            counts[facet] = db.query(column, func.count(Bottle.id)).filter(
+                *conditions
+            ).group_by(column).all()
+    
+    names = {}
+    for facet, model in (("country", Country), ("region", Region)):
+        ids = [value for value, _ in counts[facet] if value is not None]
+        names[facet] = dict(
+            db.query(model.id, model.name).filter(model.id.in_(ids)).all()
+        ) if ids else {}
+    
+    def entry(facet: str, value: Any, count: int) -> Dict[str, Any]:
+        if facet in names:
+            return {"id": value, "value": names[facet].get(value), "count": count}
+        return {"value": getattr(value, "value", value), "count": count}
+    
+    facets = {
+        facet: sorted(
+            (entry(facet, value, count) for value, count in rows if value is not None),
+            key=lambda item: -item["count"],
+        )
+        for facet, rows in counts.items()
+    }
+    facet_cache.set(signature, facets)
+    return facets
+
+
+class QuerySyntaxError(ValueError):
+    """Raised for structured queries that cannot be parsed or name unknown fields"""
+
+
+QUERY_TERM = re.compile(r'(-)?(?:([a-z_]+):)?("(?:[^"\\]|\\.)*"|\S+)', re.IGNORECASE)
+QUERY_COMPARISON = re.compile(r"^(>=|<=|>|<|=)?(.+)$")
+QUERY_OPERATORS = {
+    "=": operator.eq,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+QUERY_NUMERIC_FIELDS = {
+    "proof": Bottle.proof,
+    "rating": Bottle.rating,
+    "price": Bottle.price_paid,
+    "year": Bottle.release_year,
+}
+QUERY_DIMENSION_FIELDS = {
+    "distillery": (Distillery, Bottle.distillery_id),
+    "region": (Region, Bottle.region_id),
+    "country": (Country, Bottle.country_id),
+}
+QUERY_SORT_FIELDS = {
+    "created": Bottle.created_at,
+    "name": Bottle.name,
+    "rating": Bottle.rating,
+    "price": Bottle.price_paid,
+    "proof": Bottle.proof,
+}
+QUERY_FIELDS = (
+    sorted(QUERY_NUMERIC_FIELDS) + sorted(QUERY_DIMENSION_FIELDS) + ["name", "type", "sort"]
+)
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """Compiled structured query: WHERE conditions and ORDER BY"""
+
+    conditions: Tuple[Any, ...]
+    order_by: Tuple[Any, ...]
+
+
+def parse_query(query: str) -> List[Tuple[bool, Optional[str], str]]:
+    """Split a structured query into (negated, field, value) terms
+
+    Fields are lowercased; quoted values have their quotes removed.
+    """
+    terms = []
+    for negated, field, value in QUERY_TERM.findall(query):
+        if value.startswith('"'):
+            if len(value) < 2 or not value.endswith('"'):
+                raise QuerySyntaxError(f"Unterminated quote in {value!r}")
+            value = value[1:-1].replace('\\"', '"')
+        if not value:
+            raise QuerySyntaxError(f"Missing value for {field or 'term'}")
+        field = field.lower() or None
+        if field is not None and field not in QUERY_FIELDS:
+            raise QuerySyntaxError(
+                f"Unknown field {field!r}; expected one of {', '.join(QUERY_FIELDS)}"
+            )
+        terms.append((bool(negated), field, value))
+    return terms
+
+
+def _numeric_condition(field: str, value: str):
+    column = QUERY_NUMERIC_FIELDS[field]
+    try:
+        if ".." in value:
+            low, high = value.split("..", 1)
+            return column.between(float(low), float(high))
+        op, number = QUERY_COMPARISON.match(value).groups()
+        return QUERY_OPERATORS[op or "="](column, float(number))
+    except ValueError:
+        raise QuerySyntaxError(f"{field} expects a number, comparison or range, got {value!r}")
+
+
+async def _dimension_condition(db: Session, field: str, value: str):
+    """Keyed lookup: exact (alias-aware) match, or key prefix with a trailing *"""
+    model, key_column = QUERY_DIMENSION_FIELDS[field]
+    if value.endswith("*"):
+        prefix = dimension_key(value[:-1])
+        return key_column.in_(select(model.id).where(model.key.like(f"{prefix}%")))
+    dimension_id = await find_dimension_id(db, field, value)
+    return key_column == dimension_id if dimension_id is not None else false()
+
+
+async def compile_query(db: Session, query: str) -> QueryPlan:
+    """Compile a structured query such as ``distillery:"Buffalo Trace" proof:>100``
+
+    Dimension fields become integer key comparisons, numeric fields become
+    range predicates and ``name:foo*`` a prefix match. Only bare words fall
+    back to a substring scan of bottle names. Plans are cached per query
+    string.
+    """
+    cached = query_plan_cache.get(query)
+    if cached is not None:
+        return cached
+
+    conditions = [Bottle.deleted_at == None]
+    order_by = []
+    for negated, field, value in parse_query(query):
+        if field == "sort":
+            descending = value.startswith("-")
+            column = QUERY_SORT_FIELDS.get(value.lstrip("-").lower())
+            if column is None:
+                raise QuerySyntaxError(
+                    f"Cannot sort by {value!r}; expected one of {', '.join(QUERY_SORT_FIELDS)}"
+                )
+            order_by.append(column.desc() if descending else column.asc())
+            continue
+
+        if field in QUERY_NUMERIC_FIELDS:
+            condition = _numeric_condition(field, value)
+        elif field in QUERY_DIMENSION_FIELDS:
+            condition = await _dimension_condition(db, field, value)
+        elif field == "type":
+            try:
+                condition = Bottle.spirit_type == SpiritType(value.lower())
+            except ValueError:
+                raise QuerySyntaxError(
+                    f"Unknown spirit type {value!r}; expected one of "
+                    f"{', '.join(t.value for t in SpiritType)}"
+                )
+        elif field == "name" and value.endswith("*"):
+            condition = Bottle.name.ilike(f"{value[:-1]}%")
+        else:
+            condition = Bottle.name.ilike(f"%{value}%")
+        conditions.append(not_(condition) if negated else condition)
+
+    plan = QueryPlan(tuple(conditions), tuple(order_by) or (Bottle.created_at.desc(),))
+    query_plan_cache.set(query, plan)
+    return plan
+
+
+async def query_bottles(
+    db: Session,
+    query: str,
+    skip: int = 0,
+    limit: int = 50,
+    columns: Optional[Sequence[Any]] = None,
+) -> tuple[List[Bottle], int]:
+    """Run a structured query (see ``compile_query``); returns bottles and total count"""
+    plan = await compile_query(db, query)
+    if columns:
+        base_query = db.query(*columns)
+    else:
+        base_query = db.query(Bottle).options(*defer_heavy_columns())
+    base_query = base_query.filter(*plan.conditions)
+    total_count = base_query.count()
+    bottles = base_query.order_by(*plan.order_by).offset(skip).limit(limit).all()
+    return bottles, total_count
+
+
 async def get_popular_bottles(
     db: Session,
     limit: int = 10,
 ) -> List[Dict[str, Any]]:
-    """Get most popular bottles (by rating)"""
+    """Get most popular catalog products by community rating across all owners"""
     from app.models.tasting_note import TastingNote
     
-    bottles = db.query(
-        Bottle.id,
-        Bottle.name,
-        Bottle.spirit_type,
-        Bottle.distillery,
-        Bottle.rating,
-        func.avg(TastingNote.rating).label("avg_community_rating"),
+    community_rating = func.avg(TastingNote.rating)
+    products = db.query(
+        CatalogProduct.id,
+        CatalogProduct.name,
+        CatalogProduct.spirit_type,
+        CatalogProduct.distillery,
+        func.count(func.distinct(Bottle.user_id)).label("owners"),
+        community_rating.label("avg_community_rating"),
         func.count(TastingNote.id).label("total_reviews"),
+    ).join(
+        Bottle, Bottle.product_id == CatalogProduct.id
     ).outerjoin(
         TastingNote, Bottle.id == TastingNote.bottle_id
     ).filter(
         Bottle.deleted_at == None,
-        Bottle.rating != None,
     ).group_by(
-        Bottle.id
+        CatalogProduct.id
     ).order_by(
-        func.avg(TastingNote.rating).desc()
+        community_rating.desc().nullslast(),
+        func.count(TastingNote.id).desc(),
     ).limit(limit).all()
     
     return [
         {
-            "id": b[0],
-            "name": b[1],
-            "spirit_type": str(b[2]),
-            "distillery": b[3],
-            "personal_rating": b[4],
-            "community_rating": float(b[5]) if b[5] else None,
-            "total_reviews": b[6],
+            "id": p[0],
+            "name": p[1],
+            "spirit_type": str(p[2]),
+            "distillery": p[3],
+            "owners": p[4],
+            "community_rating": float(p[5]) if p[5] else None,
+            "total_reviews": p[6],
         }
-        for b in bottles
+        for p in products
     ]
 
 
@@ -195,10 +525,15 @@ async def get_bottles_by_region(
     region: str,
     skip: int = 0,
     limit: int = 50,
+    columns: Optional[Sequence[Any]] = None,
 ) -> List[Bottle]:
-    """Get all bottles from a specific region"""
-    return db.query(Bottle).filter(
-        Bottle.region.ilike(f"%{region}%"),
+    """Get all bottles from a specific region (plain rows when ``columns`` is given)"""
+    if columns:
+        query = db.query(*columns)
+    else:
+        query = db.query(Bottle).options(*defer_heavy_columns())
+    return query.filter(
+        Bottle.region_id.in_(await find_dimension_ids(db, "region", region)),
         Bottle.deleted_at == None,
     ).order_by(Bottle.rating.desc()).offset(skip).limit(limit).all()
 
@@ -208,10 +543,15 @@ async def get_bottles_by_country(
     country: str,
     skip: int = 0,
     limit: int = 50,
+    columns: Optional[Sequence[Any]] = None,
 ) -> List[Bottle]:
-    """Get all bottles from a specific country"""
-    return db.query(Bottle).filter(
-        Bottle.country.ilike(f"%{country}%"),
+    """Get all bottles from a specific country (plain rows when ``columns`` is given)"""
+    if columns:
+        query = db.query(*columns)
+    else:
+        query = db.query(Bottle).options(*defer_heavy_columns())
+    return query.filter(
+        Bottle.country_id.in_(await find_dimension_ids(db, "country", country)),
         Bottle.deleted_at == None,
     ).order_by(Bottle.rating.desc()).offset(skip).limit(limit).all()
 
@@ -220,32 +560,111 @@ async def get_distillery_profile(
     db: Session,
     distillery: str,
 ) -> Optional[Dict[str, Any]]:
-    """Get profile data for a distillery"""
-    bottles = db.query(Bottle).filter(
-        Bottle.distillery.ilike(f"%{distillery}%"),
-        Bottle.deleted_at == None,
-    ).all()
+    """Get profile data for a distillery by exact name or alias
+
+    One aggregate query grouped by spirit type, region and country, so
+    memory is bounded by the number of distinct combinations rather than
+    the number of bottles.
+    """
+    from app.models.tasting_note import TastingNote
     
-    if not bottles:
+    distillery_id = await find_dimension_id(db, "distillery", distillery)
+    if distillery_id is None:
         return None
     
-    from app.models.tasting_note import TastingNote
-    avg_rating = db.query(func.avg(TastingNote.rating)).join(
-        Bottle, TastingNote.bottle_id == Bottle.id
+    live_bottles = and_(Bottle.distillery_id == distillery_id, Bottle.deleted_at == None)
+    total_products = db.query(
+        func.count(func.distinct(Bottle.product_id))
+    ).filter(live_bottles).scalar_subquery()
+    
+    groups = db.query(
+        Bottle.spirit_type,
+        Region.name,
+        Country.name,
+        func.count(func.distinct(Bottle.id)),
+        func.count(TastingNote.rating),
+        func.coalesce(func.sum(TastingNote.rating), 0),
+        total_products,
+    ).outerjoin(
+        TastingNote, TastingNote.bottle_id == Bottle.id
+    ).outerjoin(
+        Region, Bottle.region_id == Region.id
+    ).outerjoin(
+        Country, Bottle.country_id == Country.id
     ).filter(
-        Bottle.distillery.ilike(f"%{distillery}%")
-    ).scalar()
+        live_bottles
+    ).group_by(
+        Bottle.spirit_type, Region.name, Country.name
+    ).all()
+    
+    if not groups:
+        return None
     
+    rated = sum(g[4] for g in groups)
     return {
-        "distillery": distillery,
-        "total_bottles": len(bottles),
-        "countries": list(set(b.country for b in bottles if b.country)),
-        "regions": list(set(b.region for b in bottles if b.region)),
-        "average_rating": float(avg_rating) if avg_rating else None,
-        "spirit_types": list(set(str(b.spirit_type) for b in bottles if b.spirit_type)),
+        "distillery": db.query(Distillery.name).filter(Distillery.id == distillery_id).scalar(),
+        "total_products": groups[0][6],
+        "total_bottles": sum(g[3] for g in groups),
+        "countries": sorted(set(g[2] for g in groups if g[2])),
+        "regions": sorted(set(g[1] for g in groups if g[1])),
+        "average_rating": sum(g[5] for g in groups) / rated if rated else None,
+        "spirit_types": sorted(set(str(g[0]) for g in groups if g[0])),
     }
 
 
+async def get_top_distilleries(
+    db: Session,
+    sort_by: str = "rating",
+    min_ratings: int = 3,
+    limit: int = 10,
+) -> List[Dict[str, Any]]:
+    """Leaderboard of distilleries by average tasting rating or by bottles owned
+
+    Rating rankings only include distilleries with at least ``min_ratings``
+    rated tasting notes.
+    """
+    from app.models.tasting_note import TastingNote
+    
+    bottle_count = func.count(func.distinct(Bottle.id))
+    rating_count = func.count(TastingNote.rating)
+    avg_rating = func.avg(TastingNote.rating)
+    query = db.query(
+        Distillery.id,
+        Distillery.name,
+        bottle_count,
+        func.count(func.distinct(Bottle.product_id)),
+        func.count(func.distinct(Bottle.user_id)),
+        rating_count,
+        avg_rating,
+    ).join(
+        Bottle, Bottle.distillery_id == Distillery.id
+    ).outerjoin(
+        TastingNote, TastingNote.bottle_id == Bottle.id
+    ).filter(
+        Bottle.deleted_at == None
+    ).group_by(Distillery.id, Distillery.name)
+    
+    if sort_by == "volume":
+        query = query.order_by(bottle_count.desc(), Distillery.name)
+    else:
+        query = query.having(rating_count >= min_ratings).order_by(
+            avg_rating.desc(), rating_count.desc(), Distillery.name
+        )
+    
+    return [
+        {
+            "id": d[0],
+            "distillery": d[1],
+            "total_bottles": d[2],
+            "total_products": d[3],
+            "owners": d[4],
+            "total_ratings": d[5],
+            "average_rating": float(d[6]) if d[6] is not None else None,
+        }
+        for d in query.limit(limit).all()
+    ]
+
+
 async def get_price_range_stats(
     db: Session,
 ) -> Dict[str, Any]:
@@ -0,0 +1,311 @@
+"""Vectorized bottle similarity engine
+
+Each bottle is encoded as a dense feature vector (spirit type, proof, age,
+price band, flavor descriptors and rating). Vectors live in one NumPy matrix
+with precomputed norms, so the top-k cosine neighbours of a bottle come from
+a single matrix-vector product. Region and country are one-hot features over
+the ``region_id``/``country_id`` dimension keys; rather than a column per
+place, the index keeps each bottle's keys and adds their matches to the
+product.
+
+The index is built lazily from the database on first use. Write paths call
+``mark_stale`` and the affected rows are re-read before the next query.
+"""
+
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from uuid import UUID
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.bottle import Bottle, SpiritType
+from app.models.tasting_note_descriptor import TastingNoteDescriptor
+from app.utils.invalidation import BOTTLE_CHANGED, NOTE_CHANGED, Event, subscribe
+
+SPIRIT_TYPES = list(SpiritType)
+PRICE_BANDS = (25, 50, 100, 250)  # Upper bounds in USD; last band is open-ended
+AGE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)")
+
+# Relative weight of each feature block in the cosine similarity
+WEIGHTS = {
+    "spirit_type": 3.0,
+    "proof": 1.0,
+    "age": 1.0,
+    "region": 1.5,
+    "country": 1.0,
+    "price": 1.0,
+    "descriptors": 2.0,
+    "rating": 0.5,
+}
+
+# Columns needed to encode a bottle and describe it in results
+BOTTLE_COLUMNS = (
+    Bottle.id,
+    Bottle.name,
+    Bottle.spirit_type,
+    Bottle.distillery,
+    Bottle.proof,
+    Bottle.age_statement,
+    Bottle.region_id,
+    Bottle.country_id,
+    Bottle.price_paid,
+    Bottle.price_current,
+    Bottle.rating,
+)
+
+
+class FeatureEncoder:
+    """Maps bottle attributes to fixed-width feature vectors"""
+
+    def __init__(self, descriptors: Sequence[str]):
+        self.descriptors = {word.lower(): i for i, word in enumerate(descriptors)}
+        self.blocks: Dict[str, slice] = {}
+        offset = 0
+        for name, width in (
+            ("spirit_type", len(SPIRIT_TYPES)),
+            ("proof", 1),
+            ("age", 1),
+            ("price", len(PRICE_BANDS) + 1),
+            ("descriptors", len(self.descriptors)),
+            ("rating", 1),
+        ):
+            self.blocks[name] = slice(offset, offset + width)
+            offset += width
+        self.dim = offset
+
+    @staticmethod
+    def _age_years(age_statement: Optional[str]) -> Optional[float]:
+        if not age_statement:
+            return None
+        match = AGE_PATTERN.search(age_statement)
+        return float(match.group(1)) if match else None
+
+    def encode(self, row: Any, descriptor_counts: Optional[Dict[str, int]] = None) -> np.ndarray:
+        """Encode a bottle row (see BOTTLE_COLUMNS) into a feature vector, locations aside"""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        blocks = self.blocks
+
+        if row.spirit_type is not None:
+            vector[blocks["spirit_type"].start + SPIRIT_TYPES.index(SpiritType(row.spirit_type))] = (
+                WEIGHTS["spirit_type"]
+            )
+        if row.proof is not None:
+            vector[blocks["proof"].start] = WEIGHTS["proof"] * min(row.proof, 200) / 200
+        age = self._age_years(row.age_statement)
+        if age is not None:
+            vector[blocks["age"].start] = WEIGHTS["age"] * min(age, 30) / 30
+
+        price = row.price_current if row.price_current is not None else row.price_paid
+        if price is not None:
+            band = sum(1 for bound in PRICE_BANDS if float(price) >= bound)
+            vector[blocks["price"].start + band] = WEIGHTS["price"]
+
+        if descriptor_counts:
+            block = vector[blocks["descriptors"]]
+            for descriptor, count in descriptor_counts.items():
+                index = self.descriptors.get(descriptor)
+                if index is not None:
+                    block[index] = count
+            total = np.linalg.norm(block)
+            if total:
+                block *= WEIGHTS["descriptors"] / total
+
+        if row.rating is not None:
+            vector[blocks["rating"].start] = WEIGHTS["rating"] * row.rating / 5
+        return vector
+
+
+class SimilarityIndex:
+    """In-memory matrix of bottle feature vectors with incremental updates"""
+
+    def __init__(self, encoder: FeatureEncoder, initial_capacity: int = 1024):
+        self.encoder = encoder
+        self._lock = threading.RLock()
+        self._matrix = np.zeros((initial_capacity, encoder.dim), dtype=np.float32)
+        self._norms = np.zeros(initial_capacity, dtype=np.float32)
+        self._active = np.zeros(initial_capacity, dtype=bool)
+        self._regions = np.zeros(initial_capacity, dtype=np.int64)  # 0 when unknown
+        self._countries = np.zeros(initial_capacity, dtype=np.int64)
+        self._ids: List[Optional[UUID]] = [None] * initial_capacity
+        self._meta: List[Optional[Dict[str, Any]]] = [None] * initial_capacity
+        self._rows: Dict[UUID, int] = {}
+        self._free: List[int] = []
+        self._size = 0
+        self._stale: set = set()
+        self.built = False
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _grow(self) -> None:
+        capacity = self._matrix.shape[0] * 2
+        self._matrix = np.resize(self._matrix, (capacity, self.encoder.dim))
+        self._matrix[self._size:] = 0
+        self._norms = np.resize(self._norms, capacity)
+        self._active = np.resize(self._active, capacity)
+        self._active[self._size:] = False
+        self._regions = np.resize(self._regions, capacity)
+        self._regions[self._size:] = 0
+        self._countries = np.resize(self._countries, capacity)
+        self._countries[self._size:] = 0
+        self._ids.extend([None] * (capacity - len(self._ids)))
+        self._meta.extend([None] * (capacity - len(self._meta)))
+
+    def upsert(self, row: Any, descriptor_counts: Optional[Dict[str, int]] = None) -> None:
+        """Insert or replace a bottle's vector"""
+        vector = self.encoder.encode(row, descriptor_counts)
+        with self._lock:
+            index = self._rows.get(row.id)
+            if index is None:
+                if self._free:
+                    index = self._free.pop()
+                else:
+                    if self._size == self._matrix.shape[0]:
+                        self._grow()
+                    index = self._size
+                    self._size += 1
+                self._rows[row.id] = index
+                self._ids[index] = row.id
+            self._matrix[index] = vector
+            self._regions[index] = row.region_id or 0
+            self._countries[index] = row.country_id or 0
+            self._norms[index] = np.sqrt(
+                vector @ vector
+                + (WEIGHTS["region"] ** 2 if row.region_id else 0)
+                + (WEIGHTS["country"] ** 2 if row.country_id else 0)
+            )
+            self._active[index] = True
+            self._meta[index] = {
+                "id": row.id,
+                "name": row.name,
+                "spirit_type": row.spirit_type,
+                "distillery": row.distillery,
+                "rating": row.rating,
+            }
+
+    def remove(self, bottle_id: UUID) -> None:
+        """Drop a bottle from the index"""
+        with self._lock:
+            index = self._rows.pop(bottle_id, None)
+            if index is None:
+                return
+            self._active[index] = False
+            self._matrix[index] = 0
+            self._norms[index] = 0
+            self._regions[index] = 0
+            self._countries[index] = 0
+            self._ids[index] = None
+            self._meta[index] = None
+            self._free.append(index)
+
+    def mark_stale(self, bottle_id: UUID) -> None:
+        """Flag a bottle to be re-read before the next query"""
+        with self._lock:
+            self._stale.add(bottle_id)
+
+    def reset(self) -> None:
+        """Rebuild from scratch on the next query"""
+        with self._lock:
+            self.built = False
+
+    def most_similar(self, bottle_id: UUID, limit: int = 5) -> List[Dict[str, Any]]:
+        """Top-k bottles by cosine similarity, best first"""
+        with self._lock:
+            index = self._rows.get(bottle_id)
+            if index is None or not self._norms[index]:
+                return []
+            size = self._size
+            matrix = self._matrix[:size]
+            norms = self._norms[:size]
+            query = matrix[index]
+
+            products = matrix @ query
+            locations = ((self._regions, WEIGHTS["region"]), (self._countries, WEIGHTS["country"]))
+            for keys, weight in locations:
+                if keys[index]:
+                    products += (keys[:size] == keys[index]) * np.float32(weight ** 2)
+            denominators = norms * self._norms[index]
+            scores = np.divide(
+                products,
+                denominators,
+                out=np.zeros(size, dtype=np.float32),
+                where=denominators > 0,
+            )
+            scores[~self._active[:size]] = -np.inf
+            scores[index] = -np.inf
+
+            k = min(limit, len(self._rows) - 1)
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                {**self._meta[i], "similarity": round(float(scores[i]), 4)}
+                for i in top
+                if np.isfinite(scores[i])
+            ]
+
+    def _load(self, db: Session, bottle_ids: Optional[Iterable[UUID]] = None):
+        """Read bottle rows and per-bottle descriptor counts"""
+        query = db.query(*BOTTLE_COLUMNS).filter(Bottle.deleted_at == None)
+        descriptor_query = db.query(
+            TastingNoteDescriptor.bottle_id,
+            TastingNoteDescriptor.descriptor,
+            func.sum(TastingNoteDescriptor.count),
+        )
+        if bottle_ids is not None:
+            bottle_ids = list(bottle_ids)
+            query = query.filter(Bottle.id.in_(bottle_ids))
+            descriptor_query = descriptor_query.filter(
+                TastingNoteDescriptor.bottle_id.in_(bottle_ids)
+            )
+        descriptors: Dict[UUID, Dict[str, int]] = {}
+        for bottle_id, descriptor, count in descriptor_query.group_by(
+            TastingNoteDescriptor.bottle_id, TastingNoteDescriptor.descriptor
+        ).all():
+            descriptors.setdefault(bottle_id, {})[descriptor] = int(count)
+        return query.all(), descriptors
+
+    def build(self, db: Session) -> None:
+        """Load every live bottle into a fresh index and swap it in"""
+        rows, descriptors = self._load(db)
+        fresh = SimilarityIndex(self.encoder, initial_capacity=max(len(rows), 1))
+        for row in rows:
+            fresh.upsert(row, descriptors.get(row.id))
+        with self._lock:
+            self._matrix, self._norms, self._active = fresh._matrix, fresh._norms, fresh._active
+            self._regions, self._countries = fresh._regions, fresh._countries
+            self._ids, self._meta, self._rows = fresh._ids, fresh._meta, fresh._rows
+            self._free, self._size = fresh._free, fresh._size
+            self.built = True
+
+    def refresh(self, db: Session) -> None:
+        """Build on first use, then re-read any stale bottles"""
+        with self._lock:
+            if not self.built:
+                self._stale.clear()
+                self.build(db)
+                return
+            stale, self._stale = self._stale, set()
+        if not stale:
+            return
+        rows, descriptors = self._load(db, stale)
+        with self._lock:
+            for row in rows:
+                self.upsert(row, descriptors.get(row.id))
+                stale.discard(row.id)
+            for bottle_id in stale:
+                self.remove(bottle_id)
+
+
+similarity_index = SimilarityIndex(FeatureEncoder(settings.FLAVOR_DESCRIPTORS))
+
+
+def _on_change(event: Event) -> None:
+    if event.type == BOTTLE_CHANGED or event.data.get("descriptors_changed"):
+        similarity_index.mark_stale(event.bottle_id)
+
+
+subscribe([BOTTLE_CHANGED, NOTE_CHANGED], _on_change, resync=similarity_index.reset)
@@ -0,0 +1,184 @@
+"""User statistics reconciliation
+
+The counters in ``user_stats`` and ``user_spirit_stats`` are maintained on
+write. This job recomputes them from the raw bottle and tasting note rows,
+reports any drift and optionally repairs it.
+
+Usage:
+    python -m app.services.stats_service [--dry-run] [--batch-size 500]
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.bottle import Bottle
+from app.models.tasting_note import TastingNote
+from app.models.user import User
+from app.models.user_stats import UserStats, UserSpiritStats
+
+logger = logging.getLogger(__name__)
+
+TOTAL_FIELDS = (
+    "bottle_count",
+    "rated_bottle_count",
+    "bottle_rating_sum",
+    "note_count",
+    "rated_note_count",
+    "note_rating_sum",
+)
+SPIRIT_FIELDS = ("bottle_count", "note_count", "rated_note_count", "note_rating_sum")
+
+
+def _expected_counters(db: Session, user_ids: Sequence[UUID]):
+    """Recompute the counters for a batch of users from raw rows"""
+    totals: Dict[UUID, Dict[str, int]] = {
+        user_id: dict.fromkeys(TOTAL_FIELDS, 0) for user_id in user_ids
+    }
+    spirits: Dict[tuple, Dict[str, int]] = {}
+
+    def spirit_entry(user_id, spirit_type):
+        return spirits.setdefault((user_id, spirit_type), dict.fromkeys(SPIRIT_FIELDS, 0))
+
+    bottle_rows = db.query(
+        Bottle.user_id,
+        Bottle.spirit_type,
+        func.count(Bottle.id),
+        func.count(Bottle.rating),
+        func.coalesce(func.sum(Bottle.rating), 0),
+    ).filter(
+        Bottle.user_id.in_(user_ids),
+        Bottle.deleted_at == None,
+    ).group_by(Bottle.user_id, Bottle.spirit_type).all()
+
+    for user_id, spirit_type, count, rated, rating_sum in bottle_rows:
+        totals[user_id]["bottle_count"] += count
+        totals[user_id]["rated_bottle_count"] += rated
+        totals[user_id]["bottle_rating_sum"] += int(rating_sum)
+        spirit_entry(user_id, spirit_type)["bottle_count"] = count
+
+    note_rows = db.query(
+        TastingNote.user_id,
+        Bottle.spirit_type,
+        func.count(TastingNote.id),
+        func.count(TastingNote.rating),
+        func.coalesce(func.sum(TastingNote.rating), 0),
+    ).join(
+        Bottle, TastingNote.bottle_id == Bottle.id
+    ).filter(
+        TastingNote.user_id.in_(user_ids)
+    ).group_by(TastingNote.user_id, Bottle.spirit_type).all()
+
+    for user_id, spirit_type, count, rated, rating_sum in note_rows:
+        totals[user_id]["note_count"] += count
+        totals[user_id]["rated_note_count"] += rated
+        totals[user_id]["note_rating_sum"] += int(rating_sum)
+        entry = spirit_entry(user_id, spirit_type)
+        entry["note_count"] = count
+        entry["rated_note_count"] = rated
+        entry["note_rating_sum"] = int(rating_sum)
+
+    return totals, spirits
+
+
+def reconcile_users(db: Session, user_ids: Sequence[UUID], repair: bool = True) -> List[Dict[str, Any]]:
+    """Compare one batch of users' counters with raw rows, optionally repairing them
+
+    Returns one entry per drifted counter row. The caller commits.
+    """
+    drift: List[Dict[str, Any]] = []
+    totals, spirits = _expected_counters(db, user_ids)
+
+    stored = {
+        row.user_id: row
+        for row in db.query(UserStats).filter(UserStats.user_id.in_(user_ids)).all()
+    }
+    for uid, expected in totals.items():
+        row = stored.get(uid)
+        actual = {f: getattr(row, f) for f in TOTAL_FIELDS} if row else None
+        if actual != expected:
+            drift.append({"user_id": uid, "spirit_type": None, "stored": actual, "expected": expected})
+            if repair:
+                if row is None:
+                    row = UserStats(user_id=uid)
+                    db.add(row)
+                for field, value in expected.items():
+                    setattr(row, field, value)
+
+    stored_spirits = {
+        (row.user_id, row.spirit_type): row
+        for row in db.query(UserSpiritStats).filter(
+            UserSpiritStats.user_id.in_(user_ids)
+        ).all()
+    }
+    for key in set(spirits) | set(stored_spirits):
+        expected = spirits.get(key, dict.fromkeys(SPIRIT_FIELDS, 0))
+        row = stored_spirits.get(key)
+        actual = {f: getattr(row, f) for f in SPIRIT_FIELDS} if row else None
+        if actual != expected and not (row is None and not any(expected.values())):
+            drift.append({"user_id": key[0], "spirit_type": str(key[1]), "stored": actual, "expected": expected})
+            if repair:
+                if row is None:
+                    row = UserSpiritStats(user_id=key[0], spirit_type=key[1])
+                    db.add(row)
+                for field, value in expected.items():
+                    setattr(row, field, value)
+
+    if repair:
+        db.flush()
+
+    return drift
+
+
+async def reconcile_user_stats(
+    db: Session,
+    user_id: Optional[UUID] = None,
+    repair: bool = True,
+    batch_size: int = 500,
+) -> List[Dict[str, Any]]:
+    """Compare stored counters with raw rows and optionally repair them
+
+    Checks a single user when ``user_id`` is given, otherwise every user in
+    batches. Returns one entry per drifted counter row. The caller commits.
+    """
+    if user_id is not None:
+        batches = [[user_id]]
+    else:
+        all_ids = [row[0] for row in db.query(User.id).order_by(User.id).all()]
+        batches = [all_ids[i:i + batch_size] for i in range(0, len(all_ids), batch_size)]
+
+    drift: List[Dict[str, Any]] = []
+    for user_ids in batches:
+        drift.extend(reconcile_users(db, user_ids, repair=repair))
+    return drift
+
+
+def main() -> None:
+    """Run the reconciliation job from the command line"""
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Reconcile per-user statistics counters")
+    parser.add_argument("--dry-run", action="store_true", help="Report drift without repairing")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        drift = asyncio.run(
+            reconcile_user_stats(db, repair=not args.dry_run, batch_size=args.batch_size)
+        )
+        if not args.dry_run:
+            db.commit()
+    finally:
+        db.close()
+
+    for entry in drift:
+        logger.warning("User stats drift: %s", entry)
+    print(f"{len(drift)} drifted counter row(s){' repaired' if drift and not args.dry_run else ''}")
+
+
+if __name__ == "__main__":
+    main()
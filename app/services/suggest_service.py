@@ -0,0 +1,258 @@
+"""In-process search-as-you-type index
+
+Bottle names, distilleries, regions and countries are kept in a sorted
+array of (word-start suffix, term) pairs, so a prefix lookup is a bisect
+plus a scan over the matching entries, keeping the most common live terms
+in a small heap, and matches any word of a term ("rare" finds "Eagle
+Rare"). When a prefix has too few matches, each query word is corrected to
+the closest indexed word (trigram candidates ranked by edit distance) and
+the corrected prefix is looked up instead, which catches typos.
+
+The index is built from the database on startup (or first use) and kept
+current by bottle change events, which carry the old and new terms.
+"""
+
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left, insort
+from heapq import heappush, heapreplace
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.bottle import Bottle
+from app.utils.invalidation import BOTTLE_CHANGED, subscribe
+
+SUGGEST_FIELDS = ("name", "distillery", "region", "country")
+NON_WORD = re.compile(r"[^a-z0-9]+")
+MIN_TRIGRAM_SIMILARITY = 0.3
+
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse punctuation to single spaces"""
+    return NON_WORD.sub(" ", text.lower()).strip()
+
+
+def trigrams(key: str) -> Set[str]:
+    """Padded character trigrams of a normalized key"""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, returning ``limit + 1`` once it is exceeded"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class SuggestIndex:
+    """Sorted-array prefix index with a trigram fallback for typos"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._terms: List[List[Any]] = []  # [kind, display, key, count]
+        self._ids: Dict[Tuple[str, str], int] = {}
+        self._prefixes: List[Tuple[str, int]] = []
+        # Distinct words across all terms and a trigram index over them
+        self._words: Dict[str, int] = {}
+        self._word_list: List[Tuple[str, int]] = []  # (word, trigram count)
+        self._trigrams: Dict[str, List[int]] = defaultdict(list)
+        self.built = False
+        self.build_seconds: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def add(self, kind: str, text: Optional[str], count: int = 1) -> None:
+        """Add ``count`` occurrences of a term (negative to remove)"""
+        if not text:
+            return
+        key = normalize(text)
+        if not key:
+            return
+        with self._lock:
+            term_id = self._ids.get((kind, key))
+            if term_id is not None:
+                self._terms[term_id][3] += count
+                return
+            if count <= 0:
+                return
+            term_id = len(self._terms)
+            self._terms.append([kind, text.strip(), key, count])
+            self._ids[(kind, key)] = term_id
+            words = key.split(" ")
+            for i, word in enumerate(words):
+                insort(self._prefixes, (" ".join(words[i:]), term_id))
+                if word not in self._words:
+                    grams = trigrams(word)
+                    self._words[word] = word_id = len(self._word_list)
+                    self._word_list.append((word, len(grams)))
+                    for gram in grams:
+                        self._trigrams[gram].append(word_id)
+
+    def update(self, old: Dict[str, Any], new: Dict[str, Any]) -> None:
+        """Move counts from a bottle's old field values to its new ones"""
+        for field in SUGGEST_FIELDS:
+            if old.get(field) != new.get(field):
+                self.add(field, old.get(field), -1)
+                self.add(field, new.get(field), 1)
+
+    def _prefix_matches(self, key: str, limit: int, kind: Optional[str] = None) -> List[List[Any]]:
+        """The ``limit`` most common live terms of ``kind`` with a word starting with ``key``"""
+        prefixes, terms = self._prefixes, self._terms
+        seen: Set[int] = set()
+        top: List[Tuple[int, int]] = []  # min-heap of (count, -term_id)
+        for position in range(bisect_left(prefixes, (key, -1)), len(prefixes)):
+            suffix, term_id = prefixes[position]
+            if not suffix.startswith(key):
+                break
+            if term_id in seen:
+                continue
+            seen.add(term_id)
+            term = terms[term_id]
+            if term[3] <= 0 or (kind is not None and term[0] != kind):
+                continue
+            entry = (term[3], -term_id)
+            if len(top) < limit:
+                heappush(top, entry)
+            elif entry > top[0]:
+                heapreplace(top, entry)
+        return [terms[-term_id] for _, term_id in sorted(top, reverse=True)]
+
+    def _correct_word(self, word: str, partial: bool) -> Optional[str]:
+        """Closest indexed word within an edit-distance budget
+
+        A ``partial`` word is still being typed, so it is compared with
+        the same-length start of each candidate.
+        """
+        if word in self._words:
+            return word
+        grams = trigrams(word)
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for word_id in self._trigrams.get(gram, ()):
+                shared[word_id] += 1
+        candidates = []
+        for word_id, overlap in shared.items():
+            similarity = overlap / (len(grams) + self._word_list[word_id][1] - overlap)
+            if similarity >= MIN_TRIGRAM_SIMILARITY or partial:
+                candidates.append((overlap, similarity, word_id))
+        candidates.sort(reverse=True)
+
+        limit = max(1, len(word) // 4)
+        best = None
+        for _, _, word_id in candidates[:30]:
+            candidate = self._word_list[word_id][0]
+            target = candidate[:len(word)] if partial else candidate
+            distance = edit_distance(word, target, limit)
+            if distance <= limit and (best is None or distance < best[0]):
+                best = (distance, candidate)
+        return best[1] if best else None
+
+    def _fuzzy_matches(self, key: str, limit: int, kind: Optional[str] = None) -> List[List[Any]]:
+        words = key.split(" ")
+        corrected = []
+        for i, word in enumerate(words):
+            partial = i == len(words) - 1
+            fixed = self._correct_word(word, partial) if len(word) >= 3 else word
+            if fixed is None:
+                return []
+            corrected.append(fixed)
+        corrected_key = " ".join(corrected)
+        return self._prefix_matches(corrected_key, limit, kind) if corrected_key != key else []
+
+    def suggest(self, query: str, limit: int = 10, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Top terms matching a prefix, most common first, with typo fallback"""
+        key = normalize(query)
+        if not key:
+            return []
+        with self._lock:
+            results = self._prefix_matches(key, limit, kind)
+            if len(results) < limit and len(key) >= 3:
+                seen = {id(term) for term in results}
+                fuzzy = self._fuzzy_matches(key, limit, kind)
+                results.extend(term for term in fuzzy if id(term) not in seen)
+                results = results[:limit]
+            return [
+                {"text": display, "kind": term_kind, "count": count}
+                for term_kind, display, _, count in results
+            ]
+
+    def memory_usage(self) -> Dict[str, Any]:
+        """Approximate bytes held by the index structures"""
+        with self._lock:
+            terms = sys.getsizeof(self._terms) + sum(
+                sys.getsizeof(term) + sys.getsizeof(term[1]) + sys.getsizeof(term[2])
+                for term in self._terms
+            )
+            prefixes = sys.getsizeof(self._prefixes) + sum(
+                sys.getsizeof(entry) + sys.getsizeof(entry[0]) for entry in self._prefixes
+            )
+            words = sys.getsizeof(self._words) + sys.getsizeof(self._word_list) + sum(
+                sys.getsizeof(entry) + sys.getsizeof(entry[0]) for entry in self._word_list
+            )
+            grams = sys.getsizeof(self._trigrams) + sum(
+                sys.getsizeof(gram) + sys.getsizeof(ids) for gram, ids in self._trigrams.items()
+            )
+            return {
+                "terms": len(self._terms),
+                "prefix_entries": len(self._prefixes),
+                "words": len(self._word_list),
+                "trigrams": len(self._trigrams),
+                "bytes": terms + prefixes + words + grams + sys.getsizeof(self._ids),
+                "build_seconds": self.build_seconds,
+            }
+
+    def build(self, db: Session) -> None:
+        """Load term counts for every live bottle"""
+        started = time.perf_counter()
+        fresh = SuggestIndex()
+        for field in SUGGEST_FIELDS:
+            column = getattr(Bottle, field)
+            rows = db.query(column, func.count(Bottle.id)).filter(
+                Bottle.deleted_at == None,
+                column != None,
+            ).group_by(column).all()
+            for text, count in rows:
+                fresh.add(field, text, count)
+        with self._lock:
+            self._terms, self._ids = fresh._terms, fresh._ids
+            self._prefixes, self._trigrams = fresh._prefixes, fresh._trigrams
+            self._words, self._word_list = fresh._words, fresh._word_list
+            self.built = True
+            self.build_seconds = round(time.perf_counter() - started, 3)
+
+    def reset(self) -> None:
+        """Rebuild from the database on next use"""
+        with self._lock:
+            self.built = False
+
+    def ensure_built(self, db: Session) -> None:
+        """Build on first use if startup could not reach the database"""
+        if not self.built:
+            with self._lock:
+                if not self.built:
+                    self.build(db)
+
+
+suggest_index = SuggestIndex()
+subscribe(
+    [BOTTLE_CHANGED],
+    lambda event: suggest_index.update(event.data.get("old_terms", {}), event.data.get("new_terms", {})),
+    resync=suggest_index.reset,
+)
@@ -0,0 +1,218 @@
+"""Delta sync over the change log
+
+``GET /sync`` without a token returns a full snapshot of a user's bottles,
+tasting notes, collections and collection memberships, plus a token. Passing
+that token back as ``since`` returns only what changed after it: current
+rows for everything created or updated, and tombstones (ids only) for
+soft-deleted bottles and deleted notes, collections and memberships. A
+deleted collection implies its memberships are gone.
+
+Each delta page is one range scan of ``ix_change_log_user_id_id`` followed
+by primary-key lookups of the changed rows. Entries older than
+``CHANGE_LOG_RETENTION_DAYS`` are pruned (``python -m
+app.services.sync_service``), so tokens older than that are rejected and the
+client has to take a fresh snapshot.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.crud.change_log import BOTTLE, COLLECTION, MEMBERSHIP, NOTE
+from app.models.bottle import Bottle
+from app.models.change_log import ChangeLogEntry
+from app.models.collection import Collection, collection_bottles
+from app.models.tasting_note import TastingNote
+from app.utils.serialization import bottle_serializer, collection_serializer, tasting_note_serializer
+
+MEMBERSHIP_COLUMNS = (
+    collection_bottles.c.collection_id,
+    collection_bottles.c.bottle_id,
+    collection_bottles.c.position,
+    collection_bottles.c.added_at,
+)
+
+
+class SyncTokenExpired(Exception):
+    """The token predates the change log's retention window"""
+
+
+def encode_sync_token(position: int, issued_at: Optional[float] = None) -> str:
+    payload = json.dumps([position, int(issued_at or time.time())]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> Tuple[int, float]:
+    """Parse a token from ``encode_sync_token``; raises ValueError if malformed"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        position, issued_at = json.loads(base64.urlsafe_b64decode(padded))
+        return int(position), float(issued_at)
+    except (TypeError, ValueError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid sync token") from e
+
+
+def _memberships(rows) -> List[Dict[str, Any]]:
+    return [
+        {"collection_id": collection_id, "bottle_id": bottle_id, "position": position, "added_at": added_at}
+        for collection_id, bottle_id, position, added_at in rows
+    ]
+
+
+def _current_position(db: Session, user_id: UUID) -> int:
+    return db.query(func.max(ChangeLogEntry.id)).filter(
+        ChangeLogEntry.user_id == user_id
+    ).scalar() or 0
+
+
+async def get_snapshot(db: Session, user_id: UUID) -> Dict[str, Any]:
+    """Everything a user has, with a token for later deltas"""
+    # Read the position first: rows written meanwhile come back again in the
+    # next delta, which clients apply idempotently
+    position = _current_position(db, user_id)
+    bottles = db.query(*bottle_serializer.columns).filter(
+        Bottle.user_id == user_id,
+        Bottle.deleted_at == None,
+    ).all()
+    notes = db.query(*tasting_note_serializer.columns).filter(
+        TastingNote.user_id == user_id
+    ).all()
+    collections = db.query(*collection_serializer.columns).filter(
+        Collection.user_id == user_id
+    ).all()
+    memberships = db.query(*MEMBERSHIP_COLUMNS).join(
+        Collection, Collection.id == collection_bottles.c.collection_id
+    ).filter(Collection.user_id == user_id).all()
+    return {
+        "token": encode_sync_token(position),
+        "full": True,
+        "has_more": False,
+        "bottles": bottle_serializer.to_dicts(bottles),
+        "tasting_notes": tasting_note_serializer.to_dicts(notes),
+        "collections": collection_serializer.to_dicts(collections),
+        "memberships": _memberships(memberships),
+        "deleted": {"bottles": [], "tasting_notes": [], "collections": [], "memberships": []},
+    }
+
+
+async def get_changes(db: Session, user_id: UUID, since: str, limit: int) -> Dict[str, Any]:
+    """Rows changed since a token, newest state only, at most ``limit`` log entries per page
+
+    Raises ValueError for a malformed token and SyncTokenExpired for one
+    older than the retention window.
+    """
+    position, issued_at = decode_sync_token(since)
+    if issued_at < time.time() - settings.CHANGE_LOG_RETENTION_DAYS * 86400:
+        raise SyncTokenExpired()
+
+    entries = db.query(
+        ChangeLogEntry.id,
+        ChangeLogEntry.entity,
+        ChangeLogEntry.entity_id,
+        ChangeLogEntry.parent_id,
+        ChangeLogEntry.deleted,
+    ).filter(
+        ChangeLogEntry.user_id == user_id,
+        ChangeLogEntry.id > position,
+    ).order_by(ChangeLogEntry.id).limit(limit + 1).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    # Later entries for the same row win
+    latest: Dict[Tuple[str, UUID, Optional[UUID]], bool] = {}
+    for _, entity, entity_id, parent_id, deleted in entries:
+        latest[(entity, entity_id, parent_id)] = deleted
+    changed = {BOTTLE: [], NOTE: [], COLLECTION: [], MEMBERSHIP: []}
+    deleted = {BOTTLE: [], NOTE: [], COLLECTION: [], MEMBERSHIP: []}
+    for (entity, entity_id, parent_id), is_deleted in latest.items():
+        key = (parent_id, entity_id) if entity == MEMBERSHIP else entity_id
+        (deleted if is_deleted else changed)[entity].append(key)
+
+    def load(serializer, model, ids, *conditions):
+        if not ids:
+            return [], []
+        rows = serializer.to_dicts(db.query(*serializer.columns).filter(
+            model.id.in_(ids), model.user_id == user_id, *conditions
+        ).all())
+        # Rows deleted again since their entry was written are tombstones too
+        found = {row["id"] for row in rows}
+        return rows, [row_id for row_id in ids if row_id not in found]
+
+    result = {
+        "token": encode_sync_token(entries[-1].id if entries else position),
+        "full": False,
+        "has_more": has_more,
+    }
+    for name, entity, serializer, model, conditions in (
+        ("bottles", BOTTLE, bottle_serializer, Bottle, (Bottle.deleted_at == None,)),
+        ("tasting_notes", NOTE, tasting_note_serializer, TastingNote, ()),
+        ("collections", COLLECTION, collection_serializer, Collection, ()),
+    ):
+        rows, missing = load(serializer, model, changed[entity], *conditions)
+        result[name] = rows
+        deleted[entity].extend(missing)
+
+    pairs = changed[MEMBERSHIP]
+    memberships = db.query(*MEMBERSHIP_COLUMNS).join(
+        Collection, Collection.id == collection_bottles.c.collection_id
+    ).filter(
+        Collection.user_id == user_id,
+        tuple_(collection_bottles.c.collection_id, collection_bottles.c.bottle_id).in_(pairs),
+    ).all() if pairs else []
+    found = {(row.collection_id, row.bottle_id) for row in memberships}
+    deleted[MEMBERSHIP].extend(pair for pair in pairs if pair not in found)
+    result["memberships"] = _memberships(memberships)
+
+    result["deleted"] = {
+        "bottles": deleted[BOTTLE],
+        "tasting_notes": deleted[NOTE],
+        "collections": deleted[COLLECTION],
+        "memberships": [
+            {"collection_id": collection_id, "bottle_id": bottle_id}
+            for collection_id, bottle_id in deleted[MEMBERSHIP]
+        ],
+    }
+    return result
+
+
+async def prune_change_log(db: Session, days: int, batch_size: int = 5000) -> int:
+    """Delete change log entries older than ``days``, in batches"""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    removed = 0
+    while True:
+        ids = [row[0] for row in db.query(ChangeLogEntry.id).filter(
+            ChangeLogEntry.created_at < cutoff
+        ).order_by(ChangeLogEntry.id).limit(batch_size).all()]
+        if not ids:
+            return removed
+        db.query(ChangeLogEntry).filter(ChangeLogEntry.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        removed += len(ids)
+
+
+def main() -> None:
+    """Prune the sync change log from the command line"""
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Prune old sync change log entries")
+    parser.add_argument("--days", type=int, default=settings.CHANGE_LOG_RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        removed = asyncio.run(prune_change_log(db, args.days, batch_size=args.batch_size))
+    finally:
+        db.close()
+    print(f"Removed {removed} change log entr{'y' if removed == 1 else 'ies'}")
+
+
+if __name__ == "__main__":
+    main()
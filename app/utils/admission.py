@@ -0,0 +1,211 @@
+"""Admission control
+
+Requests are sorted into route classes, and each worker admits at most
+``limit`` of them at once. Anything over that waits in a priority queue
+for up to its class's queue timeout, then gets a 503. The limit adapts
+AIMD-style: it grows by about one per round of requests while the worker
+is saturated and latency is under ``ADMISSION_LATENCY_TARGET_MS``. It
+shrinks by 10% (at most once a second) when latency overshoots or requests
+fail with 5xx, which includes pool checkout timeouts.
+
+Authenticated interactive reads go first, then anonymous reads, then
+search aggregates and writes, then bulk/batch work. Classes can
+also carry a hard concurrency cap so a burst of one kind cannot take every
+slot. ``slot`` applies a class cap inside a handler, e.g. around AI
+research.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from app.config import settings
+
+
+@dataclass(frozen=True)
+class RouteClass:
+    priority: int  # lower is served first
+    max_concurrency: Optional[int]  # hard cap per worker, None for only the shared limit
+    queue_timeout: float  # seconds a request may wait for a slot
+
+
+ROUTE_CLASSES = {
+    "interactive": RouteClass(priority=0, max_concurrency=None, queue_timeout=2.0),
+    "search": RouteClass(priority=2, max_concurrency=16, queue_timeout=1.0),
+    "write": RouteClass(priority=2, max_concurrency=16, queue_timeout=2.0),
+    "bulk": RouteClass(priority=3, max_concurrency=4, queue_timeout=5.0),
+    "ai": RouteClass(priority=3, max_concurrency=2, queue_timeout=0.5),
+}
+
+# (method or None for any, path prefix, class); first match wins
+ROUTE_RULES: Tuple[Tuple[Optional[str], str, str], ...] = (
+    (None, "/batch/", "bulk"),
+    ("GET", "/search/filter", "search"),
+    ("GET", "/search/query", "search"),
+    ("GET", "/search/bottles", "search"),
+    ("GET", "/search/catalog", "search"),
+    ("GET", "/search/stats", "search"),
+    ("GET", "/search/popular", "search"),
+    ("GET", "/search/pricing", "search"),
+    ("GET", "/search/distilleries", "search"),
+    ("GET", "/tasting-notes/search", "search"),
+)
+UNLIMITED_PATHS = ("/health", "/docs", "/redoc", "/openapi.json")
+# Long-lived streams; they are rate limited when they connect but hold no slot
+STREAMING_PATHS = ("/events",)
+# Classes whose latency reflects database pressure; others can include
+# external calls, so they only feed failures into the limit
+ADAPTIVE_CLASSES = ("interactive", "search")
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class AdmissionRejected(Exception):
+    """No slot became free within the route class's queue timeout"""
+
+    def __init__(self, route_class: str):
+        super().__init__(f"Too many concurrent {route_class} requests")
+        self.route_class = route_class
+
+
+def classify(method: str, path: str) -> str:
+    """Route class for a request"""
+    for rule_method, prefix, name in ROUTE_RULES:
+        if (rule_method is None or rule_method == method) and path.startswith(prefix):
+            return name
+    return "interactive" if method in SAFE_METHODS else "write"
+
+
+class AdmissionController:
+    """Adaptive concurrency limit with a priority queue, for one event loop"""
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        latency_target_ms: float,
+        classes: Dict[str, RouteClass] = ROUTE_CLASSES,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target_ms / 1000
+        self.classes = classes
+        self.in_flight = 0
+        self._class_in_flight: Dict[str, int] = defaultdict(int)
+        self._waiters: List[Tuple[int, int, str, bool, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._decreased_at = 0.0
+        self.metrics: Dict[str, Dict[str, Any]] = defaultdict(lambda: {
+            "admitted": 0, "queued": 0, "rejected": 0, "queue_wait_ms_total": 0.0,
+        })
+
+    def _fits(self, name: str, shared: bool) -> bool:
+        cap = self.classes[name].max_concurrency
+        if cap is not None and self._class_in_flight[name] >= cap:
+            return False
+        return not shared or self.in_flight < int(self.limit)
+
+    def _admit(self, name: str, shared: bool) -> None:
+        self._class_in_flight[name] += 1
+        if shared:
+            self.in_flight += 1
+        self.metrics[name]["admitted"] += 1
+
+    async def acquire(self, name: str, priority: int, shared: bool = True) -> None:
+        """Wait for a slot; raises AdmissionRejected after the class's queue timeout"""
+        # Waiters are only ever blocked by a full limit or their own class cap,
+        # and every release hands freed slots out in priority order
+        if self._fits(name, shared):
+            self._admit(name, shared)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), name, shared, future))
+        self.metrics[name]["queued"] += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.classes[name].queue_timeout)
+        except asyncio.TimeoutError:
+            if future.done():  # admitted just as the timeout fired
+                return
+            future.cancel()
+            self.metrics[name]["rejected"] += 1
+            raise AdmissionRejected(name)
+        except BaseException:
+            # The caller was cancelled; give back a slot handed over meanwhile
+            if future.done() and not future.cancelled():
+                self.release(name, shared)
+            else:
+                future.cancel()
+            raise
+        finally:
+            self.metrics[name]["queue_wait_ms_total"] += (time.monotonic() - started) * 1000
+
+    def release(self, name: str, shared: bool = True, latency: Optional[float] = None, failed: bool = False) -> None:
+        """Free a slot, adapt the limit from the request's outcome and wake waiters"""
+        self._class_in_flight[name] -= 1
+        if shared:
+            saturated = self.in_flight >= int(self.limit)
+            self.in_flight -= 1
+            if latency is not None or failed:
+                self._adapt(latency or 0.0, failed, saturated)
+        self._wake()
+
+    def _adapt(self, latency: float, failed: bool, saturated: bool) -> None:
+        now = time.monotonic()
+        if failed or latency > self.latency_target:
+            if now - self._decreased_at >= 1.0:
+                self.limit = max(self.min_limit, self.limit * 0.9)
+                self._decreased_at = now
+        elif saturated:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def _wake(self) -> None:
+        blocked = []
+        while self._waiters:
+            waiter = heapq.heappop(self._waiters)
+            _, _, name, shared, future = waiter
+            if future.done():
+                continue
+            if self._fits(name, shared):
+                self._admit(name, shared)
+                future.set_result(None)
+            else:
+                blocked.append(waiter)
+                if shared and self.in_flight >= int(self.limit):
+                    break
+        for waiter in blocked:
+            heapq.heappush(self._waiters, waiter)
+
+    @asynccontextmanager
+    async def slot(self, name: str):
+        """Hold a slot of a capped class inside a handler, outside the shared limit"""
+        await self.acquire(name, self.classes[name].priority, shared=False)
+        try:
+            yield
+        finally:
+            self.release(name, shared=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": sum(1 for *_, future in self._waiters if not future.done()),
+            "classes": {
+                name: {**self.metrics[name], "in_flight": self._class_in_flight[name]}
+                for name in self.classes
+            },
+        }
+
+
+admission = AdmissionController(
+    initial_limit=settings.ADMISSION_INITIAL_LIMIT,
+    min_limit=settings.ADMISSION_MIN_LIMIT,
+    max_limit=settings.ADMISSION_MAX_LIMIT,
+    latency_target_ms=settings.ADMISSION_LATENCY_TARGET_MS,
+)
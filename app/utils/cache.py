@@ -0,0 +1,97 @@
+"""In-process caches"""
+
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+from app.config import settings
+from app.utils.invalidation import BOTTLE_CHANGED, DIMENSION_CHANGED, EVENT_TYPES, subscribe
+
+
+class TTLCache:
+    """Small thread-safe cache whose entries expire after ``ttl`` seconds
+
+    When full, the entry closest to expiry is evicted. Keep these caches
+    for per-process summaries that can be rebuilt cheaply on a miss.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self._epoch = 0  # bumped by clear()
+        self._generations: Dict[Hashable, int] = {}  # bumped by invalidate(key)
+
+    def generation(self, key: Hashable) -> Tuple[int, int]:
+        """Marker that changes whenever ``key`` is invalidated
+
+        Read it before computing a value and pass it to ``set`` so a result
+        computed while that key was being written is not cached. Writes to
+        other keys leave it alone.
+        """
+        return self._epoch, self._generations.get(key, 0)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[Tuple[int, int]] = None) -> None:
+        """Store a value, unless ``key`` was invalidated since ``generation``"""
+        with self._lock:
+            if generation is not None and generation != self.generation(key):
+                return
+            if key not in self._data and len(self._data) >= self.maxsize:
+                oldest = min(self._data, key=lambda k: self._data[k][0])
+                del self._data[oldest]
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry"""
+        with self._lock:
+            if len(self._generations) >= 4 * self.maxsize and key not in self._generations:
+                # Forget old markers; the epoch bump keeps in-flight sets from landing
+                self._generations.clear()
+                self._epoch += 1
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._epoch += 1
+            self._generations.clear()
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Per-user dashboard summaries, invalidated by every write event for the user
+dashboard_cache = TTLCache(ttl=settings.DASHBOARD_CACHE_TTL)
+subscribe(
+    EVENT_TYPES,
+    lambda event: dashboard_cache.invalidate(event.user_id),
+    resync=dashboard_cache.clear,
+)
+
+# /search/filter facet counts keyed by normalized filter signature; expire only
+facet_cache = TTLCache(ttl=settings.FACET_CACHE_TTL)
+
+# Compiled structured search queries keyed by query string; exact matches
+# embed resolved dimension ids, so plans are dropped when a write creates a
+# new dimension or an alias is repointed
+query_plan_cache = TTLCache(ttl=settings.QUERY_PLAN_CACHE_TTL, maxsize=4096)
+subscribe(
+    [BOTTLE_CHANGED],
+    lambda event: query_plan_cache.clear() if event.data.get("new_dimensions") else None,
+    resync=query_plan_cache.clear,
+)
+subscribe([DIMENSION_CHANGED], lambda event: query_plan_cache.clear())
@@ -0,0 +1,51 @@
+"""Catalog product matching keys
+
+Owned bottles are per-user copies. Copies of the same product are matched
+to one ``catalog_products`` row by a normalized key, so spelling, case,
+punctuation and age-statement variants collapse together.
+"""
+
+import re
+from typing import Optional
+
+NON_WORD = re.compile(r"[^a-z0-9]+")
+DIGIT_BOUNDARY = re.compile(r"(?<=\d)(?=[a-z])|(?<=[a-z])(?=\d)")
+# Token rewrites applied before matching; None drops the token
+TOKEN_ALIASES = {
+    "yr": "year",
+    "yrs": "year",
+    "years": "year",
+    "old": None,
+    "the": None,
+    "and": None,
+    "distillery": None,
+    "distilling": None,
+    "co": None,
+    "company": None,
+}
+
+
+def normalize_tokens(value: Optional[str]) -> list:
+    """Lowercase, strip punctuation and apply token aliases"""
+    text = (value or "").lower().replace("&", " and ").replace("'", "")
+    text = DIGIT_BOUNDARY.sub(" ", NON_WORD.sub(" ", text))
+    tokens = []
+    for token in text.split():
+        token = TOKEN_ALIASES.get(token, token)
+        if token:
+            tokens.append(token)
+    return tokens
+
+
+def product_match_key(name: str, distillery: Optional[str], spirit_type) -> str:
+    """Key identifying the catalog product a bottle belongs to
+
+    A leading distillery name is stripped from the bottle name so
+    "Buffalo Trace Bourbon" by "Buffalo Trace" matches "Bourbon".
+    """
+    distillery_tokens = normalize_tokens(distillery)
+    name_tokens = normalize_tokens(name)
+    if distillery_tokens and name_tokens[:len(distillery_tokens)] == distillery_tokens:
+        name_tokens = name_tokens[len(distillery_tokens):] or name_tokens
+    spirit = getattr(spirit_type, "value", spirit_type) or ""
+    return f"{spirit}|{' '.join(distillery_tokens)}|{' '.join(name_tokens)}"
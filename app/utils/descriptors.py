@@ -0,0 +1,55 @@
+"""Flavor descriptor extraction for tasting notes
+
+Descriptors are matched once, when a note is written, with a single
+compiled alternation regex over the configured vocabulary. Matches respect
+word boundaries, so "unsweetened" does not count as "sweet".
+"""
+
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+from app.config import settings
+from app.models.tasting_note import TastingNote
+from app.models.tasting_note_descriptor import TastingNoteDescriptor
+
+# Tasting note fields scanned for descriptors
+DESCRIPTOR_FIELDS = ("nose", "palate", "finish")
+
+
+class DescriptorMatcher:
+    """Multi-pattern matcher over a descriptor vocabulary"""
+
+    def __init__(self, vocabulary: Iterable[str]):
+        self.vocabulary = sorted({word.strip().lower() for word in vocabulary if word.strip()})
+        # Longest first so multi-word descriptors win over their prefixes
+        alternation = "|".join(
+            re.escape(word) for word in sorted(self.vocabulary, key=len, reverse=True)
+        )
+        self._pattern = re.compile(rf"\b(?:{alternation})\b", re.IGNORECASE) if alternation else None
+
+    def extract(self, *texts: Optional[str]) -> Dict[str, int]:
+        """Count descriptor mentions across the given texts"""
+        if self._pattern is None:
+            return {}
+        counts: Counter = Counter()
+        for text in texts:
+            if text:
+                counts.update(match.lower() for match in self._pattern.findall(text))
+        return dict(counts)
+
+
+matcher = DescriptorMatcher(settings.FLAVOR_DESCRIPTORS)
+
+
+def build_note_descriptors(note: TastingNote) -> List[TastingNoteDescriptor]:
+    """Extract descriptor rows for a tasting note"""
+    counts = matcher.extract(*(getattr(note, field) for field in DESCRIPTOR_FIELDS))
+    return [
+        TastingNoteDescriptor(
+            descriptor=descriptor,
+            count=count,
+            user_id=note.user_id,
+            bottle_id=note.bottle_id,
+        )
+        for descriptor, count in counts.items()
+    ]
@@ -0,0 +1,308 @@
+"""Cross-worker cache invalidation bus
+
+CRUD write paths call ``publish`` with a typed event (bottle, note,
+collection, user or dimension alias changed) before committing. The event is held on the
+session and dispatched to this worker's subscribers once the transaction
+commits; a rollback drops it.
+
+Other workers hear about the same events. On Postgres the event is sent
+with ``pg_notify`` inside the writing transaction, so it is delivered
+exactly when the write becomes visible, and each worker LISTENs on a
+dedicated connection. SQLite has no notifications, so events are appended
+to the ``cache_invalidations`` table in the same transaction and each worker
+polls it every ``INVALIDATION_POLL_INTERVAL`` seconds. Workers skip their
+own events, which they already dispatched at commit.
+
+Caches register interest with ``subscribe``. Handlers run on the committing
+thread for local events and on the listener thread for remote ones, so they
+must be thread-safe and must not use the database. If a worker may have
+missed events (the listener reconnected, or polling stalled past the
+table's retention), every subscriber's ``resync`` callback runs instead.
+"""
+
+import json
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from uuid import UUID, uuid4
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, Text, event, func, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+BOTTLE_CHANGED = "bottle"
+NOTE_CHANGED = "note"
+COLLECTION_CHANGED = "collection"
+USER_CHANGED = "user"
+DIMENSION_CHANGED = "dimension"
+EVENT_TYPES = (BOTTLE_CHANGED, NOTE_CHANGED, COLLECTION_CHANGED, USER_CHANGED, DIMENSION_CHANGED)
+
+CHANNEL = "drinkshelf_invalidation"
+PENDING = "pending_invalidations"  # Session.info key for events awaiting commit
+WORKER_ID = uuid4().hex
+
+# SQLite fallback; kept out of the models' metadata since Postgres never needs it
+invalidation_log = Table(
+    "cache_invalidations",
+    MetaData(),
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("origin", String(32), nullable=False),
+    Column("payload", Text, nullable=False),
+    Column("created_at", DateTime, nullable=False, server_default=func.current_timestamp()),
+    sqlite_autoincrement=True,
+)
+
+
+@dataclass(frozen=True)
+class Event:
+    type: str
+    action: str  # created, updated, deleted; researched and restored for bottles; bottle_added/bottle_removed for collections
+    user_id: Optional[UUID] = None
+    bottle_id: Optional[UUID] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+    origin: str = WORKER_ID
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "type": self.type,
+            "action": self.action,
+            "user_id": str(self.user_id) if self.user_id else None,
+            "bottle_id": str(self.bottle_id) if self.bottle_id else None,
+            "data": self.data,
+            "origin": self.origin,
+        }, default=str)
+
+    @classmethod
+    def from_json(cls, payload: str) -> "Event":
+        values = json.loads(payload)
+        return cls(
+            type=values["type"],
+            action=values["action"],
+            user_id=UUID(values["user_id"]) if values.get("user_id") else None,
+            bottle_id=UUID(values["bottle_id"]) if values.get("bottle_id") else None,
+            data=values.get("data") or {},
+            origin=values["origin"],
+        )
+
+
+def create_invalidation_table(connection, bus: Optional["InvalidationBus"] = None) -> None:
+    """Create the SQLite event table and register it with ``bus`` (the app's by default)
+
+    Postgres uses LISTEN/NOTIFY instead.
+    """
+    if connection.dialect.name == "sqlite":
+        invalidation_log.create(connection, checkfirst=True)
+        (bus or invalidation_bus).log_urls.add(str(connection.engine.url))
+
+
+class InvalidationBus:
+    """Typed in-process pub/sub whose events also reach the other workers"""
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Callable[[Event], None]]] = defaultdict(list)
+        self._resyncs: List[Callable[[], None]] = []
+        self.log_urls = set()  # SQLite databases known to have cache_invalidations
+        self.received = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def subscribe(
+        self,
+        types: Iterable[str],
+        handler: Callable[[Event], None],
+        resync: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Call ``handler`` for committed events of ``types``, from any worker"""
+        for event_type in types:
+            if event_type not in EVENT_TYPES:
+                raise ValueError(f"Unknown event type {event_type!r}")
+            self._handlers[event_type].append(handler)
+        if resync is not None:
+            self._resyncs.append(resync)
+
+    def publish(
+        self,
+        db: Session,
+        event_type: str,
+        action: str,
+        user_id: Optional[UUID] = None,
+        bottle_id: Optional[UUID] = None,
+        **data: Any,
+    ) -> Event:
+        """Queue an event to be dispatched when ``db``'s transaction commits"""
+        published = Event(event_type, action, user_id, bottle_id, data)
+        db.info.setdefault(PENDING, []).append(published)
+        if settings.INVALIDATION_BUS_ENABLED:
+            bind = db.get_bind()
+            dialect = bind.dialect.name
+            if dialect == "postgresql":
+                db.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": CHANNEL, "payload": published.to_json()},
+                )
+            elif dialect == "sqlite" and str(bind.engine.url) in self.log_urls:
+                db.execute(invalidation_log.insert().values(
+                    origin=WORKER_ID, payload=published.to_json()
+                ))
+        return published
+
+    def dispatch(self, published: Event) -> None:
+        """Run the subscribers of an event, logging rather than raising their errors"""
+        for handler in self._handlers.get(published.type, ()):
+            try:
+                handler(published)
+            except Exception:
+                logger.exception("Invalidation handler failed for %s event", published.type)
+
+    def receive(self, payload: str) -> None:
+        """Dispatch an event published by another worker"""
+        try:
+            published = Event.from_json(payload)
+        except (ValueError, KeyError):
+            logger.warning("Ignoring malformed invalidation event: %.200s", payload)
+            return
+        if published.origin == WORKER_ID:
+            return
+        self.received += 1
+        self.dispatch(published)
+
+    def resync(self) -> None:
+        """Drop everything subscribers cache, after events may have been missed"""
+        for callback in self._resyncs:
+            try:
+                callback()
+            except Exception:
+                logger.exception("Invalidation resync failed")
+
+    def start(self, engine: Engine, read_engine: Optional[Engine] = None) -> None:
+        """Start listening for other workers' events in a daemon thread"""
+        if self._thread is not None or not settings.INVALIDATION_BUS_ENABLED:
+            return
+        read_engine = read_engine or engine
+        if engine.dialect.name == "postgresql":
+            target, args = self._listen, (engine, read_engine)
+        elif engine.dialect.name == "sqlite" and str(engine.url) in self.log_urls:
+            # Take the starting position now so events logged before the
+            # first poll are not skipped
+            target, args = self._poll, (engine, read_engine, self._log_position(read_engine))
+        else:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=target, args=args, name="invalidation-bus", daemon=True)
+        self._thread.start()
+
+    @property
+    def listening(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _listen(self, engine: Engine, read_engine: Engine) -> None:
+        # A dedicated connection outside the pool, since it is held forever
+        cargs, cparams = engine.dialect.create_connect_args(engine.url)
+        connected_before = False
+        while not self._stopped.is_set():
+            connection = None
+            try:
+                connection = engine.dialect.dbapi.connect(*cargs, **cparams)
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL}")
+                if connected_before:
+                    self.resync()
+                connected_before = True
+                while not self._stopped.is_set():
+                    if not select.select([connection], [], [], 1.0)[0]:
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        self.receive(connection.notifies.pop(0).payload)
+            except Exception:
+                logger.warning("Invalidation listener lost its connection; retrying", exc_info=True)
+                self._stopped.wait(settings.INVALIDATION_POLL_INTERVAL)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+    @staticmethod
+    def _log_position(read_engine: Engine) -> Optional[int]:
+        """ID of the newest logged event, or None if the table cannot be read"""
+        try:
+            with read_engine.connect() as connection:
+                return connection.execute(
+                    text("SELECT COALESCE(MAX(id), 0) FROM cache_invalidations")
+                ).scalar()
+        except Exception:
+            logger.warning("Could not read the invalidation log position", exc_info=True)
+            return None
+
+    def _poll(self, engine: Engine, read_engine: Engine, last_id: Optional[int]) -> None:
+        last_success = time.monotonic()
+        pruned_at = 0.0
+        while not self._stopped.wait(settings.INVALIDATION_POLL_INTERVAL):
+            try:
+                with read_engine.connect() as connection:
+                    if last_id is None:
+                        # No starting position; events since startup may be lost
+                        last_id = connection.execute(
+                            text("SELECT COALESCE(MAX(id), 0) FROM cache_invalidations")
+                        ).scalar()
+                        rows = []
+                        self.resync()
+                    else:
+                        rows = connection.execute(
+                            text(
+                                "SELECT id, payload FROM cache_invalidations"
+                                " WHERE id > :last_id ORDER BY id LIMIT 1000"
+                            ),
+                            {"last_id": last_id},
+                        ).all()
+                now = time.monotonic()
+                if now - last_success > settings.INVALIDATION_RETENTION:
+                    self.resync()
+                last_success = now
+                for row_id, payload in rows:
+                    last_id = row_id
+                    self.receive(payload)
+                if now - pruned_at > settings.INVALIDATION_RETENTION / 2:
+                    pruned_at = now
+                    with engine.begin() as connection:
+                        connection.execute(
+                            text(
+                                "DELETE FROM cache_invalidations"
+                                " WHERE created_at < datetime('now', :age)"
+                            ),
+                            {"age": f"-{int(settings.INVALIDATION_RETENTION)} seconds"},
+                        )
+            except Exception:
+                logger.warning("Polling for invalidation events failed", exc_info=True)
+
+
+invalidation_bus = InvalidationBus()
+publish = invalidation_bus.publish
+subscribe = invalidation_bus.subscribe
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_committed(session: Session) -> None:
+    for published in session.info.pop(PENDING, ()):
+        invalidation_bus.dispatch(published)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_rolled_back(session: Session, previous_transaction) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop(PENDING, None)
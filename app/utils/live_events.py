@@ -0,0 +1,213 @@
+"""Per-user live event streams
+
+``EventHub`` turns the change events CRUD writes publish on the
+invalidation bus (see ``app.utils.invalidation``) into Server-Sent Events
+for ``GET /events``. Events from other workers arrive through the same bus,
+so with the bus enabled every worker streams every write.
+
+Idle connections are cheap. Each user with a stream open has one channel,
+which holds a short buffer of preformatted events and one wake-up future
+shared by all of that user's connections. A connection only tracks its
+position in the buffer. Nothing is queued per connection, and a connection
+has no task of its own beyond the one watching for disconnects.
+
+Event ids are ``<boot>-<sequence>``, where ``boot`` is unique to the worker
+process. A client resuming with ``Last-Event-ID`` gets the buffered events
+after that id. If the id came from another worker or process, or its events
+have left the buffer, the client gets a ``resync`` event instead and should
+catch up through ``/sync``.
+"""
+
+import asyncio
+import itertools
+import json
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Optional, Tuple
+from uuid import UUID, uuid4
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+from app.config import settings
+from app.utils.invalidation import EVENT_TYPES, Event, subscribe
+
+# Event data fields clients see; the rest is for caches
+PUBLIC_FIELDS = ("note_id", "collection_id")
+RESYNC = b"event: resync\ndata: {}\n\n"
+HEARTBEAT = b": heartbeat\n\n"
+
+
+class Channel:
+    """Buffered events and the wake-up future for one user's connections"""
+
+    __slots__ = ("events", "waiter", "connections", "floor", "epoch")
+
+    def __init__(self, size: int, floor: int):
+        self.events: Deque[Tuple[int, bytes]] = deque(maxlen=size)
+        self.waiter: Optional[asyncio.Future] = None
+        self.connections = 0
+        self.floor = floor  # every event after this sequence is still buffered
+        self.epoch = 0  # bumped when buffered history is thrown away
+
+
+def format_event(sequence_id: str, published: Event) -> bytes:
+    data = {
+        "type": published.type,
+        "action": published.action,
+        "bottle_id": str(published.bottle_id) if published.bottle_id else None,
+    }
+    data.update((key, published.data[key]) for key in PUBLIC_FIELDS if key in published.data)
+    name = f"{published.type}.{published.action}"
+    return f"id: {sequence_id}\nevent: {name}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+class EventHub:
+    """Fans committed write events out to the connections of the user they belong to"""
+
+    def __init__(self, buffer_size: int, max_idle_channels: int):
+        self.buffer_size = buffer_size
+        self.max_idle_channels = max_idle_channels
+        self.boot = uuid4().hex[:8]
+        self._sequence = itertools.count(1)
+        self.last_sequence = 0
+        self._channels: Dict[UUID, Channel] = {}
+        self._idle: "OrderedDict[UUID, None]" = OrderedDict()  # channels without connections, oldest first
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.connections = 0
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Deliver events on ``loop``; until then they are dropped"""
+        self._loop = loop
+
+    def on_event(self, published: Event) -> None:
+        """Bus handler; may run on any thread"""
+        if self._loop is not None and published.user_id is not None:
+            self._loop.call_soon_threadsafe(self._deliver, published)
+
+    def resync(self) -> None:
+        """Bus resync handler: events may have been missed, so every stream must resync"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._reset_channels)
+
+    def _reset_channels(self) -> None:
+        for channel in self._channels.values():
+            channel.events.clear()
+            channel.floor = self.last_sequence
+            channel.epoch += 1
+            self._wake(channel)
+
+    def _deliver(self, published: Event) -> None:
+        channel = self._channels.get(published.user_id)
+        if channel is None:
+            return
+        sequence = self.last_sequence = next(self._sequence)
+        if len(channel.events) == channel.events.maxlen:
+            channel.floor = channel.events[0][0]
+        channel.events.append((sequence, format_event(f"{self.boot}-{sequence}", published)))
+        self._wake(channel)
+
+    @staticmethod
+    def _wake(channel: Channel) -> None:
+        waiter, channel.waiter = channel.waiter, None
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def open(self, user_id: UUID) -> Channel:
+        """Channel for a new connection, created if the user has none"""
+        channel = self._channels.get(user_id)
+        if channel is None:
+            channel = self._channels[user_id] = Channel(self.buffer_size, self.last_sequence)
+        self._idle.pop(user_id, None)
+        channel.connections += 1
+        self.connections += 1
+        return channel
+
+    def close(self, user_id: UUID, channel: Channel) -> None:
+        """Release a connection; idle channels stay around for resumes, up to a limit"""
+        channel.connections -= 1
+        self.connections -= 1
+        if channel.connections == 0:
+            self._idle[user_id] = None
+            while len(self._idle) > self.max_idle_channels:
+                evicted, _ = self._idle.popitem(last=False)
+                del self._channels[evicted]
+
+    def resume_position(self, channel: Channel, last_event_id: Optional[str]) -> Optional[int]:
+        """Sequence a connection resumes after, or None if it has to resync"""
+        if not last_event_id:
+            return self.last_sequence
+        boot, _, sequence = last_event_id.partition("-")
+        if boot != self.boot or not sequence.isdigit() or int(sequence) < channel.floor:
+            return None
+        return int(sequence)
+
+    def waiter(self, channel: Channel) -> asyncio.Future:
+        if channel.waiter is None:
+            channel.waiter = asyncio.get_running_loop().create_future()
+        return channel.waiter
+
+    def stats(self) -> dict:
+        return {"connections": self.connections, "channels": len(self._channels)}
+
+
+class EventStreamResponse(StreamingResponse):
+    """``text/event-stream`` response following one user's channel until the client leaves"""
+
+    def __init__(self, hub: EventHub, user_id: UUID, last_event_id: Optional[str] = None):
+        super().__init__(
+            (),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+        self.hub = hub
+        self.user_id = user_id
+        self.last_event_id = last_event_id
+
+    @staticmethod
+    async def _disconnected(receive: Receive) -> None:
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        hub = self.hub
+        channel = hub.open(self.user_id)
+        disconnected = asyncio.ensure_future(self._disconnected(receive))
+        try:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            body = f"retry: {settings.SSE_RETRY_MS}\n\n".encode()
+            position = hub.resume_position(channel, self.last_event_id)
+            if position is None:
+                body += RESYNC
+                position = hub.last_sequence
+            epoch = channel.epoch
+
+            while True:
+                if channel.epoch != epoch or position < channel.floor:
+                    # Buffered history this connection needed is gone
+                    body += RESYNC
+                    epoch, position = channel.epoch, channel.floor
+                pending = [data for sequence, data in channel.events if sequence > position]
+                if pending:
+                    body += b"".join(pending)
+                    position = channel.events[-1][0]
+                if body:
+                    await send({"type": "http.response.body", "body": body, "more_body": True})
+                    body = b""
+                    continue
+
+                done, _ = await asyncio.wait(
+                    (hub.waiter(channel), disconnected),
+                    timeout=settings.SSE_HEARTBEAT_SECONDS,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if disconnected in done:
+                    return
+                if not done:
+                    body = HEARTBEAT
+        except OSError:
+            return  # client went away mid-send
+        finally:
+            disconnected.cancel()
+            hub.close(self.user_id, channel)
+
+
+event_hub = EventHub(settings.SSE_REPLAY_EVENTS, settings.SSE_MAX_IDLE_CHANNELS)
+subscribe(EVENT_TYPES, event_hub.on_event, resync=event_hub.resync)
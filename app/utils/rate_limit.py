@@ -0,0 +1,168 @@
+"""Token-bucket rate limiting
+
+Each client gets a bucket that refills at a steady rate up to a burst
+capacity, and each request takes tokens according to its route class (see
+``app.utils.admission.classify``). Searches cost more than plain reads, and
+AI research is charged separately by the bottle route. Authenticated clients
+are keyed by the token's subject, which is the same user ``get_current_user``
+resolves but without a database round trip. Anonymous clients are keyed by
+IP and get a smaller bucket.
+
+Buckets live in process by default. Set ``RATE_LIMIT_BACKEND_URL`` to a
+Redis-compatible server to share them between workers; the refill-and-take
+step runs there as one Lua script, so it stays a single round trip.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+from app.config import settings
+from app.utils.security import decode_token
+
+ROUTE_COSTS = {"interactive": 1, "write": 2, "search": 5, "bulk": 10}
+RESEARCH_COST = 20
+
+
+@dataclass(frozen=True)
+class BucketPolicy:
+    rate: float  # tokens added per second
+    capacity: float  # burst size
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    remaining: float
+    retry_after: float  # seconds until the request would fit, 0 when allowed
+
+
+class MemoryBackend:
+    """Buckets in a bounded LRU map, for single-process deployments"""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, cost: float, policy: BucketPolicy) -> Tuple[bool, float]:
+        """Refill and try to take ``cost`` tokens; returns (allowed, tokens left)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (policy.capacity, now))
+            tokens = min(policy.capacity, tokens + (now - updated_at) * policy.rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, tokens
+
+
+# KEYS[1] bucket; ARGV rate, capacity, cost. Uses the server clock so workers agree.
+TAKE_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local rate, capacity, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBackend:
+    """Buckets in a Redis-compatible store shared by every worker"""
+
+    def __init__(self, client, prefix: str = "ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(TAKE_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_BACKEND_URL requires the redis package") from e
+        return cls(redis.Redis.from_url(url, socket_timeout=0.25))
+
+    def take(self, key: str, cost: float, policy: BucketPolicy) -> Tuple[bool, float]:
+        allowed, tokens = self._script(
+            keys=[self.prefix + key], args=[policy.rate, policy.capacity, cost]
+        )
+        return bool(allowed), float(tokens)
+
+
+@lru_cache(maxsize=4096)
+def _token_subject(token: str) -> Optional[str]:
+    payload = decode_token(token)
+    return payload.get("sub") if payload else None
+
+
+def client_identity(authorization: Optional[str], address: Optional[str]) -> Tuple[str, bool]:
+    """Bucket key for a request and whether it is authenticated"""
+    if authorization and authorization[:7].lower() == "bearer ":
+        subject = _token_subject(authorization[7:])
+        if subject:
+            return f"user:{subject}", True
+    return f"ip:{address or 'unknown'}", False
+
+
+class RateLimiter:
+    """Applies bucket policies on top of a backend"""
+
+    def __init__(self, backend, user_policy: BucketPolicy, anonymous_policy: BucketPolicy):
+        self.backend = backend
+        self.user_policy = user_policy
+        self.anonymous_policy = anonymous_policy
+        self.rejected = 0
+
+    def check_request(self, request, cost: float) -> Decision:
+        """Charge a request's client ``cost`` tokens"""
+        key, authenticated = client_identity(
+            request.headers.get("authorization"), request.client.host if request.client else None
+        )
+        return self.check(key, authenticated, cost)
+
+    def check(self, key: str, authenticated: bool, cost: float) -> Decision:
+        policy = self.user_policy if authenticated else self.anonymous_policy
+        try:
+            allowed, remaining = self.backend.take(key, cost, policy)
+        except Exception:
+            # A shared store outage should not take the API down with it
+            return Decision(True, 0.0, 0.0)
+        if allowed:
+            return Decision(True, remaining, 0.0)
+        self.rejected += 1
+        return Decision(False, remaining, math.ceil((cost - remaining) / policy.rate * 10) / 10)
+
+
+def create_rate_limiter() -> RateLimiter:
+    backend = (
+        RedisBackend.from_url(settings.RATE_LIMIT_BACKEND_URL)
+        if settings.RATE_LIMIT_BACKEND_URL
+        else MemoryBackend()
+    )
+    return RateLimiter(
+        backend,
+        user_policy=BucketPolicy(settings.RATE_LIMIT_RATE, settings.RATE_LIMIT_BURST),
+        anonymous_policy=BucketPolicy(
+            settings.RATE_LIMIT_ANONYMOUS_RATE, settings.RATE_LIMIT_ANONYMOUS_BURST
+        ),
+    )
+
+
+rate_limiter = create_rate_limiter()
@@ -0,0 +1,189 @@
+"""Fast JSON serialization for list endpoints
+
+List routes can select plain columns with SQLAlchemy Core and hand the rows
+straight to a precompiled ``RowSerializer``. This skips building ORM objects
+and validating every field through Pydantic, while producing the same JSON
+shape as the matching ``*Read`` schema.
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+from uuid import UUID
+from fastapi import HTTPException, Query, status
+from fastapi.responses import Response
+from pydantic import BaseModel
+from app.models.bottle import Bottle, HEAVY_COLUMNS
+from app.models.collection import Collection
+from app.models.tasting_note import TastingNote
+from app.schemas.bottle import BottleRead
+from app.schemas.collection import CollectionRead
+from app.schemas.tasting_note import TastingNoteRead
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Encode values the JSON backends don't handle natively"""
+    if isinstance(value, Decimal):
+        # Matches Pydantic, which renders Decimal fields as strings
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _json_key(key: Any) -> Any:
+    """Key as the json module accepts it; it only takes a few key types"""
+    return key if key is None or isinstance(key, (str, int, float)) else _default(key)
+
+
+def _string_keys(value: Any) -> Any:
+    """Stringify non-str dict keys like orjson's OPT_NON_STR_KEYS"""
+    if isinstance(value, dict):
+        return {_json_key(key): _string_keys(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_string_keys(item) for item in value]
+    return value
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    encoded = json.dumps(_string_keys(content), default=_default, separators=(",", ":"))
+    return encoded.encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered without Pydantic validation"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RowSerializer:
+    """Precompiled serializer turning Core rows into JSON-ready dicts
+
+    The column list is derived once from the schema's fields, so routes can
+    select exactly those columns and serialize each row with a single
+    ``zip``. Optional converters are applied only to the fields they name.
+    """
+
+    def __init__(
+        self,
+        schema: Type[BaseModel],
+        model: Any,
+        fields: Optional[Sequence[str]] = None,
+        converters: Optional[Dict[str, Callable[[Any], Any]]] = None,
+    ):
+        self.schema = schema
+        self.model = model
+        self.fields = tuple(fields) if fields is not None else tuple(schema.model_fields)
+        self.columns = tuple(getattr(model, name) for name in self.fields)
+        self._converter_map = converters or {}
+        self._subsets: Dict[Tuple[str, ...], "RowSerializer"] = {}
+        converters = self._converter_map
+        self._converters = tuple(
+            (index, converters[name])
+            for index, name in enumerate(self.fields)
+            if name in converters
+        )
+
+    def subset(self, fields: Iterable[str]) -> "RowSerializer":
+        """Return a cached serializer for a subset of this serializer's fields
+
+        Fields are kept in schema order so equivalent requests share one
+        compiled serializer. Raises ``ValueError`` for unknown field names.
+        """
+        wanted = set(fields)
+        unknown = wanted.difference(self.fields)
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+        key = tuple(name for name in self.fields if name in wanted)
+        serializer = self._subsets.get(key)
+        if serializer is None:
+            serializer = RowSerializer(
+                self.schema,
+                self.model,
+                fields=key,
+                converters={k: v for k, v in self._converter_map.items() if k in wanted},
+            )
+            self._subsets[key] = serializer
+        return serializer
+
+    def to_dict(self, row: Sequence[Any]) -> Dict[str, Any]:
+        """Serialize a single row"""
+        if self._converters:
+            row = list(row)
+            for index, convert in self._converters:
+                if row[index] is not None:
+                    row[index] = convert(row[index])
+        return dict(zip(self.fields, row))
+
+    def to_dicts(self, rows: Iterable[Sequence[Any]]) -> List[Dict[str, Any]]:
+        """Serialize a page of rows"""
+        if self._converters:
+            return [self.to_dict(row) for row in rows]
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in rows]
+
+    def response(
+        self,
+        rows: Iterable[Sequence[Any]],
+        status_code: int = 200,
+    ) -> FastJSONResponse:
+        """Build a JSON response for a page of rows"""
+        return FastJSONResponse(self.to_dicts(rows), status_code=status_code)
+
+
+class FieldSelector:
+    """Dependency resolving a ``fields=`` query parameter to a serializer
+
+    Only the requested columns are selected in SQL. ``id`` is always
+    included so clients can key the results.
+    """
+
+    def __init__(self, serializer: RowSerializer, default: Optional[Sequence[str]] = None):
+        self.serializer = serializer
+        self.default = serializer.subset(default) if default is not None else serializer
+
+    def __call__(
+        self,
+        fields: Optional[str] = Query(
+            None,
+            max_length=500,
+            description="Comma-separated list of fields to return",
+        ),
+    ) -> RowSerializer:
+        if not fields:
+            return self.default
+        names = {name.strip() for name in fields.split(",") if name.strip()}
+        names.add("id")
+        try:
+            return self.serializer.subset(names)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+
+
+bottle_serializer = RowSerializer(BottleRead, Bottle)
+tasting_note_serializer = RowSerializer(TastingNoteRead, TastingNote)
+collection_serializer = RowSerializer(CollectionRead, Collection)
+
+# Bottle list endpoints skip heavy columns unless asked for them via fields=
+bottle_list_fields = tuple(name for name in bottle_serializer.fields if name not in HEAVY_COLUMNS)
+select_bottle_fields = FieldSelector(bottle_serializer, default=bottle_list_fields)
@@ -0,0 +1,120 @@
+"""Benchmark: structured query path vs the /search/filter path
+
+Runs equivalent searches through ``query_bottles`` (cold and with a cached
+plan) and ``filter_bottles`` against the configured DATABASE_URL. With
+``--seed`` it first inserts synthetic bottles for a throwaway user.
+
+Usage:
+    python -m benchmarks.bench_query [--seed 20000] [--repeat 200]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from decimal import Decimal
+from uuid import uuid4
+import numpy as np
+from app.crud.dimension import assign_dimensions
+from app.database import Base, SessionLocal, engine
+from app.models.bottle import Bottle, SpiritType
+from app.models.user import User
+from app.services.search_service import compile_query, filter_bottles, query_bottles
+from app.utils.cache import query_plan_cache
+
+# Structured query and the closest /search/filter equivalent; the filter path
+# has no distillery filter, so the first case matches a superset there
+CASES = (
+    (
+        'distillery:"Buffalo Trace" proof:>100 rating:>=4',
+        {"min_proof": 100, "min_rating": 4},
+    ),
+    (
+        "country:USA type:whiskey price:25..60",
+        {
+            "country": "USA",
+            "spirit_type": SpiritType.WHISKEY,
+            "min_price": Decimal(25),
+            "max_price": Decimal(60),
+        },
+    ),
+)
+
+
+async def seed(db, count: int) -> None:
+    """Insert synthetic bottles spread over a few distilleries and countries"""
+    rng = random.Random(0)
+    user = User(username=f"bench-{uuid4().hex[:8]}", email=f"{uuid4().hex[:8]}@bench.test", password_hash="x")
+    db.add(user)
+    db.flush()
+    places = [("Buffalo Trace", "USA"), ("Ardbeg", "Scotland"), ("Redbreast", "Ireland"), ("Yamazaki", "Japan")]
+    for i in range(count):
+        distillery, country = rng.choice(places)
+        bottle = Bottle(
+            user_id=user.id,
+            name=f"Bottle {i}",
+            spirit_type=SpiritType.WHISKEY,
+            distillery=distillery,
+            country=country,
+            proof=rng.uniform(80, 130),
+            price_paid=Decimal(rng.randint(15, 200)),
+            rating=rng.randint(1, 5),
+        )
+        await assign_dimensions(db, bottle)
+        db.add(bottle)
+        if i % 1000 == 999:
+            db.commit()
+    db.commit()
+
+
+def timed(fn, repeat: int) -> np.ndarray:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return np.array(timings) * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if args.seed:
+            asyncio.run(seed(db, args.seed))
+
+        for query, filters in CASES:
+            print(query)
+
+            def cold_compile():
+                query_plan_cache.clear()
+                asyncio.run(compile_query(db, query))
+
+            def structured():
+                asyncio.run(query_bottles(db, query, limit=50))
+
+            def filtered():
+                asyncio.run(filter_bottles(db, limit=50, **filters))
+
+            for label, fn in (
+                ("compile (cold)", cold_compile),
+                ("compile (cached)", lambda: asyncio.run(compile_query(db, query))),
+                ("query path", structured),
+                ("filter path", filtered),
+            ):
+                timings = timed(fn, args.repeat)
+                print(
+                    f"  {label:<18} p50 {np.percentile(timings, 50):8.3f} ms  "
+                    f"p99 {np.percentile(timings, 99):8.3f} ms"
+                )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
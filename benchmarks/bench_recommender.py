@@ -0,0 +1,70 @@
+"""Benchmark: recommender train time and per-request serve latency
+
+Generates a synthetic long-tail rating matrix, trains the item-item model,
+publishes it to a temporary directory, memory-maps it back and times
+``recommend`` for random users. No database is needed.
+
+Usage:
+    python -m benchmarks.bench_recommender [--users 20000] [--items 5000] [--ratings 30]
+"""
+
+import argparse
+import tempfile
+import time
+from uuid import uuid4
+import numpy as np
+from app.services.recommender import load_model, save_model, train_from_ratings
+
+
+def make_ratings(users: int, items: int, per_user: int, seed: int = 0):
+    """Zipf-distributed item picks with ratings 1-5"""
+    rng = np.random.default_rng(seed)
+    user_rows = np.repeat(np.arange(users, dtype=np.int32), per_user)
+    item_cols = (rng.zipf(1.3, size=users * per_user) - 1) % items
+    ratings = rng.integers(1, 6, size=users * per_user).astype(np.float32)
+    return user_rows, item_cols.astype(np.int32), ratings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--ratings", type=int, default=30, help="Ratings per user")
+    parser.add_argument("--neighbors", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    user_rows, item_cols, ratings = make_ratings(args.users, args.items, args.ratings)
+    user_ids = [str(uuid4()) for _ in range(args.users)]
+    items = [{"product_id": str(uuid4()), "name": f"Product {i}"} for i in range(args.items)]
+
+    start = time.perf_counter()
+    arrays = train_from_ratings(
+        user_rows, item_cols, ratings, args.users, args.items, neighbors=args.neighbors
+    )
+    print(f"train    {time.perf_counter() - start:8.2f} s  ({len(ratings)} ratings)")
+
+    with tempfile.TemporaryDirectory() as path:
+        save_model(arrays, user_ids, items, path)
+        start = time.perf_counter()
+        model = load_model(path)
+        print(f"load     {(time.perf_counter() - start) * 1e3:8.2f} ms")
+
+        rng = np.random.default_rng(1)
+        timings = []
+        for user in rng.integers(0, args.users, size=args.requests):
+            start = time.perf_counter()
+            model.recommend(user_ids[user], limit=10)
+            timings.append(time.perf_counter() - start)
+        timings = np.array(timings) * 1e3
+        print(
+            f"serve    p50 {np.percentile(timings, 50):.3f} ms  "
+            f"p99 {np.percentile(timings, 99):.3f} ms  (cold start: "
+        , end="")
+        start = time.perf_counter()
+        model.recommend(uuid4(), limit=10)
+        print(f"{(time.perf_counter() - start) * 1e3:.3f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Microbenchmark: per-row serialization cost for a 100-row bottle page
+
+Compares the default response_model path (Pydantic validation of ORM objects
+followed by JSON encoding) with the RowSerializer fast path used by the list
+endpoints. No database is needed; rows are built in memory.
+
+Usage:
+    python -m benchmarks.bench_serialization [--rows 100] [--repeat 200]
+"""
+
+import argparse
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import uuid4
+from pydantic import TypeAdapter
+from app.models.bottle import Bottle, SpiritType
+from app.schemas.bottle import BottleRead
+from app.utils.serialization import bottle_serializer, dumps
+
+
+def make_page(rows: int):
+    """Build matching ORM objects and Core-style rows"""
+    bottles = []
+    for i in range(rows):
+        bottles.append(
+            Bottle(
+                id=uuid4(),
+                user_id=uuid4(),
+                name=f"Bottle {i}",
+                spirit_type=SpiritType.WHISKEY,
+                distillery="Buffalo Trace",
+                proof=90.0 + i % 40,
+                age_statement="12 Year",
+                region="Kentucky",
+                country="United States",
+                release_year=2020,
+                batch_number=f"B{i}",
+                price_paid=Decimal("49.99"),
+                price_current=Decimal("59.99"),
+                acquisition_date=date(2024, 1, 1),
+                notes="Rich caramel and oak. " * 10,
+                rating=4,
+                image_url="https://example.com/bottle.png",
+                ai_details={"tasting_notes": "x" * 2000, "history": "y" * 2000},
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow(),
+            )
+        )
+    rows_ = [
+        tuple(getattr(b, name) for name in bottle_serializer.fields) for b in bottles
+    ]
+    return bottles, rows_
+
+
+def timeit(fn, repeat: int) -> float:
+    """Return the best wall time of ``repeat`` runs in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    bottles, rows = make_page(args.rows)
+    adapter = TypeAdapter(list[BottleRead])
+
+    def pydantic_path():
+        adapter.dump_json(adapter.validate_python(bottles, from_attributes=True))
+
+    def fast_path():
+        dumps(bottle_serializer.to_dicts(rows))
+
+    for label, fn in (("pydantic response_model", pydantic_path), ("row serializer", fast_path)):
+        best = timeit(fn, args.repeat)
+        print(
+            f"{label:<24} {best * 1e3:8.3f} ms/page  "
+            f"{best * 1e6 / args.rows:8.2f} us/row"
+        )
+
+
+if __name__ == "__main__":
+    main()
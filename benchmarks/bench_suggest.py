@@ -0,0 +1,70 @@
+"""Benchmark: suggestion latency and memory for the in-process index
+
+Fills a SuggestIndex with synthetic bottle names, distilleries, regions and
+countries, then times prefix queries of 1-8 characters and misspelled
+queries that take the trigram fallback. No database is needed.
+
+Usage:
+    python -m benchmarks.bench_suggest [--terms 50000] [--queries 5000]
+"""
+
+import argparse
+import random
+import string
+import time
+import numpy as np
+from app.services.suggest_service import SuggestIndex
+
+
+def make_word(rng: random.Random) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10))).title()
+
+
+def time_queries(index: SuggestIndex, queries) -> np.ndarray:
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        index.suggest(query, limit=10)
+        timings.append(time.perf_counter() - start)
+    return np.array(timings) * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--terms", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = [make_word(rng) for _ in range(max(args.terms // 10, 100))]
+    names = [
+        f"{rng.choice(vocabulary)} {rng.choice(vocabulary)} {rng.randint(3, 25)}"
+        for _ in range(args.terms)
+    ]
+
+    index = SuggestIndex()
+    start = time.perf_counter()
+    for name in names:
+        index.add("name", name, rng.randint(1, 20))
+    for word in vocabulary[:2000]:
+        index.add("distillery", word, rng.randint(1, 50))
+    print(f"build    {time.perf_counter() - start:8.2f} s  ({len(index)} terms)")
+    print(f"memory   {index.memory_usage()['bytes'] / 2**20:8.1f} MiB")
+
+    prefixes = [rng.choice(names).lower()[: rng.randint(1, 8)] for _ in range(args.queries)]
+    typos = []
+    for _ in range(args.queries // 5):
+        word = list(rng.choice(vocabulary).lower())
+        word[rng.randrange(len(word))] = rng.choice(string.ascii_lowercase)
+        typos.append("".join(word))
+
+    for label, queries in (("prefix", prefixes), ("typo", typos)):
+        timings = time_queries(index, queries)
+        print(
+            f"{label:<8} p50 {np.percentile(timings, 50):.3f} ms  "
+            f"p99 {np.percentile(timings, 99):.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Add catalog_products and bottles.product_id
+
+Revision ID: 0001_catalog_products
+Revises:
+Create Date: 2026-10-19 00:00:00
+
+Databases bootstrapped with ``Base.metadata.create_all`` may already have
+the table and column, so each step checks before creating. Link existing
+bottles afterwards with ``python -m app.services.catalog_service``.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0001_catalog_products"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+SPIRIT_TYPES = ("WHISKEY", "VODKA", "TEQUILA", "RUM", "GIN", "BEER", "WINE", "LIQUEUR", "OTHER")
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table("catalog_products"):
+        op.create_table(
+            "catalog_products",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("match_key", sa.String(600), nullable=False, unique=True),
+            sa.Column("name", sa.String(255), nullable=False, index=True),
+            sa.Column(
+                "spirit_type",
+                postgresql.ENUM(*SPIRIT_TYPES, name="spirittype", create_type=False),
+                nullable=False,
+                index=True,
+            ),
+            sa.Column("distillery", sa.String(255), nullable=True, index=True),
+            sa.Column("proof", sa.Float(), nullable=True),
+            sa.Column("age_statement", sa.String(50), nullable=True),
+            sa.Column("region", sa.String(100), nullable=True),
+            sa.Column("country", sa.String(100), nullable=True, index=True),
+            sa.Column("ai_details", sa.JSON(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        )
+
+    columns = {column["name"] for column in inspector.get_columns("bottles")}
+    if "product_id" not in columns:
+        with op.batch_alter_table("bottles") as batch:
+            batch.add_column(sa.Column("product_id", postgresql.UUID(as_uuid=True), nullable=True))
+            batch.create_foreign_key(
+                "fk_bottles_product_id", "catalog_products", ["product_id"], ["id"]
+            )
+            batch.create_index("ix_bottles_product_id", ["product_id"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("bottles") as batch:
+        batch.drop_index("ix_bottles_product_id")
+        batch.drop_constraint("fk_bottles_product_id", type_="foreignkey")
+        batch.drop_column("product_id")
+    op.drop_table("catalog_products")
@@ -0,0 +1,100 @@
+"""Add distillery/region/country dimensions
+
+Revision ID: 0002_dimensions
+Revises: 0001_catalog_products
+Create Date: 2026-10-19 00:00:00
+
+New and updated rows get their keys on write; existing bottles and catalog
+products are keyed below, one UPDATE per distinct spelling. After adding
+aliases, re-resolve everything with ``python -m app.services.dimension_service``.
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.crud.dimension import DIMENSION_COLUMNS, canonical_dimension
+
+# revision identifiers, used by Alembic.
+revision = "0002_dimensions"
+down_revision = "0001_catalog_products"
+branch_labels = None
+depends_on = None
+
+DIMENSION_TABLES = (("distilleries", 255), ("regions", 100), ("countries", 100))
+KEY_COLUMNS = (
+    ("distillery_id", "distilleries"),
+    ("region_id", "regions"),
+    ("country_id", "countries"),
+)
+KIND_TABLES = (("distillery", "distilleries"), ("region", "regions"), ("country", "countries"))
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    for table, length in DIMENSION_TABLES:
+        if not inspector.has_table(table):
+            op.create_table(
+                table,
+                sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+                sa.Column("key", sa.String(length), nullable=False, unique=True),
+                sa.Column("name", sa.String(length), nullable=False),
+            )
+    if not inspector.has_table("dimension_aliases"):
+        op.create_table(
+            "dimension_aliases",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("kind", sa.String(20), nullable=False),
+            sa.Column("alias", sa.String(255), nullable=False),
+            sa.Column("target_id", sa.Integer(), nullable=False),
+            sa.UniqueConstraint("kind", "alias"),
+        )
+
+    for owner in ("bottles", "catalog_products"):
+        columns = {column["name"] for column in inspector.get_columns(owner)}
+        with op.batch_alter_table(owner) as batch:
+            for column, target in KEY_COLUMNS:
+                if column in columns:
+                    continue
+                batch.add_column(sa.Column(column, sa.Integer(), nullable=True))
+                batch.create_foreign_key(f"fk_{owner}_{column}", target, [column], ["id"])
+                batch.create_index(f"ix_{owner}_{column}", [column])
+
+    backfill_keys(op.get_bind())
+
+
+def backfill_keys(bind) -> None:
+    """Key existing rows from their text columns, creating dimension rows as needed"""
+    metadata = sa.MetaData()
+    owners = [
+        sa.Table(owner, metadata, autoload_with=bind) for owner in ("bottles", "catalog_products")
+    ]
+    for kind, table in KIND_TABLES:
+        dimension = sa.Table(table, metadata, autoload_with=bind)
+        ids = dict(bind.execute(sa.select(dimension.c.key, dimension.c.id)).all())
+        text_column, key_column = DIMENSION_COLUMNS[kind]
+        for owner in owners:
+            unkeyed = sa.and_(owner.c[key_column].is_(None), owner.c[text_column].isnot(None))
+            values = bind.execute(sa.select(owner.c[text_column]).where(unkeyed).distinct())
+            for value in values.scalars().all():
+                key, name = canonical_dimension(kind, value)
+                if not key:
+                    continue
+                if key not in ids:
+                    inserted = bind.execute(dimension.insert().values(key=key, name=name))
+                    ids[key] = inserted.inserted_primary_key[0]
+                bind.execute(
+                    owner.update()
+                    .where(unkeyed, owner.c[text_column] == value)
+                    .values({key_column: ids[key]})
+                )
+
+
+def downgrade() -> None:
+    for owner in ("bottles", "catalog_products"):
+        with op.batch_alter_table(owner) as batch:
+            for column, _ in KEY_COLUMNS:
+                batch.drop_index(f"ix_{owner}_{column}")
+                batch.drop_constraint(f"fk_{owner}_{column}", type_="foreignkey")
+                batch.drop_column(column)
+    op.drop_table("dimension_aliases")
+    for table, _ in DIMENSION_TABLES:
+        op.drop_table(table)
@@ -0,0 +1,58 @@
+"""Add the tasting note full-text search index and backfill it
+
+Revision ID: 0003_note_search
+Revises: 0002_dimensions
+Create Date: 2026-10-19 00:00:00
+
+The backfill below indexes the same text fields as the app. For large
+tables, or to rebuild the index later, use
+``python -m app.services.note_search_service`` instead.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0003_note_search"
+down_revision = "0002_dimensions"
+branch_labels = None
+depends_on = None
+
+NOTE_TEXT_FIELDS = ("nose", "palate", "finish", "overall_notes")
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute(
+            "CREATE TABLE IF NOT EXISTS tasting_note_search ("
+            " tasting_note_id UUID PRIMARY KEY REFERENCES tasting_notes(id) ON DELETE CASCADE,"
+            " document TSVECTOR NOT NULL)"
+        )
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_tasting_note_search_document"
+            " ON tasting_note_search USING GIN (document)"
+        )
+        op.execute(
+            "INSERT INTO tasting_note_search (tasting_note_id, document)"
+            " SELECT id, to_tsvector('english', concat_ws(E'\\n', "
+            + ", ".join(f"NULLIF({field}, '')" for field in NOTE_TEXT_FIELDS)
+            + ")) FROM tasting_notes ON CONFLICT (tasting_note_id) DO NOTHING"
+        )
+    elif dialect == "sqlite":
+        op.execute("DROP TABLE IF EXISTS tasting_note_fts")
+        op.execute(
+            "CREATE VIRTUAL TABLE tasting_note_fts"
+            " USING fts5(note_id UNINDEXED, body, tokenize='porter unicode61')"
+        )
+        op.execute(
+            "INSERT INTO tasting_note_fts (note_id, body) SELECT id, "
+            + " || char(10) || ".join(f"coalesce({field}, '')" for field in NOTE_TEXT_FIELDS)
+            + " FROM tasting_notes"
+        )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP TABLE IF EXISTS tasting_note_search")
+    elif dialect == "sqlite":
+        op.execute("DROP TABLE IF EXISTS tasting_note_fts")
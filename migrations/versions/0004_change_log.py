@@ -0,0 +1,44 @@
+"""Add the change log backing delta sync
+
+Revision ID: 0004_change_log
+Revises: 0003_note_search
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers, used by Alembic.
+revision = "0004_change_log"
+down_revision = "0003_note_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("change_log"):
+        return
+    op.create_table(
+        "change_log",
+        sa.Column(
+            "id",
+            sa.BigInteger().with_variant(sa.Integer(), "sqlite"),
+            primary_key=True,
+            autoincrement=True,
+        ),
+        sa.Column("user_id", UUID(as_uuid=True), nullable=False),
+        sa.Column("entity", sa.String(20), nullable=False),
+        sa.Column("entity_id", UUID(as_uuid=True), nullable=False),
+        sa.Column("parent_id", UUID(as_uuid=True), nullable=True),
+        sa.Column("deleted", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_change_log_user_id_id", "change_log", ["user_id", "id"])
+    op.create_index("ix_change_log_created_at", "change_log", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_change_log_created_at", table_name="change_log")
+    op.drop_index("ix_change_log_user_id_id", table_name="change_log")
+    op.drop_table("change_log")
@@ -2,11 +2,22 @@
 
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 from app.main import app
 from app.database import Base
-from app.database.session import get_db
+from app.database.session import get_db, get_primary_read_db, get_read_db
+from app.models.user import User
+from app.services.note_search_service import create_note_search_index
+from app.utils.rate_limit import MemoryBackend, rate_limiter
+
+
+@compiles(UUID, "sqlite")
+def _sqlite_uuid(type_, compiler, **kw):
+    """Models use Postgres UUID columns; SQLite stores them as hex strings"""
+    return "CHAR(32)"
 
 
 # Test database URL
@@ -30,6 +41,31 @@ def db():
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture
+def session(tmp_path):
+    """Session on a fresh SQLite file with every table, for calling CRUD directly"""
+    crud_engine = create_engine(
+        f"sqlite:///{tmp_path / 'crud.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=crud_engine)
+    with crud_engine.begin() as connection:
+        create_note_search_index(connection)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=crud_engine)()
+    yield db
+    db.close()
+    crud_engine.dispose()
+
+
+@pytest.fixture
+def user(session):
+    """A user in the ``session`` database"""
+    db_user = User(username="collector", email="collector@example.com", password_hash="x")
+    session.add(db_user)
+    session.commit()
+    return db_user
+
+
 @pytest.fixture(scope="function")
 def client(db):
     """Create a test client with overridden database"""
@@ -38,6 +74,9 @@ def client(db):
         yield db
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_primary_read_db] = override_get_db
+    rate_limiter.backend = MemoryBackend()  # fresh buckets per test
     yield TestClient(app)
     app.dependency_overrides.clear()
 
@@ -0,0 +1,146 @@
+"""Admission control tests"""
+
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.utils.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    RouteClass,
+    admission,
+    classify,
+)
+from app.utils.rate_limit import MemoryBackend, rate_limiter
+
+CLASSES = {
+    "interactive": RouteClass(priority=0, max_concurrency=None, queue_timeout=1.0),
+    "bulk": RouteClass(priority=3, max_concurrency=1, queue_timeout=0.05),
+}
+
+
+def _controller(limit=1):
+    return AdmissionController(
+        initial_limit=limit, min_limit=1, max_limit=8, latency_target_ms=100, classes=CLASSES
+    )
+
+
+def test_routes_are_classified_by_method_and_path():
+    assert classify("POST", "/batch/bottles") == "bulk"
+    assert classify("GET", "/search/filter") == "search"
+    assert classify("GET", "/bottles/123") == "interactive"
+    assert classify("PUT", "/bottles/123") == "write"
+
+
+def test_freed_slots_go_to_the_highest_priority_waiter():
+    """Interactive waiters are admitted before bulk ones queued earlier"""
+    async def scenario():
+        controller = _controller(limit=1)
+        await controller.acquire("interactive", 0)
+        order = []
+
+        async def wait(name, priority):
+            await controller.acquire(name, priority)
+            order.append(name)
+
+        waiters = [
+            asyncio.ensure_future(wait("bulk", 3)),
+            asyncio.ensure_future(wait("interactive", 0)),
+        ]
+        await asyncio.sleep(0.01)
+        controller.release("interactive")
+        await asyncio.sleep(0.01)
+        assert order == ["interactive"]
+        controller.release("interactive")
+        await asyncio.gather(*waiters, return_exceptions=True)
+        return order, controller.stats()
+
+    order, stats = asyncio.run(scenario())
+    assert order[0] == "interactive"
+    assert stats["classes"]["interactive"]["queued"] == 1
+
+
+def test_queue_timeout_and_class_cap_reject():
+    """A capped class rejects once its queue timeout passes"""
+    async def scenario():
+        controller = _controller(limit=8)
+        await controller.acquire("bulk", 3)
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire("bulk", 3)
+        await controller.acquire("interactive", 0)  # other classes are unaffected
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["classes"]["bulk"]["rejected"] == 1
+    assert stats["in_flight"] == 2
+
+
+def test_cancelled_waiters_do_not_leak_slots():
+    """A waiter cancelled while queued, or just after being admitted, frees its slot"""
+    async def scenario():
+        controller = _controller(limit=1)
+        await controller.acquire("interactive", 0)
+        queued = asyncio.ensure_future(controller.acquire("interactive", 0))
+        await asyncio.sleep(0.01)
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+        controller.release("interactive")
+        assert controller.in_flight == 0
+
+        await controller.acquire("interactive", 0)
+        admitted = asyncio.ensure_future(controller.acquire("interactive", 0))
+        await asyncio.sleep(0.01)
+        admitted.cancel()
+        controller.release("interactive")  # hands the slot to the cancelled waiter
+        await asyncio.gather(admitted, return_exceptions=True)
+        assert admitted.cancelled()
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["in_flight"] == 0
+    assert stats["queued"] == 0
+
+
+def test_limit_grows_when_saturated_and_backs_off_on_slow_requests():
+    async def scenario():
+        controller = _controller(limit=2)
+        for _ in range(20):
+            await controller.acquire("interactive", 0)
+            await controller.acquire("interactive", 0)
+            controller.release("interactive", latency=0.01)
+            controller.release("interactive", latency=0.01)
+        grown = controller.limit
+        await controller.acquire("interactive", 0)
+        controller.release("interactive", latency=1.0)
+        return grown, controller.limit
+
+    grown, backed_off = asyncio.run(scenario())
+    assert grown > 2
+    assert backed_off == pytest.approx(grown * 0.9)
+
+
+def test_middleware_releases_the_slot_after_the_response(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "backend", MemoryBackend())
+    admitted = admission.metrics["interactive"]["admitted"]
+    assert TestClient(app).get("/").status_code == 200
+    assert admission.metrics["interactive"]["admitted"] == admitted + 1
+    assert admission.in_flight == 0
+
+
+def test_rejections_carry_cors_headers_and_preflights_skip_admission(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "backend", MemoryBackend())
+    origin = {"Origin": "http://localhost:3000"}
+
+    async def reject(name, priority):
+        raise AdmissionRejected(name)
+
+    monkeypatch.setattr(admission, "acquire", reject)
+    client = TestClient(app)
+    response = client.get("/bottles/", headers=origin)
+    assert response.status_code == 503
+    assert response.headers["access-control-allow-origin"] == "http://localhost:3000"
+
+    preflight = client.options(
+        "/bottles/", headers={**origin, "Access-Control-Request-Method": "POST"}
+    )
+    assert preflight.status_code == 200
@@ -0,0 +1,79 @@
+"""Batch CRUD tests against a real session"""
+
+import asyncio
+import json
+from uuid import uuid4
+from app.api.routes.batch import batch_get_bottles
+from app.crud.bottle import create_bottle, restore_bottles, soft_delete_bottle, soft_delete_bottles
+from app.crud.change_log import BOTTLE
+from app.crud.tasting_note import create_tasting_note, get_bottles_tasting_stats
+from app.crud.user_stats import load_user_stats
+from app.models.bottle import Bottle
+from app.models.change_log import ChangeLogEntry
+from app.models.user import User
+from app.schemas.batch import BatchIds
+from app.schemas.bottle import BottleCreate
+from app.schemas.tasting_note import TastingNoteCreate
+from app.services.stats_service import reconcile_users
+from app.utils.serialization import select_bottle_fields
+
+
+def _bottle(session, user, name="Batch Bottle", **fields):
+    return asyncio.run(create_bottle(
+        session, user.id, BottleCreate(name=name, spirit_type="whiskey", **fields)
+    ))
+
+
+def test_bottle_stats_leave_out_unknown_and_deleted_bottles(session, user):
+    """Only bottles that exist are reported; the route lists the rest as missing"""
+    rated, unrated, deleted = (_bottle(session, user, name) for name in ("Rated", "Unrated", "Gone"))
+    for rating in (4, 5):
+        asyncio.run(create_tasting_note(session, rated.id, user.id, TastingNoteCreate(rating=rating)))
+    asyncio.run(soft_delete_bottle(session, deleted.id, user.id))
+
+    stats = asyncio.run(get_bottles_tasting_stats(
+        session, [rated.id, unrated.id, deleted.id, uuid4()]
+    ))
+    assert set(stats) == {rated.id, unrated.id}
+    assert stats[rated.id]["average_rating"] == 4.5
+    assert stats[rated.id]["total_tasting_notes"] == 2
+    assert stats[unrated.id]["total_tasting_notes"] == 0
+
+
+def test_batch_get_bottles_keys_results_and_lists_missing_ids(session, user):
+    """Several bottles come back in one request, keyed by ID; unknown IDs are listed"""
+    bottle_ids = [_bottle(session, user, name).id for name in ("Batch One", "Batch Two")]
+    missing_id = uuid4()
+
+    response = asyncio.run(batch_get_bottles(
+        BatchIds(ids=bottle_ids + [missing_id]), session, user, select_bottle_fields(None)
+    ))
+    data = json.loads(response.body)
+    assert set(data["results"]) == {str(bottle_id) for bottle_id in bottle_ids}
+    assert data["results"][str(bottle_ids[0])]["name"] == "Batch One"
+    assert data["missing"] == [str(missing_id)]
+
+
+def test_batch_soft_delete_and_restore_touch_only_changing_bottles(session, user):
+    """Each call reports the bottles it changed; others' bottles and repeats are left alone"""
+    other = User(username="neighbour", email="neighbour@example.com", password_hash="x")
+    session.add(other)
+    session.commit()
+    first, second = _bottle(session, user, "First", rating=4), _bottle(session, user, "Second")
+    theirs = _bottle(session, other, "Theirs")
+
+    assert set(asyncio.run(soft_delete_bottles(
+        session, [first.id, second.id, theirs.id, uuid4()], user.id
+    ))) == {first.id, second.id}
+    assert asyncio.run(soft_delete_bottles(session, [first.id], user.id)) == []
+    assert session.query(Bottle.deleted_at).filter(Bottle.id == theirs.id).scalar() is None
+    assert load_user_stats(session, user.id)[0].bottle_count == 0
+
+    assert asyncio.run(restore_bottles(session, [first.id], user.id)) == [first.id]
+    assert asyncio.run(restore_bottles(session, [first.id], user.id)) == []
+    stats = load_user_stats(session, user.id)[0]
+    assert (stats.bottle_count, stats.rated_bottle_count, stats.bottle_rating_sum) == (1, 1, 4)
+    assert reconcile_users(session, [user.id, other.id], repair=False) == []
+    assert session.query(ChangeLogEntry).filter(
+        ChangeLogEntry.entity == BOTTLE, ChangeLogEntry.entity_id == first.id
+    ).count() == 3  # created, deleted, restored
@@ -0,0 +1,104 @@
+"""In-process cache tests"""
+
+import time
+from app.utils.cache import TTLCache, dashboard_cache
+
+
+def test_ttl_cache_expires_entries():
+    """Entries disappear after the TTL"""
+    cache = TTLCache(ttl=0.01)
+    cache.set("user", {"total_bottles": 3})
+    assert cache.get("user") == {"total_bottles": 3}
+    time.sleep(0.02)
+    assert cache.get("user") is None
+
+
+def test_ttl_cache_skips_stale_writes():
+    """A value computed before an invalidation is not stored"""
+    cache = TTLCache(ttl=60)
+    generation = cache.generation("user")
+    cache.invalidate("user")
+    cache.set("user", "stale", generation=generation)
+    assert cache.get("user") is None
+    cache.set("user", "fresh", generation=cache.generation("user"))
+    assert cache.get("user") == "fresh"
+
+
+def test_ttl_cache_generations_are_per_key():
+    """Invalidating one key doesn't discard values computed for others"""
+    cache = TTLCache(ttl=60)
+    generation = cache.generation("alice")
+    cache.invalidate("bob")
+    cache.set("alice", "fresh", generation=generation)
+    assert cache.get("alice") == "fresh"
+
+    generation = cache.generation("alice")
+    cache.clear()
+    cache.set("alice", "stale", generation=generation)
+    assert cache.get("alice") is None
+
+
+def test_ttl_cache_evicts_when_full():
+    """The cache never grows beyond maxsize"""
+    cache = TTLCache(ttl=60, maxsize=2)
+    for key in ["a", "b", "c"]:
+        cache.set(key, key)
+    assert len(cache) == 2
+    assert cache.get("c") == "c"
+
+
+def test_dashboard_aggregates_run_in_threads(session, user):
+    """The dashboard builds from plain sync aggregates and caches per user"""
+    import asyncio
+    from sqlalchemy.orm import sessionmaker
+    from app.crud.bottle import create_bottle
+    from app.schemas.bottle import BottleCreate
+    from app.services.dashboard_service import get_dashboard
+    from app.utils.cache import dashboard_cache
+
+    asyncio.run(create_bottle(session, user.id, BottleCreate(name="Dash", spirit_type="rum", rating=4)))
+    factory = sessionmaker(bind=session.get_bind())
+    summary = asyncio.run(get_dashboard(factory, factory, user.id))
+    assert summary["bottle_stats"]["total_bottles"] == 1
+    assert summary["tasting_stats"]["total_tasting_notes"] == 0
+    assert [bottle["name"] for bottle in summary["recent_bottles"]] == ["Dash"]
+    assert dashboard_cache.get(user.id) == summary
+
+
+def test_dashboard_reads_while_the_sqlite_writer_is_busy(tmp_path, monkeypatch):
+    """Aggregates use read sessions; only a missing counter row needs the writer"""
+    import asyncio
+    from sqlalchemy.orm import sessionmaker
+    from app.config import settings
+    from app.crud.bottle import create_bottle
+    from app.database import Base
+    from app.database.sqlite import create_sqlite_engines
+    from app.models.user import User
+    from app.models.user_stats import UserSpiritStats, UserStats
+    from app.schemas.bottle import BottleCreate
+    from app.services.dashboard_service import get_dashboard
+
+    monkeypatch.setattr(settings, "SQLITE_WRITE_QUEUE_TIMEOUT", 0.2)
+    writer, reader = create_sqlite_engines(f"sqlite:///{tmp_path / 'dash.db'}")
+    Base.metadata.create_all(writer)
+    write_factory, read_factory = sessionmaker(bind=writer), sessionmaker(bind=reader)
+    db = write_factory()
+    user = User(username="busy", email="busy@example.com", password_hash="x")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    asyncio.run(create_bottle(db, user_id, BottleCreate(name="Held", spirit_type="gin")))
+    db.close()
+
+    with writer.connect():  # the only writer connection is checked out
+        summary = asyncio.run(get_dashboard(read_factory, write_factory, user_id))
+    assert summary["bottle_stats"]["total_bottles"] == 1
+
+    with writer.begin() as connection:
+        connection.execute(UserSpiritStats.__table__.delete())
+        connection.execute(UserStats.__table__.delete())
+    dashboard_cache.clear()
+    summary = asyncio.run(get_dashboard(read_factory, write_factory, user_id))
+    assert summary["bottle_stats"]["total_bottles"] == 1
+    writer.dispose()
+    reader.dispose()
@@ -0,0 +1,25 @@
+"""Catalog product matching tests"""
+
+from app.models.bottle import SpiritType
+from app.utils.catalog import product_match_key
+
+
+def test_match_key_collapses_spelling_variants():
+    """Case, punctuation and age-statement spellings match the same product"""
+    assert product_match_key("Eagle Rare 10-Year", "Buffalo Trace", SpiritType.WHISKEY) == (
+        product_match_key("eagle rare 10 yr old", "BUFFALO TRACE Distillery", "whiskey")
+    )
+
+
+def test_match_key_strips_leading_distillery_name():
+    """A bottle name repeating its distillery matches the bare product name"""
+    assert product_match_key("Ardbeg Uigeadail", "Ardbeg", SpiritType.WHISKEY) == (
+        product_match_key("Uigeadail", "Ardbeg", SpiritType.WHISKEY)
+    )
+
+
+def test_match_key_separates_spirit_types_and_distilleries():
+    """Same name from a different distillery or spirit type is a different product"""
+    key = product_match_key("Reserve", "Woodford", SpiritType.WHISKEY)
+    assert key != product_match_key("Reserve", "Maker's Mark", SpiritType.WHISKEY)
+    assert key != product_match_key("Reserve", "Woodford", SpiritType.GIN)
@@ -0,0 +1,32 @@
+"""Flavor descriptor extraction tests"""
+
+from uuid import uuid4
+from app.models.tasting_note import TastingNote
+from app.utils.descriptors import DescriptorMatcher, build_note_descriptors
+
+
+def test_matcher_respects_word_boundaries():
+    """Descriptors inside longer words are not counted"""
+    matcher = DescriptorMatcher(["sweet", "dry"])
+    assert matcher.extract("Unsweetened, bone-dry finish") == {"dry": 1}
+    assert matcher.extract("Sweet, then SWEET again", None) == {"sweet": 2}
+
+
+def test_matcher_prefers_longest_descriptor():
+    """Multi-word descriptors win over their shorter prefixes"""
+    matcher = DescriptorMatcher(["dark", "dark chocolate"])
+    assert matcher.extract("Dark chocolate and dark fruit") == {"dark chocolate": 1, "dark": 1}
+
+
+def test_build_note_descriptors_scans_note_fields():
+    """Nose, palate and finish are scanned; overall notes are not"""
+    note = TastingNote(
+        user_id=uuid4(),
+        bottle_id=uuid4(),
+        nose="Vanilla and caramel",
+        palate="Spicy, vanilla",
+        finish=None,
+        overall_notes="smoky",
+    )
+    descriptors = {d.descriptor: d.count for d in build_note_descriptors(note)}
+    assert descriptors == {"vanilla": 2, "caramel": 1, "spicy": 1}
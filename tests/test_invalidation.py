@@ -0,0 +1,98 @@
+"""Cache invalidation bus tests"""
+
+import time
+from uuid import uuid4
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.crud import dimension
+from app.utils.invalidation import (
+    BOTTLE_CHANGED,
+    DIMENSION_CHANGED,
+    NOTE_CHANGED,
+    WORKER_ID,
+    Event,
+    InvalidationBus,
+    create_invalidation_table,
+    invalidation_bus,
+    invalidation_log,
+    publish,
+)
+
+
+def _engine(tmp_path, bus):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bus.db'}")
+    with engine.begin() as connection:
+        create_invalidation_table(connection, bus)
+    return engine
+
+
+def test_events_dispatch_on_commit_only(tmp_path, monkeypatch):
+    """Subscribers see committed writes; rolled-back ones are dropped"""
+    seen = []
+    monkeypatch.setitem(invalidation_bus._handlers, NOTE_CHANGED, [seen.append])
+    monkeypatch.setattr(invalidation_bus, "log_urls", set())
+    db = sessionmaker(bind=_engine(tmp_path, invalidation_bus))()
+    user_id = uuid4()
+
+    publish(db, NOTE_CHANGED, "created", user_id=user_id, note_id="n1")
+    assert seen == []
+    db.commit()
+    assert [(event.action, event.user_id, event.data) for event in seen] == [
+        ("created", user_id, {"note_id": "n1"})
+    ]
+
+    publish(db, NOTE_CHANGED, "deleted", user_id=user_id)
+    db.rollback()
+    db.commit()
+    assert len(seen) == 1
+    # The committed event was also written for the other workers
+    assert db.execute(select(func.count()).select_from(invalidation_log)).scalar() == 1
+    db.close()
+
+
+def test_other_workers_events_are_polled(tmp_path, monkeypatch):
+    """A worker dispatches events another worker logged, but not its own"""
+    monkeypatch.setattr(settings, "INVALIDATION_POLL_INTERVAL", 0.01)
+    bus = InvalidationBus()
+    engine = _engine(tmp_path, bus)
+    seen = []
+    bus.subscribe([BOTTLE_CHANGED], seen.append)
+    bus.start(engine)
+    try:
+        # Logged before the first poll, but after start
+        bottle_id = uuid4()
+        with engine.begin() as connection:
+            for origin in ("other-worker", WORKER_ID):
+                connection.execute(invalidation_log.insert().values(
+                    origin=origin,
+                    payload=Event(BOTTLE_CHANGED, "updated", bottle_id=bottle_id, origin=origin).to_json(),
+                ))
+        deadline = time.monotonic() + 2
+        while not seen and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        bus.stop()
+    assert [(event.bottle_id, event.origin) for event in seen] == [(bottle_id, "other-worker")]
+
+
+def test_resync_runs_every_callback():
+    bus = InvalidationBus()
+    calls = []
+    bus.subscribe([BOTTLE_CHANGED], lambda event: None, resync=lambda: calls.append("a"))
+    bus.subscribe([NOTE_CHANGED], lambda event: None, resync=lambda: calls.append("b"))
+    bus.resync()
+    assert calls == ["a", "b"]
+
+
+def test_alias_changes_from_another_worker_drop_resolved_dimensions(monkeypatch):
+    """A worker forgets a cached spelling once any worker repoints it with an alias"""
+    monkeypatch.setattr(dimension, "_resolved", {("country", "estados unidos"): 7})
+    monkeypatch.setitem(
+        invalidation_bus._handlers, DIMENSION_CHANGED, [dimension._forget_alias]
+    )
+    invalidation_bus.receive(Event(
+        DIMENSION_CHANGED, "alias_added", data={"kind": "country", "alias": "estados unidos"},
+        origin="other-worker",
+    ).to_json())
+    assert dimension._resolved == {}
@@ -0,0 +1,132 @@
+"""Live event stream tests"""
+
+import asyncio
+from uuid import uuid4
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from app.api.routes.events import create_stream_token
+from app.config import settings
+from app.dependencies import get_current_user, get_event_stream_user
+from app.utils.invalidation import BOTTLE_CHANGED, NOTE_CHANGED, Event
+from app.utils.live_events import EventHub, EventStreamResponse
+from app.utils.security import create_access_token
+
+
+class Client:
+    """Drives an EventStreamResponse like an ASGI server would"""
+
+    def __init__(self, hub, user_id, last_event_id=None):
+        self.body = b""
+        self.received = asyncio.Event()
+        self._disconnect = asyncio.Event()
+        response = EventStreamResponse(hub, user_id, last_event_id)
+        self.task = asyncio.ensure_future(response({"type": "http"}, self._receive, self._send))
+
+    async def _receive(self):
+        await self._disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def _send(self, message):
+        if message["type"] == "http.response.body":
+            self.body += message["body"]
+            self.received.set()
+
+    async def next(self):
+        await asyncio.wait_for(self.received.wait(), 1)
+        self.received.clear()
+        body, self.body = self.body, b""
+        return body
+
+    async def close(self):
+        self._disconnect.set()
+        await asyncio.wait_for(self.task, 1)
+
+
+def _event(user_id, event_type=BOTTLE_CHANGED, action="created", **data):
+    return Event(event_type, action, user_id=user_id, bottle_id=uuid4(), data=data)
+
+
+def test_events_reach_only_their_users_streams():
+    async def run():
+        hub = EventHub(buffer_size=10, max_idle_channels=10)
+        hub.start(asyncio.get_running_loop())
+        alice, bob = uuid4(), uuid4()
+        client = Client(hub, alice)
+        assert (await client.next()).startswith(b"retry:")
+
+        hub.on_event(_event(bob))
+        hub.on_event(_event(alice, NOTE_CHANGED, note_id="n1", old_terms={"name": "x"}))
+        body = await client.next()
+        assert body.count(b"event:") == 1
+        assert b"event: note.created" in body and b'"note_id": "n1"' in body
+        assert b"old_terms" not in body
+        await client.close()
+        assert hub.stats() == {"connections": 0, "channels": 1}
+
+    asyncio.run(run())
+
+
+def test_idle_streams_get_heartbeats(monkeypatch):
+    monkeypatch.setattr(settings, "SSE_HEARTBEAT_SECONDS", 0.01)
+
+    async def run():
+        hub = EventHub(buffer_size=10, max_idle_channels=10)
+        client = Client(hub, uuid4())
+        await client.next()
+        assert await client.next() == b": heartbeat\n\n"
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_resume_replays_buffered_events_or_asks_for_resync():
+    async def run():
+        hub = EventHub(buffer_size=2, max_idle_channels=10)
+        hub.start(asyncio.get_running_loop())
+        user_id = uuid4()
+        client = Client(hub, user_id)
+        await client.next()
+        hub.on_event(_event(user_id))
+        first = await client.next()
+        last_id = first.split(b"\n")[0].split(b": ")[1].decode()
+        await client.close()
+
+        # Events while disconnected stay buffered for the user
+        hub.on_event(_event(user_id, action="updated"))
+        resumed = Client(hub, user_id, last_event_id=last_id)
+        body = await resumed.next()
+        assert b"event: bottle.updated" in body and b"resync" not in body
+        await resumed.close()
+
+        for action in ("updated", "deleted", "researched"):
+            hub.on_event(_event(user_id, action=action))
+        await asyncio.sleep(0)
+        too_old = Client(hub, user_id, last_event_id=last_id)
+        assert b"event: resync" in await too_old.next()
+        await too_old.close()
+
+        elsewhere = Client(hub, user_id, last_event_id="otherboot-5")
+        assert b"event: resync" in await elsewhere.next()
+        await elsewhere.close()
+
+    asyncio.run(run())
+
+
+def test_stream_accepts_only_scoped_tokens_in_the_url(session, user):
+    """EventSource clients pass a short-lived events token; it is no good elsewhere"""
+    stream_token = asyncio.run(create_stream_token(user))["access_token"]
+    streamed = asyncio.run(get_event_stream_user(stream_token, None, session))
+    assert streamed.id == user.id
+
+    full_token = create_access_token({"sub": str(user.id)})
+    bearer = HTTPAuthorizationCredentials(scheme="Bearer", credentials=full_token)
+    assert asyncio.run(get_event_stream_user(None, bearer, session)).id == user.id
+    with pytest.raises(HTTPException) as url_token:
+        asyncio.run(get_event_stream_user(full_token, None, session))
+    assert url_token.value.status_code == 401
+
+    scoped = HTTPAuthorizationCredentials(scheme="Bearer", credentials=stream_token)
+    with pytest.raises(HTTPException) as other_routes:
+        asyncio.run(get_current_user(scoped, session))
+    assert other_routes.value.status_code == 401
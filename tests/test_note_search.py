@@ -0,0 +1,63 @@
+"""Tasting note full-text search tests"""
+
+import asyncio
+from types import SimpleNamespace
+from uuid import uuid4
+import pytest
+from app.crud.bottle import create_bottle
+from app.crud.tasting_note import create_tasting_note, delete_tasting_note
+from app.models.user import User
+from app.schemas.bottle import BottleCreate
+from app.schemas.tasting_note import TastingNoteCreate
+from app.services.note_search_service import (
+    _fts5_query,
+    decode_cursor,
+    encode_cursor,
+    note_document,
+    search_tasting_notes,
+)
+
+
+def test_cursor_round_trip():
+    """Cursors carry the exact score and note ID of the last result"""
+    note_id = uuid4()
+    assert decode_cursor(encode_cursor(0.1 + 0.2, note_id)) == (0.1 + 0.2, note_id)
+
+
+def test_malformed_cursor_is_rejected():
+    """Garbage cursors raise ValueError for the route to turn into a 400"""
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_user_input_cannot_use_fts5_syntax():
+    """Operators and quotes are reduced to quoted words"""
+    assert _fts5_query('peat" OR smoke*') == '"peat" "OR" "smoke"'
+    assert _fts5_query("***") == ""
+
+
+def test_document_joins_note_text_fields():
+    """Empty fields are skipped"""
+    note = SimpleNamespace(nose="vanilla", palate=None, finish="long", overall_notes="")
+    assert note_document(note) == "vanilla\nlong"
+
+
+def test_search_entries_follow_note_ids_across_vacuum(session, user):
+    """Rowid renumbering cannot attach one user's text to another user's note"""
+    other = User(username="neighbour", email="neighbour@example.com", password_hash="x")
+    session.add(other)
+    session.commit()
+    bottle = asyncio.run(create_bottle(session, user.id, BottleCreate(name="Islay", spirit_type="whiskey")))
+    theirs = asyncio.run(create_bottle(session, other.id, BottleCreate(name="Speyside", spirit_type="whiskey")))
+    first = asyncio.run(create_tasting_note(session, bottle.id, user.id, TastingNoteCreate(nose="brine")))
+    asyncio.run(create_tasting_note(session, bottle.id, user.id, TastingNoteCreate(nose="peat smoke")))
+    asyncio.run(create_tasting_note(session, theirs.id, other.id, TastingNoteCreate(nose="honey")))
+    asyncio.run(delete_tasting_note(session, first.id, user.id))
+    session.commit()
+    with session.get_bind().connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql("VACUUM")
+
+    mine = asyncio.run(search_tasting_notes(session, user.id, "smoke"))
+    assert [note["nose"] for note in mine["results"]] == ["peat smoke"]
+    assert asyncio.run(search_tasting_notes(session, other.id, "smoke"))["results"] == []
+    assert asyncio.run(search_tasting_notes(session, user.id, "brine"))["results"] == []
@@ -0,0 +1,45 @@
+"""Connection pool instrumentation tests"""
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.orm import sessionmaker
+from app.database.pool import InstrumentedQueuePool, instrument_engine, pool_stats
+
+
+def _engine(tmp_path):
+    return instrument_engine(create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    ), "test")
+
+
+def test_sessions_check_out_on_first_query(tmp_path):
+    """Opening a session costs nothing until it runs a statement"""
+    engine = _engine(tmp_path)
+    db = sessionmaker(bind=engine)()
+    assert pool_stats(engine)["checkouts"] == 0
+
+    db.execute(text("SELECT 1"))
+    stats = pool_stats(engine)
+    assert stats["checkouts"] == 1
+    assert stats["checked_out"] == 1
+    assert sum(stats["checkout_wait_ms"]["histogram"].values()) == 1
+    assert stats["connection_age_seconds"]["max"] is not None
+    db.close()
+    assert pool_stats(engine)["checked_out"] == 0
+
+
+def test_checkout_gives_up_after_the_wait_budget(tmp_path):
+    """An exhausted pool raises TimeoutError instead of queueing forever"""
+    engine = _engine(tmp_path)
+    held = engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    assert pool_stats(engine)["timeouts"] == 1
+
+    held.invalidate()
+    held.close()
+    assert pool_stats(engine)["invalidations"] == 1
@@ -0,0 +1,86 @@
+"""Statement timeout and slow-query log tests"""
+
+import time
+import pytest
+from sqlalchemy import create_engine, exc, text
+from app.config import settings
+from app.database import query_guard
+from app.database.query_guard import (
+    explainable,
+    install_query_guard,
+    is_statement_timeout,
+    param_shapes,
+    public_slow_queries,
+    route_context,
+    slow_queries,
+    statement_timeout_for,
+)
+from app.utils.cache import TTLCache
+
+# Counts far enough that SQLite spends seconds on it
+SLOW_QUERY = text(
+    "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 100000000)"
+    " SELECT count(*) FROM n"
+)
+
+
+def _engine(tmp_path):
+    return install_query_guard(create_engine(f"sqlite:///{tmp_path / 'guard.db'}"))
+
+
+def test_route_budgets():
+    """Path overrides win over the route class budget"""
+    assert statement_timeout_for("/search/distillery/Ardbeg", "interactive") == 8000
+    assert statement_timeout_for("/bottles/", "interactive") == 3000
+    assert statement_timeout_for("/batch/bottles/delete", "bulk") == 15000
+    assert statement_timeout_for("/anything", "unknown") == settings.STATEMENT_TIMEOUT_MS
+
+
+def test_param_shapes_hide_values():
+    assert param_shapes({"name": "Ardbeg", "ids": [1, 2, 3], "limit": 10}) == {
+        "name": "str(6)", "ids": "list[3]", "limit": "int",
+    }
+    assert param_shapes(("abc", None)) == ["str(3)", "NoneType"]
+    assert param_shapes([{"a": 1}, {"a": 2}]) == "executemany[2]"
+
+
+def test_locking_reads_are_not_explained():
+    """EXPLAIN ANALYZE would take the row locks again"""
+    assert explainable("SELECT id FROM bottles WHERE user_id = %(user_id)s")
+    assert not explainable("SELECT id FROM bottles ORDER BY id LIMIT 10 FOR UPDATE SKIP LOCKED")
+    assert not explainable("select id from bottles for no key update")
+    assert not explainable("SELECT id FROM bottles FOR SHARE")
+    assert not explainable("UPDATE bottles SET name = 'x'")
+
+
+def test_sqlite_statement_is_interrupted_past_its_budget(tmp_path):
+    engine = _engine(tmp_path)
+    started = time.monotonic()
+    with route_context("/bottles/", 50), engine.connect() as connection:
+        with pytest.raises(exc.OperationalError) as raised:
+            connection.execute(SLOW_QUERY)
+    assert time.monotonic() - started < 2
+    assert is_statement_timeout(raised.value)
+
+    # Outside a route the same connection runs without a deadline
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_slow_statements_are_logged_with_route(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 0)
+    monkeypatch.setattr(settings, "SLOW_QUERY_EXPLAIN_MS", 0)
+    monkeypatch.setattr(query_guard, "_explained", TTLCache(ttl=60))
+    engine = _engine(tmp_path)
+    slow_queries.clear()
+
+    with route_context("/search/filter", None), engine.connect() as connection:
+        connection.execute(text("SELECT :name AS name"), {"name": "Lagavulin"})
+
+    entry = slow_queries[-1]
+    assert entry["route"] == "/search/filter"
+    assert entry["params"] == ["str(9)"]  # sqlite binds positionally
+    assert "Lagavulin" not in str(entry)
+    query_guard._explain_executor.submit(lambda: None).result()
+    assert "plan" in entry
+    assert "plan" not in public_slow_queries(1)[0]
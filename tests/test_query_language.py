@@ -0,0 +1,59 @@
+"""Structured search query parser tests"""
+
+import asyncio
+import pytest
+from app.crud import dimension
+from app.crud.bottle import create_bottle
+from app.crud.dimension import add_dimension_alias
+from app.schemas.bottle import BottleCreate
+from app.services.search_service import (
+    QuerySyntaxError,
+    _numeric_condition,
+    compile_query,
+    parse_query,
+    query_bottles,
+)
+from app.utils.cache import query_plan_cache
+
+
+def test_parse_fields_quotes_and_negation():
+    """Quoted values keep spaces, fields are lowercased and - negates"""
+    assert parse_query('Distillery:"Buffalo Trace" proof:>100 -country:USA eagle') == [
+        (False, "distillery", "Buffalo Trace"),
+        (False, "proof", ">100"),
+        (True, "country", "USA"),
+        (False, None, "eagle"),
+    ]
+
+
+@pytest.mark.parametrize("query", ['colour:red', 'name:"unterminated', 'distillery:""'])
+def test_parse_rejects_invalid_queries(query):
+    """Unknown fields, unterminated quotes and empty values are errors"""
+    with pytest.raises(QuerySyntaxError):
+        parse_query(query)
+
+
+def test_numeric_comparisons_and_ranges():
+    """Numeric fields accept comparisons and a..b ranges"""
+    assert str(_numeric_condition("proof", ">=100")) == "bottles.proof >= :proof_1"
+    assert "BETWEEN" in str(_numeric_condition("rating", "3..5"))
+    with pytest.raises(QuerySyntaxError):
+        _numeric_condition("price", "cheap")
+
+
+def test_cached_plans_follow_alias_changes(session, user, monkeypatch):
+    """Adding an alias drops cached plans; prefix matches are resolved per query"""
+    monkeypatch.setattr(dimension, "_resolved", {})
+    query_plan_cache.clear()
+    asyncio.run(create_bottle(
+        session, user.id, BottleCreate(name="Blanco", spirit_type="tequila", country="Mexico")
+    ))
+    assert asyncio.run(query_bottles(session, "country:Méjico"))[1] == 0
+
+    asyncio.run(add_dimension_alias(session, "country", "Méjico", "Mexico"))
+    session.commit()
+    assert asyncio.run(query_bottles(session, "country:Méjico"))[1] == 1
+
+    plan = asyncio.run(compile_query(session, "country:mex*"))
+    assert "SELECT countries.id" in str(plan.conditions[-1])
+    assert asyncio.run(query_bottles(session, "country:mex*"))[1] == 1
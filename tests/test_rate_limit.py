@@ -0,0 +1,81 @@
+"""Token-bucket rate limiting tests"""
+
+import time
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from app.main import app
+from app.utils.rate_limit import (
+    BucketPolicy,
+    MemoryBackend,
+    RateLimiter,
+    client_identity,
+    rate_limiter,
+)
+from app.utils.security import create_access_token
+
+
+def _limiter(rate=1000.0):
+    return RateLimiter(
+        MemoryBackend(),
+        user_policy=BucketPolicy(rate=rate, capacity=10),
+        anonymous_policy=BucketPolicy(rate=rate, capacity=2),
+    )
+
+
+def test_bucket_allows_a_burst_then_rejects_with_retry_after():
+    limiter = _limiter(rate=1.0)
+    assert all(limiter.check("user:a", True, 5).allowed for _ in range(2))
+    decision = limiter.check("user:a", True, 5)
+    assert not decision.allowed
+    assert 0 < decision.retry_after <= 5
+    assert limiter.rejected == 1
+    assert limiter.check("user:b", True, 5).allowed  # buckets are per client
+
+
+def test_bucket_refills_over_time():
+    limiter = _limiter(rate=1000.0)
+    assert limiter.check("ip:1.2.3.4", False, 2).allowed
+    assert not limiter.check("ip:1.2.3.4", False, 2).allowed
+    time.sleep(0.01)
+    assert limiter.check("ip:1.2.3.4", False, 2).allowed
+
+
+def test_clients_are_keyed_by_token_subject_or_address():
+    user_id = str(uuid4())
+    token = create_access_token({"sub": user_id})
+    assert client_identity(f"Bearer {token}", "1.2.3.4") == (f"user:{user_id}", True)
+    assert client_identity("Bearer not-a-jwt", "1.2.3.4") == ("ip:1.2.3.4", False)
+    assert client_identity(None, None) == ("ip:unknown", False)
+
+
+def test_memory_backend_is_bounded():
+    backend = MemoryBackend(max_keys=2)
+    policy = BucketPolicy(rate=1, capacity=1)
+    for key in ("a", "b", "c"):
+        backend.take(key, 1, policy)
+    assert list(backend._buckets) == ["b", "c"]
+
+
+def test_middleware_rejects_once_the_bucket_is_empty(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "backend", MemoryBackend())
+    monkeypatch.setattr(rate_limiter, "anonymous_policy", BucketPolicy(rate=0.001, capacity=1))
+    client = TestClient(app)
+    assert client.get("/").status_code == 200
+    response = client.get("/")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert client.get("/health").status_code == 200  # unlimited paths skip the buckets
+
+
+def test_preflights_are_free_and_rejections_carry_cors_headers(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "backend", MemoryBackend())
+    monkeypatch.setattr(rate_limiter, "anonymous_policy", BucketPolicy(rate=0.001, capacity=1))
+    client = TestClient(app)
+    origin = {"Origin": "http://localhost:3000"}
+    for _ in range(3):
+        preflight = client.options("/", headers={**origin, "Access-Control-Request-Method": "GET"})
+        assert preflight.status_code == 200
+    assert client.get("/", headers=origin).status_code == 200
+    response = client.get("/", headers=origin)
+    assert response.status_code == 429
+    assert response.headers["access-control-allow-origin"] == "http://localhost:3000"
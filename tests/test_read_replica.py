@@ -0,0 +1,66 @@
+"""Read-replica routing tests, using two SQLite files as primary and replica"""
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+from app.database import session as database_session
+from app.database.replica import ReadReplica
+
+
+def _database(path, marker):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE marker (name TEXT)"))
+        connection.execute(text("INSERT INTO marker VALUES (:name)"), {"name": marker})
+    return engine
+
+
+def _replica(engine, lag=0.0):
+    return ReadReplica(
+        engine, max_lag=5, check_interval=60, sticky_seconds=10, lag_probe=lambda connection: lag
+    )
+
+
+def _read_marker(monkeypatch, primary, replica, authorization="Bearer a"):
+    monkeypatch.setattr(database_session, "ReadSessionLocal", sessionmaker(bind=primary))
+    monkeypatch.setattr(database_session, "read_replica", replica)
+    request = Request({
+        "type": "http",
+        "headers": [(b"authorization", authorization.encode())],
+        "client": ("127.0.0.1", 1234),
+    })
+    dependency = database_session.get_read_db(request)
+    db = next(dependency)
+    try:
+        return db.execute(text("SELECT name FROM marker")).scalar()
+    finally:
+        dependency.close()
+
+
+def test_reads_go_to_a_healthy_replica(tmp_path, monkeypatch):
+    primary = _database(tmp_path / "primary.db", "primary")
+    replica = _replica(_database(tmp_path / "replica.db", "replica"))
+    assert _read_marker(monkeypatch, primary, replica) == "replica"
+
+
+def test_unavailable_or_lagging_replica_falls_back_to_primary(tmp_path, monkeypatch):
+    primary = _database(tmp_path / "primary.db", "primary")
+    missing = _replica(create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"))
+    assert _read_marker(monkeypatch, primary, missing) == "primary"
+    assert not missing.healthy
+
+    lagging = _replica(_database(tmp_path / "replica.db", "replica"), lag=30)
+    assert _read_marker(monkeypatch, primary, lagging) == "primary"
+    assert lagging.status()["lag_seconds"] == 30
+
+    unknown = _replica(_database(tmp_path / "unknown.db", "replica"), lag=None)
+    assert _read_marker(monkeypatch, primary, unknown) == "primary"
+    assert not unknown.healthy
+
+
+def test_clients_that_just_wrote_read_from_primary(tmp_path, monkeypatch):
+    primary = _database(tmp_path / "primary.db", "primary")
+    replica = _replica(_database(tmp_path / "replica.db", "replica"))
+    replica.note_write("Bearer a")
+    assert _read_marker(monkeypatch, primary, replica, "Bearer a") == "primary"
+    assert _read_marker(monkeypatch, primary, replica, "Bearer b") == "replica"
@@ -0,0 +1,67 @@
+"""Collaborative-filtering recommender tests"""
+
+from uuid import uuid4
+import numpy as np
+from app.services.recommender import load_model, save_model, train_from_ratings
+
+
+def _publish(tmp_path, triples, n_users, n_items):
+    user_rows, item_cols, ratings = (np.array(column) for column in zip(*triples))
+    arrays = train_from_ratings(user_rows, item_cols, ratings, n_users, n_items, neighbors=5)
+    user_ids = [str(uuid4()) for _ in range(n_users)]
+    items = [{"product_id": str(uuid4()), "name": f"Item {i}"} for i in range(n_items)]
+    save_model(arrays, user_ids, items, str(tmp_path))
+    return load_model(str(tmp_path)), user_ids
+
+
+def test_recommend_prefers_items_liked_by_similar_users(tmp_path):
+    """Items co-rated highly with the user's favourites rank first and seen items are excluded"""
+    triples = [
+        (0, 0, 5), (0, 1, 5), (0, 2, 1),
+        (1, 0, 5), (1, 1, 4), (1, 2, 1), (1, 3, 1),
+        (2, 0, 1), (2, 2, 5), (2, 3, 5),
+        (3, 0, 5), (3, 2, 1),
+    ]
+    model, user_ids = _publish(tmp_path, triples, 4, 4)
+    results = model.recommend(user_ids[3], limit=2)
+    assert [r["name"] for r in results] == ["Item 1", "Item 3"]
+
+
+def test_cold_start_user_gets_popular_items(tmp_path):
+    """Unknown users fall back to the popularity ranking"""
+    triples = [(0, 0, 5), (1, 0, 5), (2, 0, 4), (0, 1, 2)]
+    model, _ = _publish(tmp_path, triples, 3, 2)
+    results = model.recommend(uuid4(), limit=5)
+    assert [r["name"] for r in results] == ["Item 0", "Item 1"]
+    assert all(r["score"] is None for r in results)
+
+
+def test_repeated_ratings_are_averaged(tmp_path):
+    """Two ratings of one item by one user count as their mean, not their sum"""
+    triples = [(0, 0, 4), (0, 0, 5), (0, 1, 1), (1, 0, 5)]
+    user_rows, item_cols, ratings = (np.array(column) for column in zip(*triples))
+    arrays = train_from_ratings(user_rows, item_cols, ratings, 2, 2, neighbors=5)
+    expected = train_from_ratings(
+        np.array([0, 0, 1]), np.array([0, 1, 0]), np.array([4.5, 1, 5]), 2, 2, neighbors=5
+    )
+    assert all(np.allclose(array, want) for array, want in zip(arrays, expected))
+
+
+def test_training_data_pools_ratings_per_product(session, user):
+    """Notes on several bottles of one product become a single averaged cell"""
+    import asyncio
+    from app.crud.bottle import create_bottle
+    from app.crud.tasting_note import create_tasting_note
+    from app.schemas.bottle import BottleCreate
+    from app.schemas.tasting_note import TastingNoteCreate
+    from app.services.recommender import build_training_data
+
+    for rating in (4, 5):
+        bottle = asyncio.run(create_bottle(
+            session, user.id, BottleCreate(name="Eagle Rare", distillery="Buffalo Trace", spirit_type="whiskey")
+        ))
+        asyncio.run(create_tasting_note(session, bottle.id, user.id, TastingNoteCreate(rating=rating)))
+
+    user_rows, item_cols, ratings, user_ids, items = asyncio.run(build_training_data(session))
+    assert list(ratings) == [4.5]
+    assert user_ids == [str(user.id)] and [item["name"] for item in items] == ["Eagle Rare"]
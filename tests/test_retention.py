@@ -0,0 +1,103 @@
+"""Retention purge tests against a real session"""
+
+import asyncio
+import io
+import json
+import sys
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+from app import database
+from app.crud.bottle import create_bottle, soft_delete_bottle
+from app.crud.change_log import MEMBERSHIP, NOTE
+from app.crud.collection import add_bottle_to_collection, create_collection
+from app.crud.tasting_note import create_tasting_note
+from app.crud.user_stats import load_user_stats
+from app.models.bottle import Bottle
+from app.models.change_log import ChangeLogEntry
+from app.models.collection import collection_bottles
+from app.models.tasting_note import TastingNote
+from app.models.tasting_note_descriptor import TastingNoteDescriptor
+from app.schemas.bottle import BottleCreate
+from app.schemas.collection import CollectionCreate
+from app.schemas.tasting_note import TastingNoteCreate
+from app.services import retention_service
+from app.services.stats_service import reconcile_users
+
+
+def _shelf(session, user):
+    """One bottle deleted long ago, one deleted recently and one live, all noted and collected"""
+    collection = asyncio.run(create_collection(session, user.id, CollectionCreate(name="Shelf")))
+    bottles = {}
+    for name in ("expired", "recent", "live"):
+        bottle = asyncio.run(create_bottle(session, user.id, BottleCreate(name=name, spirit_type="whiskey")))
+        for rating in (3, 5):
+            asyncio.run(create_tasting_note(
+                session, bottle.id, user.id, TastingNoteCreate(nose="vanilla and oak", rating=rating)
+            ))
+        session.commit()
+        asyncio.run(add_bottle_to_collection(session, collection.id, bottle.id, user.id))
+        bottles[name] = bottle.id
+    for name in ("expired", "recent"):
+        asyncio.run(soft_delete_bottle(session, bottles[name], user.id))
+    session.query(Bottle).filter(Bottle.id == bottles["expired"]).update(
+        {"deleted_at": datetime.utcnow() - timedelta(days=60)}
+    )
+    session.commit()
+    return collection.id, bottles
+
+
+def test_purge_removes_expired_bottles_and_everything_attached(session, user):
+    collection_id, bottles = _shelf(session, user)
+    expired = bottles["expired"]
+    note_ids = [row.id for row in session.query(TastingNote.id).filter(TastingNote.bottle_id == expired)]
+    assert session.query(TastingNoteDescriptor).filter(TastingNoteDescriptor.bottle_id == expired).count()
+    assert load_user_stats(session, user.id)[0].note_count == 6
+
+    archive = io.StringIO()
+    removed = asyncio.run(retention_service.purge_deleted_bottles(session, days=30, batch_size=1, archive=archive))
+    assert removed == {"bottles": 1, "tasting_notes": 2, "memberships": 1}
+
+    assert session.query(Bottle.id).order_by(Bottle.name).all() == [(bottles["live"],), (bottles["recent"],)]
+    assert session.query(TastingNote).filter(TastingNote.bottle_id == expired).count() == 0
+    assert session.query(TastingNoteDescriptor).filter(TastingNoteDescriptor.bottle_id == expired).count() == 0
+    assert session.execute(text("SELECT count(*) FROM tasting_note_fts")).scalar() == 4
+    assert session.query(collection_bottles).filter(collection_bottles.c.bottle_id == expired).count() == 0
+
+    assert load_user_stats(session, user.id)[0].note_count == 4
+    assert reconcile_users(session, [user.id], repair=False) == []
+
+    tombstones = session.query(ChangeLogEntry).filter(ChangeLogEntry.deleted == True).all()
+    assert {entry.entity_id for entry in tombstones if entry.entity == NOTE} == set(note_ids)
+    assert [(entry.entity_id, entry.parent_id) for entry in tombstones if entry.entity == MEMBERSHIP] == [
+        (expired, collection_id)
+    ]
+
+    (line,) = archive.getvalue().splitlines()
+    record = json.loads(line)
+    assert record["bottle"]["id"] == str(expired)
+    assert sorted(note["id"] for note in record["tasting_notes"]) == sorted(map(str, note_ids))
+    assert record["collection_ids"] == [str(collection_id)]
+
+
+def test_cli_dry_run_counts_without_purging(session, user, monkeypatch, capsys):
+    _, bottles = _shelf(session, user)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(bind=session.get_bind()))
+    monkeypatch.setattr(sys, "argv", ["retention_service", "--days", "30", "--dry-run"])
+    retention_service.main()
+    assert capsys.readouterr().out.strip() == "1 bottle(s) would be purged"
+    assert session.query(Bottle).filter(Bottle.id == bottles["expired"]).count() == 1
+
+
+def test_cli_archives_before_purging(session, user, monkeypatch, capsys, tmp_path):
+    _, bottles = _shelf(session, user)
+    archive = tmp_path / "purged.jsonl"
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(bind=session.get_bind()))
+    monkeypatch.setattr(sys, "argv", ["retention_service", "--days", "30", "--archive", str(archive)])
+    retention_service.main()
+    assert capsys.readouterr().out.strip() == (
+        "Purged 1 bottle(s), 2 tasting note(s) and 1 collection link(s)"
+    )
+    assert [json.loads(line)["bottle"]["name"] for line in archive.read_text().splitlines()] == ["expired"]
+    session.expire_all()
+    assert session.query(Bottle).filter(Bottle.id == bottles["expired"]).count() == 0
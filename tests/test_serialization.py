@@ -0,0 +1,109 @@
+"""Fast serialization path tests"""
+
+import json
+import pytest
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import uuid4
+from fastapi import HTTPException
+from app.models.bottle import Bottle, SpiritType
+from app.schemas.bottle import BottleListItem, BottleRead
+from app.utils.serialization import (
+    RowSerializer,
+    bottle_serializer,
+    dumps,
+    select_bottle_fields,
+)
+
+
+def _bottle_row():
+    return {
+        "name": "Eagle Rare 10",
+        "spirit_type": SpiritType.WHISKEY,
+        "distillery": "Buffalo Trace",
+        "proof": 90.0,
+        "age_statement": "10 Year",
+        "region": "Kentucky",
+        "country": "United States",
+        "release_year": 2023,
+        "batch_number": None,
+        "price_paid": Decimal("39.99"),
+        "price_current": None,
+        "acquisition_date": date(2024, 3, 1),
+        "notes": "Cherry and leather",
+        "rating": 4,
+        "image_url": None,
+        "id": uuid4(),
+        "user_id": uuid4(),
+        "product_id": uuid4(),
+        "ai_details": {"rarity": "common"},
+        "created_at": datetime(2024, 3, 1, 12, 30, 15, 123456),
+        "updated_at": datetime(2024, 3, 2, 8, 0),
+    }
+
+
+def test_bottle_serializer_matches_pydantic():
+    """Fast path produces the same JSON as the BottleRead response model"""
+    data = _bottle_row()
+    row = tuple(data[name] for name in bottle_serializer.fields)
+
+    fast = json.loads(dumps(bottle_serializer.to_dicts([row])))
+    expected = json.loads(BottleRead(**data).model_dump_json())
+
+    assert fast == [expected]
+
+
+def test_row_serializer_converters():
+    """Converters only apply to the named, non-null fields"""
+    serializer = RowSerializer(
+        BottleRead,
+        Bottle,
+        fields=("name", "price_paid"),
+        converters={"price_paid": float},
+    )
+    assert serializer.to_dicts([("A", Decimal("10.50")), ("B", None)]) == [
+        {"name": "A", "price_paid": 10.5},
+        {"name": "B", "price_paid": None},
+    ]
+
+
+def test_field_selector_projects_requested_columns():
+    """fields= selects only the requested columns, always including id"""
+    serializer = select_bottle_fields("rating, name")
+    assert serializer.fields == ("name", "rating", "id")
+    assert [c.key for c in serializer.columns] == ["name", "rating", "id"]
+    assert select_bottle_fields("name,rating") is serializer
+
+
+def test_field_selector_defaults_skip_heavy_columns():
+    """List defaults leave notes and ai_details out"""
+    serializer = select_bottle_fields(None)
+    assert "notes" not in serializer.fields
+    assert "ai_details" not in serializer.fields
+    assert "image_url" in serializer.fields
+
+
+def test_list_item_schema_documents_every_selectable_field():
+    """The list response model covers all bottle fields and requires only id"""
+    fields = BottleListItem.model_fields
+    assert set(fields) == set(bottle_serializer.fields)
+    assert [name for name, field in fields.items() if field.is_required()] == ["id"]
+
+
+def test_field_selector_rejects_unknown_fields():
+    """Unknown field names are a 400"""
+    with pytest.raises(HTTPException) as exc_info:
+        select_bottle_fields("name,password_hash")
+    assert exc_info.value.status_code == 400
+
+
+def test_json_fallback_stringifies_keys(monkeypatch):
+    """Without orjson, UUID-keyed results still serialize the same way"""
+    from app.utils import serialization
+
+    key = uuid4()
+    content = {"results": {key: {"count": 1}}, "missing": [uuid4()]}
+    fast = json.loads(dumps(content))
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert json.loads(serialization.dumps(content)) == fast
+    assert str(key) in fast["results"]
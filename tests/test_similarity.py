@@ -0,0 +1,101 @@
+"""Bottle similarity engine tests"""
+
+import asyncio
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+from app.crud.bottle import create_bottle
+from app.models.bottle import Bottle, SpiritType
+from app.schemas.bottle import BottleCreate
+from app.services.similarity_service import FeatureEncoder, SimilarityIndex
+
+
+def _bottle(name, spirit_type=SpiritType.WHISKEY, **fields):
+    values = {
+        "id": uuid4(),
+        "name": name,
+        "spirit_type": spirit_type,
+        "distillery": None,
+        "proof": None,
+        "age_statement": None,
+        "region_id": None,
+        "country_id": None,
+        "price_paid": None,
+        "price_current": None,
+        "rating": None,
+    }
+    values.update(fields)
+    return SimpleNamespace(**values)
+
+
+def _index():
+    return SimilarityIndex(FeatureEncoder(["vanilla", "smoky", "citrus"]), initial_capacity=2)
+
+
+def test_most_similar_ranks_closest_bottles_first():
+    """Matching spirit, region and flavor outrank a different spirit"""
+    index = _index()
+    source = _bottle("Ardbeg 10", region_id=1, country_id=1, proof=92)
+    close = _bottle("Laphroaig 10", region_id=1, country_id=1, proof=86)
+    far = _bottle("Tito's", SpiritType.VODKA, country_id=2, proof=80)
+    index.upsert(source, {"smoky": 3})
+    index.upsert(close, {"smoky": 2})
+    index.upsert(far, {"citrus": 1})
+
+    results = index.most_similar(source.id, limit=2)
+    assert [r["id"] for r in results] == [close.id, far.id]
+    assert results[0]["similarity"] > results[1]["similarity"]
+
+
+def test_index_grows_and_reuses_removed_rows():
+    """Capacity doubles as needed and removed bottles drop out of results"""
+    index = _index()
+    bottles = [_bottle(f"Bottle {i}", price_paid=Decimal("40")) for i in range(5)]
+    for bottle in bottles:
+        index.upsert(bottle)
+    assert len(index) == 5
+
+    index.remove(bottles[1].id)
+    ids = {r["id"] for r in index.most_similar(bottles[0].id, limit=10)}
+    assert bottles[1].id not in ids
+    assert len(ids) == 3
+
+    index.upsert(_bottle("Replacement"))
+    assert len(index) == 5
+
+
+def test_unknown_bottle_has_no_neighbours():
+    """Bottles missing from the index return an empty list"""
+    assert _index().most_similar(uuid4()) == []
+
+
+def test_locations_match_by_dimension_key_only():
+    """Different places never count as the same location"""
+    index = _index()
+    source = _bottle("Source", region_id=1, country_id=1)
+    same = _bottle("Same place", region_id=1, country_id=1)
+    elsewhere = _bottle("Elsewhere", region_id=2, country_id=3)
+    for bottle in (source, same, elsewhere):
+        index.upsert(bottle)
+
+    scores = {r["id"]: r["similarity"] for r in index.most_similar(source.id, limit=2)}
+    assert scores[same.id] == 1.0
+    assert scores[elsewhere.id] == round(3.0 ** 2 / (3.0 ** 2 + 1.5 ** 2 + 1.0 ** 2), 4)  # spirit type only
+
+
+def test_rebuild_drops_bottles_deleted_since_the_last_build(session, user):
+    """A resync starts from the database, not from the previous index"""
+    bottles = [
+        asyncio.run(create_bottle(session, user.id, BottleCreate(name=name, spirit_type="whiskey")))
+        for name in ("Kept", "Gone")
+    ]
+    index = _index()
+    index.refresh(session)
+    assert len(index) == 2
+
+    session.query(Bottle).filter(Bottle.id == bottles[1].id).delete()
+    session.commit()
+    index.reset()
+    index.refresh(session)
+    assert len(index) == 1
+    assert index.most_similar(bottles[0].id) == []
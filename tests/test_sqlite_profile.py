@@ -0,0 +1,46 @@
+"""SQLite production profile tests"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from app.database.sqlite import create_sqlite_engines, is_file_database
+
+
+def _factory(tmp_path):
+    writer, reader = create_sqlite_engines(f"sqlite:///{tmp_path / 'profile.db'}")
+    with writer.begin() as connection:
+        connection.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+    return writer, reader, sessionmaker(bind=writer)
+
+
+def test_connections_use_wal_and_pragmas(tmp_path):
+    """Both engines open connections in WAL mode with the busy timeout set"""
+    writer, reader, _ = _factory(tmp_path)
+    for engine in (writer, reader):
+        with engine.connect() as connection:
+            assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+
+
+def test_writer_sessions_read_inside_their_write_transaction(tmp_path):
+    """A read before the first write already holds the write lock, so read-modify-write is atomic"""
+    writer, reader, factory = _factory(tmp_path)
+    db = factory()
+    assert db.execute(text("SELECT count(*) FROM items")).scalar() == 0
+
+    with reader.connect() as connection:
+        assert connection.exec_driver_sql("SELECT count(*) FROM items").scalar() == 0
+        connection.exec_driver_sql("PRAGMA busy_timeout=0")
+        with pytest.raises(OperationalError, match="locked"):
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+    db.execute(text("INSERT INTO items (name) VALUES ('a')"))
+    db.commit()
+    db.close()
+
+
+def test_memory_databases_are_not_split():
+    """In-memory URLs cannot be shared between a writer and a read pool"""
+    assert not is_file_database("sqlite://")
+    assert not is_file_database("sqlite:///:memory:")
+    assert is_file_database("sqlite:///./drinkshelf.db")
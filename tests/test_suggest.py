@@ -0,0 +1,51 @@
+"""Search suggestion index tests"""
+
+from app.services.suggest_service import SuggestIndex
+
+
+def _index():
+    index = SuggestIndex()
+    index.add("name", "Eagle Rare 10", 3)
+    index.add("name", "Eagle Rare 17")
+    index.add("distillery", "Buffalo Trace", 5)
+    index.add("name", "Lagavulin 16", 2)
+    index.add("region", "Islay")
+    return index
+
+
+def test_prefix_matches_any_word_most_common_first():
+    """Prefixes match word starts and rank by count"""
+    index = _index()
+    assert [s["text"] for s in index.suggest("eagle")] == ["Eagle Rare 10", "Eagle Rare 17"]
+    assert [s["text"] for s in index.suggest("rar", limit=1)] == ["Eagle Rare 10"]
+    assert index.suggest("buff")[0] == {"text": "Buffalo Trace", "kind": "distillery", "count": 5}
+
+
+def test_typo_falls_back_to_trigram_and_edit_distance():
+    """Misspelled queries still find the closest terms"""
+    index = _index()
+    assert index.suggest("lagavlin")[0]["text"] == "Lagavulin 16"
+    assert index.suggest("zzzz") == []
+
+
+def test_updates_move_counts_and_hide_removed_terms():
+    """Removing the last occurrence of a term hides it from results"""
+    index = _index()
+    index.update({"region": "Islay"}, {"region": "Speyside"})
+    assert index.suggest("isl", kind="region") == []
+    assert index.suggest("spey")[0]["text"] == "Speyside"
+
+
+def test_short_prefixes_rank_every_match_and_filter_by_kind():
+    """Ranking and kind filtering see all matches, not just the first few hundred"""
+    index = SuggestIndex()
+    for i in range(600):
+        index.add("name", f"Aardvark {i:03d}")
+    index.add("name", "Abandoned Cask", 1)
+    index.add("name", "Abandoned Cask", -1)  # dead term
+    index.add("country", "Argentina", 2)
+    index.add("name", "Azure", 7)
+
+    assert [s["text"] for s in index.suggest("a", limit=2)] == ["Azure", "Argentina"]
+    assert [s["text"] for s in index.suggest("a", kind="country")] == ["Argentina"]
+    assert "Abandoned Cask" not in [s["text"] for s in index.suggest("ab")]
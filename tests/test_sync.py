@@ -0,0 +1,82 @@
+"""Delta sync tests"""
+
+import asyncio
+import time
+from uuid import uuid4
+import pytest
+from app.config import settings
+from app.crud.bottle import create_bottle, soft_delete_bottle, update_bottle
+from app.crud.collection import add_bottle_to_collection, create_collection, remove_bottle_from_collection
+from app.crud.tasting_note import create_tasting_note, delete_tasting_note
+from app.schemas.bottle import BottleCreate, BottleUpdate
+from app.schemas.collection import CollectionCreate
+from app.schemas.tasting_note import TastingNoteCreate
+from app.services.sync_service import (
+    SyncTokenExpired,
+    decode_sync_token,
+    encode_sync_token,
+    get_changes,
+    get_snapshot,
+)
+
+
+def _bottle(session, user, name):
+    return asyncio.run(create_bottle(session, user.id, BottleCreate(name=name, spirit_type="whiskey")))
+
+
+def test_token_round_trip():
+    """Tokens carry the change log position and when they were issued"""
+    assert decode_sync_token(encode_sync_token(42, issued_at=1_700_000_000)) == (42, 1_700_000_000)
+
+
+def test_malformed_token_is_rejected():
+    with pytest.raises(ValueError):
+        decode_sync_token("not-a-token")
+
+
+def test_token_older_than_retention_must_resync():
+    """Entries it would need may already be pruned, so no query is attempted"""
+    issued_at = time.time() - (settings.CHANGE_LOG_RETENTION_DAYS + 1) * 86400
+    with pytest.raises(SyncTokenExpired):
+        asyncio.run(get_changes(None, uuid4(), encode_sync_token(1, issued_at), limit=10))
+
+
+def test_changes_collapse_to_the_latest_entry_per_row(session, user):
+    """Several entries for one row or membership come back once, in their final state"""
+    token = asyncio.run(get_snapshot(session, user.id))["token"]
+    kept, dropped = _bottle(session, user, "Kept"), _bottle(session, user, "Dropped")
+    asyncio.run(update_bottle(session, kept.id, user.id, BottleUpdate(name="Kept, renamed")))
+    note = asyncio.run(create_tasting_note(session, kept.id, user.id, TastingNoteCreate(rating=4)))
+    session.commit()
+    asyncio.run(delete_tasting_note(session, note.id, user.id))
+    collection = asyncio.run(create_collection(session, user.id, CollectionCreate(name="Shelf")))
+    for bottle in (kept, dropped):
+        asyncio.run(add_bottle_to_collection(session, collection.id, bottle.id, user.id))
+    asyncio.run(remove_bottle_from_collection(session, collection.id, dropped.id, user.id))
+
+    changes = asyncio.run(get_changes(session, user.id, token, limit=100))
+    assert sorted(bottle["name"] for bottle in changes["bottles"]) == ["Dropped", "Kept, renamed"]
+    assert changes["tasting_notes"] == []
+    assert changes["deleted"]["tasting_notes"] == [note.id]
+    assert [(row["collection_id"], row["bottle_id"]) for row in changes["memberships"]] == [
+        (collection.id, kept.id)
+    ]
+    assert changes["deleted"]["memberships"] == [{"collection_id": collection.id, "bottle_id": dropped.id}]
+    assert not changes["has_more"]
+
+
+def test_pages_turn_rows_deleted_since_their_entry_into_tombstones(session, user):
+    """A page whose entry says created still reports the row gone if it no longer exists"""
+    token = asyncio.run(get_snapshot(session, user.id))["token"]
+    bottle = _bottle(session, user, "Short-lived")
+    asyncio.run(soft_delete_bottle(session, bottle.id, user.id))
+
+    first = asyncio.run(get_changes(session, user.id, token, limit=1))
+    assert first["has_more"]
+    assert first["bottles"] == []
+    assert first["deleted"]["bottles"] == [bottle.id]
+
+    second = asyncio.run(get_changes(session, user.id, first["token"], limit=1))
+    assert not second["has_more"]
+    assert second["deleted"]["bottles"] == [bottle.id]
+    assert asyncio.run(get_changes(session, user.id, second["token"], limit=1))["deleted"]["bottles"] == []
@@ -0,0 +1,59 @@
+"""User statistics counter tests against a real session"""
+
+import asyncio
+from app.crud.bottle import create_bottle, soft_delete_bottles, update_bottle
+from app.crud.tasting_note import create_tasting_note, delete_tasting_note
+from app.crud.user_stats import load_user_stats
+from app.models.bottle import Bottle, SpiritType
+from app.models.user_stats import UserSpiritStats, UserStats
+from app.schemas.bottle import BottleCreate, BottleUpdate
+from app.schemas.tasting_note import TastingNoteCreate
+from app.services.stats_service import reconcile_users
+
+
+def _drop_counters(session):
+    session.query(UserSpiritStats).delete()
+    session.query(UserStats).delete()
+    session.commit()
+
+
+def _legacy_bottle(session, user, name, rating=None):
+    """A bottle written before counters existed"""
+    bottle = Bottle(user_id=user.id, name=name, spirit_type=SpiritType.WHISKEY, rating=rating)
+    session.add(bottle)
+    session.commit()
+    return bottle
+
+
+def test_first_write_for_existing_data_rebuilds_counters(session, user):
+    """A user without a counter row gets counters from raw rows, not from one delta"""
+    _legacy_bottle(session, user, "Old One", rating=4)
+    _legacy_bottle(session, user, "Old Two")
+
+    asyncio.run(create_bottle(session, user.id, BottleCreate(name="New", spirit_type="gin", rating=2)))
+    stats, spirits = load_user_stats(session, user.id)
+    assert (stats.bottle_count, stats.rated_bottle_count, stats.bottle_rating_sum) == (3, 2, 6)
+    assert {str(spirit.spirit_type): spirit.bottle_count for spirit in spirits} == {
+        str(SpiritType.WHISKEY): 2,
+        str(SpiritType.GIN): 1,
+    }
+
+    # Later writes apply plain deltas
+    asyncio.run(create_bottle(session, user.id, BottleCreate(name="Newer", spirit_type="gin")))
+    assert reconcile_users(session, [user.id], repair=False) == []
+
+
+def test_rebuild_happens_after_all_of_the_transactions_writes(session, user):
+    """Writes that change raw rows before or after their deltas both come out right"""
+    bottle = _legacy_bottle(session, user, "Rated Later")
+    note = asyncio.run(create_tasting_note(session, bottle.id, user.id, TastingNoteCreate(rating=5)))
+    others = [_legacy_bottle(session, user, name) for name in ("Gone One", "Gone Two")]
+
+    for write in (
+        lambda: update_bottle(session, bottle.id, user.id, BottleUpdate(rating=3, spirit_type="rum")),
+        lambda: delete_tasting_note(session, note.id, user.id),
+        lambda: soft_delete_bottles(session, [other.id for other in others], user.id),
+    ):
+        _drop_counters(session)
+        asyncio.run(write())
+        assert reconcile_users(session, [user.id], repair=False) == []